@@ -0,0 +1,176 @@
+"""Admission control for the generation endpoints.
+
+Each registered generation route gets a concurrency limit and a bounded wait
+queue (unknown paths are not limited). Requests beyond both are rejected at
+once with ``429`` and a ``Retry-After`` derived from the endpoint's observed
+service time, before any chain or index work starts; queued requests that
+wait longer than ``ADMISSION_QUEUE_TIMEOUT`` are rejected the same way.
+In-flight and queued counts are exported as gauges.
+
+Limits: ``ADMISSION_MAX_CONCURRENT`` / ``ADMISSION_MAX_QUEUE`` apply to every
+endpoint; ``ADMISSION_LIMITS="generate_calendar=2:4,generate_content_strategy=4"``
+overrides them per endpoint (``concurrency[:queue]``).
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+
+from starlette.responses import JSONResponse
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+# Service time assumed until an endpoint has completed requests of its own
+ADMISSION_DEFAULT_SERVICE_SECONDS = float(os.getenv("ADMISSION_DEFAULT_SERVICE_SECONDS", "10"))
+ADMISSION_PATH_PREFIXES = ("/generate_", "/regenerate_output/")
+_RETRY_AFTER_MAX = 120
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    def __init__(self, endpoint: str, retry_after: int, reason: str):
+        super().__init__(f"{endpoint} is {reason}; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit plus a bounded FIFO of waiting requests for one endpoint."""
+
+    def __init__(self, name: str, max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+                 max_queue: int = ADMISSION_MAX_QUEUE, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.service_time = ADMISSION_DEFAULT_SERVICE_SECONDS  # EWMA of completed requests
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the backlog drained at the observed service rate."""
+        backlog = self.in_flight + self.queued + 1
+        estimate = self.service_time * backlog / self.max_concurrent
+        return max(1, min(_RETRY_AFTER_MAX, math.ceil(estimate)))
+
+    def _publish(self):
+        metrics.set_gauge(f"admission.{self.name}.in_flight", self.in_flight)
+        metrics.set_gauge(f"admission.{self.name}.queued", self.queued)
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        metrics.incr(f"admission.{self.name}.rejected")
+        raise Overloaded(self.name, self.retry_after(), reason)
+
+    async def acquire(self):
+        if self._semaphore.locked() or self.queued:
+            if self.queued >= self.max_queue:
+                self._reject("at capacity")
+            self.queued += 1
+            self._publish()
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("still at capacity")
+            finally:
+                self.queued -= 1
+                metrics.observe(f"admission.{self.name}.queue_wait", time.monotonic() - started)
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self._publish()
+
+    def release(self, elapsed: float):
+        self.in_flight -= 1
+        self._semaphore.release()
+        self.service_time += _EWMA_ALPHA * (elapsed - self.service_time)
+        metrics.observe(f"admission.{self.name}.service_time", elapsed)
+        self._publish()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_time": round(self.service_time, 3),
+            "retry_after": self.retry_after(),
+        }
+
+
+def _overrides() -> dict:
+    limits = {}
+    for item in os.getenv("ADMISSION_LIMITS", "").split(","):
+        if "=" not in item:
+            continue
+        name, spec = (part.strip() for part in item.split("=", 1))
+        concurrency, _, queue = spec.partition(":")
+        limits[name.strip("/")] = (int(concurrency), int(queue) if queue else ADMISSION_MAX_QUEUE)
+    return limits
+
+
+class AdmissionControl:
+    """The per-endpoint limiters, one for each registered generation route."""
+
+    def __init__(self, prefixes=ADMISSION_PATH_PREFIXES):
+        self.prefixes = prefixes
+        self.limiters = {}
+        self._overrides = _overrides()
+
+    def register(self, paths):
+        """Create limiters for the routes in ``paths`` under the admission prefixes.
+
+        Only registered routes are limited, so requests to unknown paths (404s)
+        never create limiters or gauges.
+        """
+        for path in paths:
+            name = path.strip("/")
+            if path.startswith(self.prefixes) and name not in self.limiters:
+                concurrency, queue = self._overrides.get(name, (ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE))
+                self.limiters[name] = AdmissionLimiter(name, concurrency, queue)
+
+    def limiter_for(self, path: str) -> AdmissionLimiter | None:
+        return self.limiters.get(path.strip("/")) if path.startswith(self.prefixes) else None
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+admission = AdmissionControl()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a slot for the whole request, streamed bodies included."""
+
+    def __init__(self, app, control: AdmissionControl = admission):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.control.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            logger.warning(str(e))
+            response = JSONResponse(
+                {"detail": str(e)}, status_code=429, headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
@@ -1,25 +1,54 @@
 import os
-from fastapi import HTTPException, Query, FastAPI
+import json
+import asyncio
+from fastapi import HTTPException, Query, FastAPI, UploadFile, File, Form
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List
 import logging
-from .models import InstagramPostRequest, FacebookPostRequest, LinkedInPostRequest, StrategyRequest, CalendarRequest, RegenerateRequest
+from .admission import AdmissionMiddleware, admission
+from .request_logging import RequestLoggingMiddleware
+from .models import InstagramPostRequest, FacebookPostRequest, LinkedInPostRequest, StrategyRequest, CalendarRequest, RegenerateRequest, MultiPlatformRequest, JobRequest
 from src.chains.linkedin_chain import LinkedInContentChain
 from src.chains.instagram_chain import InstagramContentChain
 from src.chains.facebook_chain import FacebookContentChain
+from src.chains.calendar_chain import CalendarEngine
+from src.chains.strategy_chain import StrategyEngine
+from src.chains.fanout_chain import FanOutEngine
 from src.loaders.retriever import FeedbackRetriever
 from src.tools.content_tools import instagram_content, facebook_content, linkedin_content
 from src.tools.strategy_tools import content_strategy
 from src.tools.calendar_tools import generate_calendar
-from src.rag_pipeline import setup_rag_pipeline
+from src.rag_pipeline import setup_rag_pipeline, get_rag_chain
 import uuid
 from datetime import datetime
-from src.langchain_utils import validate_content
+from src.langchain_utils import validate_content, save_output, feedback_label
+from src.metrics import metrics
+from src.archive import get_archive
+from src.analytics import FeedbackAnalytics
+from src.output_catalog import OutputCatalog
+from src import exporter
+from src.loaders.bulk_import import BulkImporter, read_checkpoint, checkpoint_path_for
+from src.openai_clients import aclose_http_clients
+from src.resilience import CircuitOpenError, LLMTimeoutError
+from src.scheduler import scheduler
+from src.singleflight import generations, request_key
+from src.job_queue import JobQueue, job_view
+from src.warmup import WARMUP_ENABLED, WarmUp, readiness
+from src.logging_config import log_payload, setup_logging, shutdown_logging, stage
+import httpx
+import openai
 
 
-logging.basicConfig(level=logging.DEBUG)
+# JSON records written by a background thread; levels from LOG_LEVEL / LOG_LEVELS
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Content Generation API", description="API for SEO-focused social media content, strategies, and calendars")
+# Bounded concurrency + wait queue per generation endpoint; excess requests get 429 + Retry-After
+app.add_middleware(AdmissionMiddleware)
+# Outermost: request ids and the per-request summary record cover rejected requests too
+app.add_middleware(RequestLoggingMiddleware)
 
 # Project root & index path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Adjusted for api/
@@ -28,16 +57,72 @@ index_path = os.path.join(project_root, "src", "faiss_index")
 # We'll lazily build the FAISS index and FeedbackRetriever during startup to
 # avoid blocking import-time execution which can cause lifespan cancellations.
 retriever = None  # type: FeedbackRetriever | None
+analytics = None  # type: FeedbackAnalytics | None
+catalog = None  # type: OutputCatalog | None
+jobs = None  # type: JobQueue | None
+job_collector = None  # type: asyncio.Task | None
+warmup_task = None  # type: asyncio.Task | None
+
+JOB_COLLECT_INTERVAL = float(os.getenv("JOB_COLLECT_INTERVAL", "1.0"))
 
 @app.on_event("startup")
 async def _startup() -> None:
     """Build/load FAISS index and retriever once the event loop is running."""
-    global retriever
+    global retriever, analytics, catalog, jobs, job_collector, warmup_task
+    admission.register(route.path for route in app.routes)
     # Build / load the vector store (runs quickly if it already exists)
     setup_rag_pipeline(index_path=index_path)
     retriever = FeedbackRetriever(index_path=index_path)
+    # Single writer: refuse to start while an import CLI (or another API) writes the index
+    retriever.acquire_writer_lock("api")
+    analytics = FeedbackAnalytics()
+    if analytics.is_empty():
+        # First run with an existing index: seed the aggregates from stored feedback
+        analytics.record_many(list(retriever.outputs_with_feedback()))
+    catalog = OutputCatalog()
+    if catalog.is_empty():
+        catalog.upsert_many(retriever.stored_outputs())
+    jobs = JobQueue()
+    job_collector = asyncio.create_task(collect_jobs())
+    readiness.index_loaded = True
+    if WARMUP_ENABLED:
+        # /readyz stays 503 until the caches and connection pools are warm
+        warmup_task = asyncio.create_task(WarmUp(retriever, catalog, index_path).run())
+    else:
+        readiness.warm = True
     logger.info("RAG pipeline & FeedbackRetriever initialised during startup.")
 
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    """Close the shared OpenAI connection pools."""
+    for task in (job_collector, warmup_task):
+        if task is not None:
+            task.cancel()
+    await aclose_http_clients()
+    get_archive().close()  # drain queued archive writes
+    if analytics is not None:
+        analytics.close()
+    if catalog is not None:
+        catalog.close()
+    if jobs is not None:
+        jobs.close()
+    if retriever is not None:
+        retriever.release_writer_lock()
+    shutdown_logging()
+
+def error_status(e: Exception) -> int:
+    """HTTP status for a failed generation: 429 when OpenAI rate limits persist,
+    503 when the LLM circuit is open, 504 on deadline."""
+    if isinstance(e, HTTPException):
+        return e.status_code
+    if isinstance(e, openai.RateLimitError):
+        return 429
+    if isinstance(e, CircuitOpenError):
+        return 503
+    if isinstance(e, LLMTimeoutError):
+        return 504
+    return 500
+
 def prepare_generate_params(request_data, additional_data):
     """Prepare a complete parameter set with required fields."""
     base_params = {
@@ -54,6 +139,34 @@ class FeedbackRequest(BaseModel):
     comment: str = None
     engagement_metrics: dict = None  
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the index is loaded and the warm-up has finished, else 503."""
+    status = readiness.as_dict()
+    if not readiness.ready:
+        return JSONResponse(status, status_code=503)
+    return status
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters, gauges and latency percentiles."""
+    return metrics.snapshot()
+
+@app.get("/metrics/scheduler")
+async def get_scheduler_metrics():
+    """Per-lane queue depth and wait times of the OpenAI rate-limit scheduler."""
+    return scheduler.stats()
+
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    """Per-endpoint in-flight and queued requests, rejections and observed service time."""
+    return admission.stats()
+
 @app.post("/rebuild_index/")
 async def rebuild_index(overwrite: bool = Query(False, description="Set to True to overwrite existing index")):
     try:
@@ -67,22 +180,77 @@ async def rebuild_index(overwrite: bool = Query(False, description="Set to True
         if not brochure_path:
             raise FileNotFoundError("Productimate Brochure.pdf not found in data folders")
 
-        create_vector_index(
-            brochure_path,
+        # Ingest the brochure's whole data folder (PDF, DOCX, JSON, HTML, ...) off the event loop
+        stats = await asyncio.to_thread(
+            create_vector_index,
+            os.path.dirname(brochure_path),
             os.path.join(project_root, "src", "faiss_index"),
             overwrite=overwrite
         )
-        return {"message": "FAISS index rebuilt successfully"}
+        # The retriever's copy still holds the old index; its next save would overwrite the rebuild
+        if retriever is not None:
+            await asyncio.to_thread(retriever.reload)
+        return {"message": "FAISS index rebuilt successfully", "ingest": stats}
     except Exception as e:
         logger.exception("Error rebuilding index")
         raise HTTPException(status_code=500, detail=f"Error rebuilding index: {str(e)}")
 
+import_jobs = {}  # import_id -> {"task", "source"}
+
+@app.post("/import_outputs/")
+async def import_outputs(file: UploadFile = File(...), platform: str = Form(None)):
+    """Bulk import a CSV/JSONL of past posts with engagement metrics; runs in the background."""
+    if not file.filename.endswith((".csv", ".jsonl", ".ndjson")):
+        raise HTTPException(status_code=400, detail="Upload a .csv or .jsonl file")
+    import_id = str(uuid.uuid4())
+    upload_dir = os.path.join(project_root, "data", "imports")
+    os.makedirs(upload_dir, exist_ok=True)
+    source = os.path.join(upload_dir, f"{import_id}{os.path.splitext(file.filename)[1]}")
+    try:
+        # Spool the upload to disk in chunks; the importer streams it from there
+        with open(source, "wb") as f:
+            while chunk := await file.read(1024 * 1024):
+                f.write(chunk)
+        importer = BulkImporter(retriever, catalog=catalog, analytics=analytics)
+        task = asyncio.create_task(importer.run(source, platform))
+        import_jobs[import_id] = {"task": task, "source": source}
+        return {"import_id": import_id, "status_url": f"/import_outputs/{import_id}"}
+    except Exception as e:
+        logger.exception("Error starting import")
+        raise HTTPException(status_code=500, detail=f"Error starting import: {str(e)}")
+
+@app.get("/import_outputs/{import_id}")
+async def import_status(import_id: str):
+    job = import_jobs.get(import_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    state = read_checkpoint(checkpoint_path_for(job["source"]))
+    task = job["task"]
+    if not task.done():
+        status = "running"
+    elif task.cancelled() or task.exception() is not None:
+        status = "failed"
+        state["error"] = "cancelled" if task.cancelled() else str(task.exception())
+    else:
+        status = "finished"
+    return {"import_id": import_id, "status": status, **state}
+
+async def chain_generation(chain_class, mode: str, params: dict):
+    """Run one generation on a fresh chain; returns ``(content, generation record)``."""
+    chain = chain_class()
+    content = await chain.generate(mode=mode, **params)
+    return content, chain.last_generation
+
 @app.post("/generate_instagram_content/")
 async def generate_instagram_content(request: InstagramPostRequest):
     try:
-        chain = InstagramContentChain()
-        caption = await chain.generate(mode="content", **request.dict())
-        print(f"Validating: {caption}, use_case: content, platform: instagram")
+        params = request.dict()
+        # Identical concurrent requests share one generation; each still gets its own output_id
+        with stage("generation"):
+            caption, generation = await generations.do(
+                request_key("instagram_content", params), lambda: chain_generation(InstagramContentChain, "content", params)
+            )
+        log_payload(logger, "Validating output", content=caption, use_case="content", platform="instagram")
         is_valid, message = validate_content(caption, "content")
         
         # Store output in FAISS
@@ -97,19 +265,23 @@ async def generate_instagram_content(request: InstagramPostRequest):
             "timestamp": datetime.utcnow().isoformat(),
             "seo_score": float(validate_content(caption, "content")[0])
         }
-        retriever.store_output(caption, metadata)
+        await store_output(caption, metadata, "instagram_contents", "instagram_content", generation=generation)
         
-        return {"output_id": output_id, "instagram_caption": caption, "validation_passed": is_valid, "validation_message": message}
+        return {"output_id": output_id, "instagram_caption": caption, "validation_passed": is_valid, "validation_message": message, "alternatives": alternatives(generation)}
     except Exception as e:
         logger.exception("Error generating Instagram content")
-        raise HTTPException(status_code=500, detail=f"Error generating Instagram content: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating Instagram content: {str(e)}")
 
 @app.post("/generate_facebook_content/")
 async def generate_facebook_content(request: FacebookPostRequest):
     try:
-        chain = FacebookContentChain()
-        post = await chain.generate(mode="content", **request.dict())
-        print(f"Validating: {post}, use_case: content, platform: facebook")
+        params = request.dict()
+        # Identical concurrent requests share one generation; each still gets its own output_id
+        with stage("generation"):
+            post, generation = await generations.do(
+                request_key("facebook_content", params), lambda: chain_generation(FacebookContentChain, "content", params)
+            )
+        log_payload(logger, "Validating output", content=post, use_case="content", platform="facebook")
         is_valid, message = validate_content(post, "content")
 
         
@@ -125,19 +297,23 @@ async def generate_facebook_content(request: FacebookPostRequest):
             "timestamp": datetime.utcnow().isoformat(),
             "seo_score": float(validate_content(post, "content")[0])
         }
-        retriever.store_output(post, metadata)
+        await store_output(post, metadata, "facebook_contents", "facebook_content", generation=generation)
         
-        return {"output_id": output_id, "facebook_post": post, "validation_passed": is_valid, "validation_message": message}
+        return {"output_id": output_id, "facebook_post": post, "validation_passed": is_valid, "validation_message": message, "alternatives": alternatives(generation)}
     except Exception as e:
         logger.exception("Error generating Facebook post")
-        raise HTTPException(status_code=500, detail=f"Error generating Facebook post: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating Facebook post: {str(e)}")
 
 @app.post("/generate_linkedin_content/")
 async def generate_linkedin_content(request: LinkedInPostRequest):
     try:
-        chain = LinkedInContentChain()
-        post = await chain.generate(mode="content", **request.dict())
-        print(f"Validating: {post}, use_case: content, platform: linkedin")
+        params = request.dict()
+        # Identical concurrent requests share one generation; each still gets its own output_id
+        with stage("generation"):
+            post, generation = await generations.do(
+                request_key("linkedin_content", params), lambda: chain_generation(LinkedInContentChain, "content", params)
+            )
+        log_payload(logger, "Validating output", content=post, use_case="content", platform="linkedin")
         is_valid, message = validate_content(post, "content")
 
         
@@ -153,91 +329,389 @@ async def generate_linkedin_content(request: LinkedInPostRequest):
             "timestamp": datetime.utcnow().isoformat(),
             "seo_score": float(validate_content(post, "content")[0])
         }
-        retriever.store_output(post, metadata)
+        await store_output(post, metadata, "linkedin_contents", "linkedin_content", generation=generation)
         
-        return {"output_id": output_id, "linkedin_post": post, "validation_passed": is_valid, "validation_message": message}
+        return {"output_id": output_id, "linkedin_post": post, "validation_passed": is_valid, "validation_message": message, "alternatives": alternatives(generation)}
     except Exception as e:
         logger.exception("Error generating LinkedIn post")
-        raise HTTPException(status_code=500, detail=f"Error generating LinkedIn post: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating LinkedIn post: {str(e)}")
+
+def alternatives(generation: dict | None) -> list[dict]:
+    """Runner-up candidates (best first) of a multi-candidate generation."""
+    if not generation:
+        return []
+    return [{"content": text, "score": round(score, 3)} for text, score in generation["candidates"][1:]]
+
+async def store_output(content: str, metadata: dict, category: str, prefix: str, generation: dict | None = None):
+    """Archive an output under its id, index it for retrieval and add it to the catalog."""
+    with stage("store"):
+        save_output(content, f"data/output/{category}", prefix, output_id=metadata["output_id"], metadata=metadata,
+                    generation=generation)
+        # Async embedding: the sync (rate-limit scheduled) client must never run on the loop
+        await retriever.astore_output(content, metadata, generation=generation)
+        catalog.upsert(metadata)
+
+# Platform-specific request fields recorded with each content output
+PLATFORM_METADATA_FIELDS = {
+    "instagram": "persona",
+    "facebook": "audience",
+    "linkedin": "professional_insight",
+}
+
+async def store_platform_content(platform: str, content: str, content_topic: str, params: dict, generation: dict | None = None) -> dict:
+    """Validate, archive and store one platform variant; return its result payload."""
+    is_valid, message = validate_content(content, "content")
+    output_id = str(uuid.uuid4())
+    metadata = {
+        "output_id": output_id,
+        "platform": platform,
+        "length": params.get("length"),
+        "content_topic": content_topic,
+        "tone": params.get("tone"),
+        PLATFORM_METADATA_FIELDS[platform]: params.get(PLATFORM_METADATA_FIELDS[platform]),
+        "timestamp": datetime.utcnow().isoformat(),
+        "seo_score": float(is_valid)
+    }
+    await store_output(content, metadata, f"{platform}_contents", f"{platform}_content", generation=generation)
+    return {"output_id": output_id, "content": content, "validation_passed": is_valid, "validation_message": message}
+
+@app.post("/generate_multi_platform/")
+async def generate_multi_platform(request: MultiPlatformRequest):
+    """Generate one topic for several platforms with a single shared retrieval.
+
+    Returns ``{"results": {platform: {...}}}``, or with ``stream=true`` NDJSON
+    lines ``{"platform", ...}`` in completion order.
+    """
+    platform_params = {
+        platform: {k: v for k, v in params.dict().items() if v is not None}
+        for platform, params in request.platforms.items()
+    }
+    unknown = set(platform_params) - set(PLATFORM_METADATA_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unsupported platforms: {sorted(unknown)}")
+
+    async def result_for(platform, content, error, platform_generations):
+        if error is not None:
+            return {"error": str(error), "status_code": error_status(error)}
+        return await store_platform_content(
+            platform, content, request.content_topic, platform_params[platform], platform_generations.get(platform)
+        )
+
+    if request.stream:
+        engine = FanOutEngine(retriever)
+
+        async def events():
+            try:
+                async for platform, content, error in engine.stream(request.content_topic, platform_params):
+                    yield json.dumps({"platform": platform, **(await result_for(platform, content, error, engine.generations))}) + "\n"
+            except Exception as e:
+                logger.exception("Error streaming multi-platform content")
+                yield json.dumps({"error": f"Error generating multi-platform content: {str(e)}", "status_code": error_status(e)}) + "\n"
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    try:
+        async def fan_out():
+            engine = FanOutEngine(retriever)
+            return await engine.generate(request.content_topic, platform_params), engine.generations
+
+        with stage("generation"):
+            generated, platform_generations = await generations.do(
+                request_key("multi_platform", {"content_topic": request.content_topic, "platforms": platform_params}), fan_out
+            )
+        return {"results": {
+            platform: await result_for(platform, *outcome, platform_generations) for platform, outcome in generated.items()
+        }}
+    except Exception as e:
+        logger.exception("Error generating multi-platform content")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating multi-platform content: {str(e)}")
+
+async def store_strategy(request: StrategyRequest, strategy: str) -> dict:
+    """Validate and store a generated strategy; return the response payload."""
+    is_valid, message = validate_content(strategy, "strategy")
+
+    # Store output in FAISS
+    output_id = str(uuid.uuid4())
+    metadata = {
+        "output_id": output_id,
+        "platform": "all",
+        "content_goals": request.content_goals,
+        "timestamp": datetime.utcnow().isoformat(),
+        "seo_score": float(is_valid)
+    }
+    await store_output(strategy, metadata, "strategies", "content_strategy")
+
+    return {"output_id": output_id, "content_strategy": strategy, "validation_passed": is_valid, "validation_message": message}
 
 @app.post("/generate_content_strategy/")
 async def generate_strategy(request: StrategyRequest):
     try:
-        chain = LinkedInContentChain()  # Using LinkedIn chain for strategy as a placeholder
-        strategy = await chain.generate(mode="strategy", **request.dict())
-        print(f"Validating: {strategy}, use_case: strategy, platform: all")
-        is_valid, message = validate_content(strategy, "strategy")
-        
-        # Store output in FAISS
-        output_id = str(uuid.uuid4())
-        metadata = {
-            "output_id": output_id,
-            "platform": "all",
-            "content_goals": request.content_goals,
-            "timestamp": datetime.utcnow().isoformat(),
-            "seo_score": float(validate_content(strategy, "strategy")[0])
-        }
-        retriever.store_output(strategy, metadata)
-        
-        return {"output_id": output_id, "content_strategy": strategy, "validation_passed": is_valid, "validation_message": message}
+        params = request.dict()
+        if request.sectioned:
+            generate = lambda: StrategyEngine(feedback_retriever=retriever).generate(**params)
+        else:
+            # Using LinkedIn chain for strategy as a placeholder
+            generate = lambda: LinkedInContentChain().generate(mode="strategy", **params)
+        with stage("generation"):
+            strategy = await generations.do(request_key("content_strategy", params), generate)
+        log_payload(logger, "Validating output", content=strategy, use_case="strategy", platform="all")
+        return await store_strategy(request, strategy)
     except Exception as e:
         logger.exception("Error generating strategy")
-        raise HTTPException(status_code=500, detail=f"Error generating strategy: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating strategy: {str(e)}")
+
+@app.post("/generate_content_strategy/stream")
+async def stream_strategy(request: StrategyRequest):
+    """Stream strategy sections as NDJSON as soon as each one is written.
+
+    Each line is ``{"section", "title", "content"}``; the final line carries the
+    stitched strategy with its ``output_id`` (or ``{"error": ...}``).
+    """
+    engine = StrategyEngine(feedback_retriever=retriever)
+
+    async def events():
+        parts = []
+        try:
+            async for number, title, markdown in engine.stream(request.platforms, request.content_goals):
+                parts.append((number, title, markdown))
+                yield json.dumps({"section": number, "title": title, "content": markdown}) + "\n"
+            strategy = engine.stitch(parts)
+            yield json.dumps({"done": True, **(await store_strategy(request, strategy))}) + "\n"
+        except Exception as e:
+            logger.exception("Error streaming strategy")
+            yield json.dumps({"error": f"Error generating strategy: {str(e)}", "status_code": error_status(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+async def store_calendar(request: CalendarRequest, calendar: str) -> dict:
+    """Validate and store a generated calendar; return the response payload."""
+    is_valid, message = validate_content(calendar, "calendar")
+
+    # Store output in FAISS
+    output_id = str(uuid.uuid4())
+    metadata = {
+        "output_id": output_id,
+        "platform": "all",
+        "brand_summary": request.brand_summary,
+        "topic_list": request.topic_list,
+        "days": request.days,
+        "timestamp": datetime.utcnow().isoformat(),
+        "seo_score": float(is_valid)
+    }
+    await store_output(calendar, metadata, "calendars", "content_calendar")
+
+    return {"output_id": output_id, "calendar": calendar, "validation_passed": is_valid, "validation_message": message}
 
 @app.post("/generate_calendar/")
 async def generate_calendar(request: CalendarRequest):
     try:
-        chain = LinkedInContentChain()  # Using LinkedIn chain for calendar as a placeholder
-        # Convert list to comma-separated string for downstream prompts
-        req_data = request.dict()
-        req_data["topic_list"] = ", ".join(req_data["topic_list"])
-        calendar = await chain.generate(mode="calendar", **req_data)
-        print(f"Validating: {calendar}, use_case: calendar, platform: all")
-        is_valid, message = validate_content(calendar, "calendar")
-        
-        # Store output in FAISS
-        output_id = str(uuid.uuid4())
-        metadata = {
-            "output_id": output_id,
-            "platform": "all",
-            "brand_summary": request.brand_summary,
-            "topic_list": request.topic_list,
-            "timestamp": datetime.utcnow().isoformat(),
-            "seo_score": float(validate_content(calendar, "calendar")[0])
-        }
-        retriever.store_output(calendar, metadata)
-        
-        return {"output_id": output_id, "calendar": calendar, "validation_passed": is_valid, "validation_message": message}
+        # Skeleton first, then rows filled concurrently (see CalendarEngine)
+        params = request.dict()
+        with stage("generation"):
+            calendar = await generations.do(
+                request_key("calendar", params), lambda: CalendarEngine().generate(**params)
+            )
+        log_payload(logger, "Validating output", content=calendar, use_case="calendar", platform="all")
+        return await store_calendar(request, calendar)
     except Exception as e:
         logger.exception("Error generating calendar")
-        raise HTTPException(status_code=500, detail=f"Error generating calendar: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error generating calendar: {str(e)}")
 
-@app.post("/submit_feedback/")
-async def submit_feedback(feedback: FeedbackRequest):
+# Request model of each job kind (the body of the matching /generate_* endpoint)
+JOB_MODELS = {
+    "instagram_content": InstagramPostRequest,
+    "facebook_content": FacebookPostRequest,
+    "linkedin_content": LinkedInPostRequest,
+    "content_strategy": StrategyRequest,
+    "calendar": CalendarRequest,
+}
+
+async def store_job(job: dict) -> dict | None:
+    """Store a worker's generated result as a regular output and mark the job succeeded."""
+    kind, content, generation = job["kind"], job["result"]["content"], job["result"].get("generation")
     try:
-        output_data = retriever.get_output(feedback.output_id)
-        if not output_data:
-            raise HTTPException(status_code=404, detail="Output not found")
-        
-        output_data["metadata"]["feedback"] = {
+        request = JOB_MODELS[kind](**job["payload"])
+        if kind == "content_strategy":
+            response = await store_strategy(request, content)
+        elif kind == "calendar":
+            response = await store_calendar(request, content)
+        else:
+            platform = kind.split("_")[0]
+            params = request.dict()
+            response = await store_platform_content(platform, content, request.content_topic, params, generation)
+            response["alternatives"] = alternatives(generation)
+    except Exception as e:
+        logger.exception(f"Error storing the result of job {job['job_id']}")
+        jobs.fail_final(job["job_id"], f"Error storing result: {str(e)}")
+        return None
+    jobs.succeed(job["job_id"], response)
+    return response
+
+async def collect_jobs():
+    """Store results generated by the workers and deliver due webhooks, until cancelled."""
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        while True:
+            try:
+                jobs.release_stale_storing()
+                # One at a time: each store embeds and then saves the index under its lock
+                while (job := jobs.claim_generated()) is not None:
+                    await store_job(job)
+                await jobs.deliver_webhooks(client)
+            except Exception:
+                logger.exception("Error collecting job results")
+            await asyncio.sleep(JOB_COLLECT_INTERVAL)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Queue a generation for the worker processes; poll ``GET /jobs/{job_id}`` or pass a ``webhook_url``."""
+    model = JOB_MODELS.get(request.kind)
+    if model is None:
+        raise HTTPException(status_code=422, detail=f"Unknown job kind {request.kind!r}; expected one of {sorted(JOB_MODELS)}")
+    try:
+        payload = model(**request.payload).dict()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload for {request.kind}: {str(e)}")
+    job_id = jobs.submit(request.kind, payload, request.webhook_url)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs")
+async def job_stats():
+    """Number of jobs in each state."""
+    return jobs.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] == "generated":
+        # Store it now rather than making the poller wait for the collector
+        claimed = jobs.claim_generated(job_id)
+        if claimed is not None:
+            await store_job(claimed)
+            job = jobs.get(job_id)
+    return job_view(job)
+
+def feedback_metadata(feedback: FeedbackRequest) -> dict:
+    return {
+        "feedback": {
             "rating": feedback.rating,
             "comment": feedback.comment,
             "engagement_metrics": feedback.engagement_metrics,
             "label": determine_label(feedback)
         }
-        retriever.update_output(feedback.output_id, output_data)
-        
+    }
+
+@app.post("/submit_feedback/")
+async def submit_feedback(feedback: FeedbackRequest):
+    try:
+        # Feedback only touches metadata: no re-embedding, no full index save
+        # Off the loop: the index lock may be held by a save in progress
+        if not await asyncio.to_thread(retriever.update_metadata, feedback.output_id, feedback_metadata(feedback)):
+            raise HTTPException(status_code=404, detail="Output not found")
+        metadata = retriever.get_output(feedback.output_id)["metadata"]
+        analytics.record(feedback.output_id, metadata)
+        catalog.upsert(metadata)
+
         return {"message": "Feedback submitted successfully", "output_id": feedback.output_id}
     except Exception as e:
         logger.exception("Error submitting feedback")
-        raise HTTPException(status_code=500, detail=f"Error submitting feedback: {str(e)}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error submitting feedback: {str(e)}")
+
+@app.post("/submit_feedback/bulk")
+async def submit_feedback_bulk(feedback: List[FeedbackRequest]):
+    """Attach feedback to many outputs with a single journal write."""
+    try:
+        missing = await asyncio.to_thread(
+            retriever.update_metadata_bulk, {item.output_id: feedback_metadata(item) for item in feedback}
+        )
+        updated = {item.output_id for item in feedback} - set(missing)
+        metadatas = [retriever.get_output(output_id)["metadata"] for output_id in updated]
+        analytics.record_many([(metadata["output_id"], metadata) for metadata in metadatas])
+        catalog.upsert_many(metadatas)
+        return {
+            "message": "Feedback submitted successfully",
+            "updated": len(updated),
+            "missing": missing,
+        }
+    except Exception as e:
+        logger.exception("Error submitting bulk feedback")
+        raise HTTPException(status_code=error_status(e), detail=f"Error submitting feedback: {str(e)}")
+
+@app.get("/analytics/feedback")
+async def feedback_analytics(days: int = Query(30, ge=1, le=365)):
+    """Precomputed feedback aggregates: average rating per platform, label counts, daily engagement."""
+    try:
+        return analytics.summary(days=days)
+    except Exception as e:
+        logger.exception("Error reading feedback analytics")
+        raise HTTPException(status_code=500, detail=f"Error reading feedback analytics: {str(e)}")
+
+@app.get("/outputs")
+async def list_outputs(
+    platform: str = None,
+    use_case: str = None,
+    label: str = None,
+    min_rating: int = Query(None, ge=1, le=5),
+    max_rating: int = Query(None, ge=1, le=5),
+    since: datetime = None,
+    until: datetime = None,
+    topic: str = None,
+    sort: str = Query("timestamp", pattern="^(timestamp|engagement)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = None,
+    include_content: bool = False,
+):
+    """Filter and page through stored outputs; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    def page():
+        items, next_cursor = catalog.query(
+            platform=platform, use_case=use_case, label=label, min_rating=min_rating, max_rating=max_rating,
+            since=since.isoformat() if since else None, until=until.isoformat() if until else None,
+            topic=topic, sort=sort, order=order, limit=limit, cursor=cursor,
+        )
+        if include_content:
+            records = get_archive().get_many([item["output_id"] for item in items])
+            for item in items:
+                record = records.get(item["output_id"])
+                item["content"] = record["content"] if record else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    try:
+        # Off the loop: up to `limit` archive reads
+        return await asyncio.to_thread(page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error listing outputs")
+        raise HTTPException(status_code=500, detail=f"Error listing outputs: {str(e)}")
+
+@app.get("/export/outputs")
+async def export_outputs(
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$"),
+    platform: str = None,
+    label: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    include_embeddings: bool = False,
+):
+    """Stream stored outputs with their feedback as NDJSON or Parquet, page by page."""
+    if format == "parquet" and not exporter.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+    pages = exporter.iter_pages(
+        retriever, catalog, platform=platform, label=label,
+        since=since.isoformat() if since else None, until=until.isoformat() if until else None,
+        include_embeddings=include_embeddings,
+    )
+    if format == "parquet":
+        return StreamingResponse(
+            exporter.iter_parquet(pages, include_embeddings),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": "attachment; filename=outputs.parquet"},
+        )
+    return StreamingResponse(exporter.iter_ndjson(pages), media_type="application/x-ndjson")
 
 def determine_label(feedback: FeedbackRequest) -> str:
-    if feedback.rating and feedback.rating >= 4:
-        return "high_engagement"
-    elif feedback.engagement_metrics and feedback.engagement_metrics.get("likes", 0) > 50:
-        return "high_engagement"
-    return "needs_improvement"
+    return feedback_label(feedback.rating, feedback.engagement_metrics)
 
 @app.post("/regenerate_output/")
 async def regenerate_output(request: RegenerateRequest):
@@ -245,30 +719,53 @@ async def regenerate_output(request: RegenerateRequest):
         data = retriever.get_output(request.output_id)
         if not data:
             raise HTTPException(status_code=404, detail="Output not found")
-        meta = data["metadata"]
+        meta = dict(data["metadata"])
         platform = meta.get("platform")
         use_case = "content" if platform in ["facebook", "instagram", "linkedin"] else "strategy"
-        chain_map = {
-            "instagram": InstagramContentChain,
-            "facebook": FacebookContentChain,
-            "linkedin": LinkedInContentChain,
-            "all": LinkedInContentChain,
-        }
-        chain_cls = chain_map.get(platform, LinkedInContentChain)
-        chain = chain_cls()
-        # Build args based on metadata
-        generate_args = meta.copy()
-        # remove keys not expected
-        for key in ["output_id", "platform", "timestamp", "seo_score", "feedback"]:
-            generate_args.pop(key, None)
-        new_output = await chain.generate(mode=use_case, **generate_args)
+        generation = data.get("generation")
+        if generation is None:
+            # Outputs from an earlier process: the archive keeps their generation record
+            archived = await asyncio.to_thread(get_archive().get, request.output_id)
+            generation = (archived or {}).get("generation")
+        if generation:
+            # Inputs are unchanged: reuse the stored context and examples and go straight to the completion
+            rag_chain = get_rag_chain(use_case=generation["use_case"], platform=generation["platform"])
+            ranked = await rag_chain.acomplete(generation["prompt_inputs"], n=request.n)
+            generation = {**generation, "candidates": ranked}
+        else:
+            chain_map = {
+                "instagram": InstagramContentChain,
+                "facebook": FacebookContentChain,
+                "linkedin": LinkedInContentChain,
+                "all": LinkedInContentChain,
+            }
+            chain_cls = chain_map.get(platform, LinkedInContentChain)
+            chain = chain_cls()
+            # Build args based on metadata
+            generate_args = meta.copy()
+            # remove keys not expected
+            for key in ["output_id", "platform", "timestamp", "seo_score", "feedback", "regenerated_from"]:
+                generate_args.pop(key, None)
+            await chain.generate(mode=use_case, n=request.n, **generate_args)
+            generation = chain.last_generation
+        new_output = generation["candidates"][0][0]
+        is_valid, message = validate_content(new_output, generation["use_case"])
         # store as new record
         new_id = str(uuid.uuid4())
         meta["output_id"] = new_id
         meta["regenerated_from"] = request.output_id
         meta["timestamp"] = datetime.utcnow().isoformat()
-        retriever.store_output(new_output, meta)
-        return {"output_id": new_id, "content": new_output}
+        meta["seo_score"] = float(is_valid)
+        meta.pop("feedback", None)
+        category = f"{platform}_contents" if use_case == "content" else "strategies"
+        await store_output(new_output, meta, category, f"{category}_regenerated", generation=generation)
+        return {
+            "output_id": new_id,
+            "content": new_output,
+            "validation_passed": is_valid,
+            "validation_message": message,
+            "alternatives": alternatives(generation),
+        }
     except Exception as e:
         logger.exception("Error regenerating output")
-        raise HTTPException(status_code=500, detail=f"Error regenerating output: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=error_status(e), detail=f"Error regenerating output: {str(e)}")
@@ -1,31 +1,56 @@
-from pydantic import BaseModel
-from typing import List, Literal
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from src.chains.calendar_chain import MAX_CALENDAR_DAYS
 
 class StrategyRequest(BaseModel):
     platforms: List[str]
     content_goals: str
+    sectioned: bool = True  # generate sections in parallel (False: single completion)
 
 class InstagramPostRequest(BaseModel):
     content_topic: str
     tone: str
     persona: str
     length: Literal['short', 'medium', 'long'] | str = 'medium'
+    n: int = Field(1, ge=1, le=5)  # candidates requested in one call; best is returned
 
 class FacebookPostRequest(BaseModel):
     content_topic: str
     tone: str
     audience: str
     length: Literal['short', 'medium', 'long'] | str = 'medium'
+    n: int = Field(1, ge=1, le=5)  # candidates requested in one call; best is returned
 
 class LinkedInPostRequest(BaseModel):
     content_topic: str
     tone: str
     professional_insight: str
     length: Literal['short', 'medium', 'long'] | str = 'medium'
+    n: int = Field(1, ge=1, le=5)  # candidates requested in one call; best is returned
 
 class CalendarRequest(BaseModel):
     brand_summary: str
     topic_list: List[str]
+    days: int = Field(7, ge=1, le=MAX_CALENDAR_DAYS)
+    platforms: List[str] = ["instagram", "facebook", "linkedin"]
 
 class RegenerateRequest(BaseModel):
-    output_id: str
\ No newline at end of file
+    output_id: str
+    n: int = Field(1, ge=1, le=5)  # candidates requested in one call; best is returned
+
+class PlatformVariantParams(BaseModel):
+    tone: str = "neutral"
+    length: Literal['short', 'medium', 'long'] | str = 'medium'
+    persona: Optional[str] = None  # instagram
+    audience: Optional[str] = None  # facebook
+    professional_insight: Optional[str] = None  # linkedin
+
+class MultiPlatformRequest(BaseModel):
+    content_topic: str
+    platforms: Dict[str, PlatformVariantParams]  # e.g. {"linkedin": {...}, "instagram": {...}}
+    stream: bool = False
+
+class JobRequest(BaseModel):
+    kind: str  # instagram_content, facebook_content, linkedin_content, content_strategy, calendar
+    payload: Dict  # the request body of the matching /generate_* endpoint
+    webhook_url: Optional[str] = None  # receives the job (as from GET /jobs/{job_id}) once it finishes
@@ -0,0 +1,57 @@
+"""Request ids and one structured summary record per HTTP request."""
+import logging
+import time
+import uuid
+
+from src.logging_config import request_context
+from src.metrics import metrics
+
+logger = logging.getLogger("api.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestLoggingMiddleware:
+    """ASGI middleware binding a request id (the caller's ``X-Request-ID`` or a new one).
+
+    The id is returned in the ``X-Request-ID`` response header and attached to
+    every record logged while the request runs; when it finishes one record
+    with method, path, status, duration and the request's stage timings is
+    logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]}
+            await send(message)
+
+        started = time.perf_counter()
+        with request_context(request_id) as stages:
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                metrics.observe("http.request_seconds", duration_ms / 1000)
+                logger.info(
+                    f"{scope['method']} {scope['path']} {status} {duration_ms}ms",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": duration_ms,
+                        "stages": dict(stages),
+                    },
+                )
@@ -0,0 +1,113 @@
+"""Shared HTTP client for the Streamlit dashboards.
+
+One pooled ``requests.Session`` per API URL is shared by every browser
+session of the Streamlit process, and generation calls run on a small
+bounded thread pool, so the load a dashboard puts on the API is capped no
+matter how many users have it open. Long generations are submitted in the
+background and polled from ``st.session_state`` instead of blocking the
+script run.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("DASHBOARD_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("DASHBOARD_READ_TIMEOUT", "15"))
+GENERATION_TIMEOUT = float(os.getenv("DASHBOARD_GENERATION_TIMEOUT", "180"))
+# Concurrent generation requests from this Streamlit process; extra submissions queue here
+MAX_INFLIGHT = int(os.getenv("DASHBOARD_MAX_INFLIGHT", "4"))
+READ_CACHE_TTL = int(os.getenv("DASHBOARD_READ_CACHE_TTL", "30"))
+POLL_INTERVAL = float(os.getenv("DASHBOARD_POLL_INTERVAL", "1.0"))
+
+
+class ApiClient:
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        # Only idempotent reads are retried; generations are never replayed
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_INFLIGHT * 2, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=MAX_INFLIGHT, thread_name_prefix="api-client")
+
+    def get(self, path: str, params: dict | None = None, timeout: float = READ_TIMEOUT) -> requests.Response:
+        return self.session.get(f"{self.base_url}{path}", params=params, timeout=(CONNECT_TIMEOUT, timeout))
+
+    def post(self, path: str, payload: dict, timeout: float = GENERATION_TIMEOUT) -> requests.Response:
+        return self.session.post(f"{self.base_url}{path}", json=payload, timeout=(CONNECT_TIMEOUT, timeout))
+
+    def submit(self, path: str, payload: dict, timeout: float = GENERATION_TIMEOUT):
+        """Run ``post`` on the bounded pool and return its future."""
+        return self.executor.submit(self.post, path, payload, timeout)
+
+    def stream(self, path: str, payload: dict, timeout: float = GENERATION_TIMEOUT):
+        """Yield parsed NDJSON events from a streaming endpoint."""
+        with self.session.post(
+            f"{self.base_url}{path}", json=payload, stream=True, timeout=(CONNECT_TIMEOUT, timeout)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+
+@st.cache_resource
+def get_client(base_url: str) -> ApiClient:
+    return ApiClient(base_url)
+
+
+@st.cache_data(ttl=READ_CACHE_TTL, show_spinner=False)
+def cached_get(base_url: str, path: str, params: tuple = ()) -> dict:
+    """Read-only call cached for a few seconds across reruns and sessions.
+
+    ``params`` is a tuple of ``(key, value)`` pairs so it can be hashed.
+    """
+    response = get_client(base_url).get(path, params=dict(params))
+    response.raise_for_status()
+    return response.json()
+
+
+def error_detail(response: requests.Response) -> str:
+    try:
+        return response.json().get("detail", "Error")
+    except ValueError:
+        return f"Error {response.status_code}"
+
+
+def submit_background(key: str, client: ApiClient, path: str, payload: dict):
+    """Start a generation without blocking the script; collect it with ``take_result``."""
+    st.session_state[key] = client.submit(path, payload)
+
+
+def is_pending(key: str) -> bool:
+    future = st.session_state.get(key)
+    return future is not None and not future.done()
+
+
+def take_result(key: str):
+    """Return ``(response, error)`` once the background call for ``key`` finished, else None."""
+    future = st.session_state.get(key)
+    if future is None or not future.done():
+        return None
+    del st.session_state[key]
+    try:
+        return future.result(), None
+    except requests.RequestException as e:
+        return None, str(e)
+
+
+def poll_pending(keys):
+    """Call at the end of the script: rerun shortly while any background call is pending."""
+    if any(is_pending(key) for key in keys):
+        time.sleep(POLL_INTERVAL)
+        if hasattr(st, "rerun"):
+            st.rerun()
+        else:
+            st.experimental_rerun()
@@ -1,13 +1,15 @@
 import streamlit as st
-import requests
 import pandas as pd
-import json
-import os
+
+from api_client import (
+    cached_get, error_detail, get_client, is_pending, poll_pending, submit_background, take_result, READ_TIMEOUT,
+)
 
 st.set_page_config(page_title="Productimate.io Dashboard", layout="wide")
 
 # API base URL
 API_URL = "http://localhost:8000"
+client = get_client(API_URL)
 
 st.title("Productimate.io Content Generation & Feedback")
 
@@ -23,48 +25,50 @@ content_goals = st.text_input("Content Goals (for Strategy)", "Increase engageme
 brand_summary = st.text_input("Brand Summary (for Calendar)", "SEO-focused SaaS")
 topic_list = st.text_input("Topic List (for Calendar)", "SEO, conversions, website optimization")
 
-if st.button("Generate"):
-    try:
-        if platform == "Instagram":
-            response = requests.post(f"{API_URL}/generate_instagram_content/", json={
-                "content_topic": content_topic,
-                "tone": tone,
-                "persona": persona
-            })
-        elif platform == "Facebook":
-            response = requests.post(f"{API_URL}/generate_facebook_content/", json={
-                "content_topic": content_topic,
-                "tone": tone,
-                "audience": audience
-            })
-        elif platform == "LinkedIn":
-            response = requests.post(f"{API_URL}/generate_linkedin_content/", json={
-                "content_topic": content_topic,
-                "tone": tone,
-                "professional_insight": professional_insight
-            })
-        elif platform == "Strategy":
-            response = requests.post(f"{API_URL}/generate_content_strategy/", json={
-                "platforms": ["all"],
-                "content_goals": content_goals
-            })
-        else:  # Calendar
-            response = requests.post(f"{API_URL}/generate_calendar/", json={
-                "brand_summary": brand_summary,
-                "topic_list": topic_list
-            })
-        
+# Endpoint and response field of each generation type
+GENERATORS = {
+    "Instagram": ("/generate_instagram_content/", "instagram_caption"),
+    "Facebook": ("/generate_facebook_content/", "facebook_post"),
+    "LinkedIn": ("/generate_linkedin_content/", "linkedin_post"),
+    "Strategy": ("/generate_content_strategy/", "content_strategy"),
+    "Calendar": ("/generate_calendar/", "calendar"),
+}
+# Background generation jobs, polled at the end of every script run
+JOB_KEYS = ["generate_job"]
+
+if st.button("Generate", disabled=is_pending("generate_job")):
+    if platform == "Instagram":
+        payload = {"content_topic": content_topic, "tone": tone, "persona": persona}
+    elif platform == "Facebook":
+        payload = {"content_topic": content_topic, "tone": tone, "audience": audience}
+    elif platform == "LinkedIn":
+        payload = {"content_topic": content_topic, "tone": tone, "professional_insight": professional_insight}
+    elif platform == "Strategy":
+        payload = {"platforms": ["all"], "content_goals": content_goals}
+    else:  # Calendar
+        payload = {"brand_summary": brand_summary, "topic_list": [t.strip() for t in topic_list.split(",") if t.strip()]}
+    path, content_key = GENERATORS[platform]
+    st.session_state["generate_field"] = content_key
+    submit_background("generate_job", client, path, payload)
+
+finished = take_result("generate_job")
+if finished is None:
+    if is_pending("generate_job"):
+        st.info("Generating ...")
+else:
+    response, error = finished
+    if error:
+        st.error(f"Error generating content: {error}")
+    elif not response.ok:
+        st.error(f"Error generating content: {error_detail(response)}")
+    else:
         result = response.json()
         st.session_state["output_id"] = result["output_id"]
-        st.write("**Generated Content:**")
-        content_key = "instagram_caption" if platform == "Instagram" else \
-                      "facebook_post" if platform == "Facebook" else \
-                      "linkedin_post" if platform == "LinkedIn" else \
-                      "content_strategy" if platform == "Strategy" else \
-                      "calendar"
-        st.write(result[content_key])
-    except Exception as e:
-        st.error(f"Error generating content: {str(e)}")
+        st.session_state["generated"] = result[st.session_state["generate_field"]]
+
+if "generated" in st.session_state:
+    st.write("**Generated Content:**")
+    st.write(st.session_state["generated"])
 
 # Feedback Submission
 st.header("Submit Feedback")
@@ -76,45 +80,41 @@ shares = st.number_input("Shares (Engagement)", 0, 1000, 0)
 
 if st.button("Submit Feedback"):
     try:
-        response = requests.post(f"{API_URL}/submit_feedback/", json={
+        response = client.post("/submit_feedback/", {
             "output_id": output_id,
             "rating": rating,
             "comment": comment,
             "engagement_metrics": {"likes": likes, "shares": shares}
-        })
+        }, timeout=READ_TIMEOUT)
         st.success(response.json()["message"])
+        cached_get.clear()  # show the new aggregates right away
     except Exception as e:
         st.error(f"Error submitting feedback: {str(e)}")
 
 # Metrics Visualization
 st.header("Performance Metrics")
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-feedback_dir = os.path.join(project_root, "data", "output", "feedback_data")
-feedback_files = [f for f in os.listdir(feedback_dir) if f.startswith("feedback_")]
-if feedback_files:
-    feedback_data = []
-    for file in feedback_files:
-        with open(os.path.join(feedback_dir, file), "r") as f:
-            feedback_data.extend(json.load(f))
-    
-    df = pd.DataFrame([
-        {
-            "Platform": d["metadata"]["platform"],
-            "Rating": d["metadata"]["feedback"].get("rating", None),
-            "Likes": d["metadata"]["feedback"].get("engagement_metrics", {}).get("likes", 0),
-            "Shares": d["metadata"]["feedback"].get("engagement_metrics", {}).get("shares", 0),
-            "Timestamp": d["metadata"]["timestamp"]
-        }
-        for d in feedback_data if "feedback" in d["metadata"]
-    ])
-    
+try:
+    # Aggregates are maintained by the API as feedback arrives; nothing is recomputed here
+    analytics = cached_get(API_URL, "/analytics/feedback", (("days", 90),))
+except Exception as e:
+    analytics = None
+    st.error(f"Error loading feedback analytics: {str(e)}")
+
+if analytics and analytics["platforms"]:
+    platforms_df = pd.DataFrame(analytics["platforms"]).set_index("platform")
+
     st.write("**Feedback Summary**")
-    st.dataframe(df)
-    
+    st.dataframe(platforms_df)
+    st.write(pd.Series(analytics["labels"], name="Outputs"))
+
     st.write("**Average Rating by Platform**")
-    st.bar_chart(df.groupby("Platform")["Rating"].mean())
-    
+    st.bar_chart(platforms_df["average_rating"])
+
     st.write("**Engagement Trends**")
-    st.line_chart(df[["Likes", "Shares"]])
-else:
-    st.write("No feedback data available.")
\ No newline at end of file
+    engagement_df = pd.DataFrame(analytics["engagement"])
+    if not engagement_df.empty:
+        st.line_chart(engagement_df.groupby("day")[["likes", "shares"]].sum())
+elif analytics is not None:
+    st.write("No feedback data available.")
+
+poll_pending(JOB_KEYS)
@@ -1,12 +1,52 @@
 import streamlit as st
-import requests
-from functools import partial
 import os
 
+from api_client import (
+    error_detail, get_client, is_pending, poll_pending, submit_background, take_result, READ_TIMEOUT,
+)
+
 API_URL = os.getenv("CONTENT_API_URL", "https://productimate-content-generator.onrender.com")
 
 st.set_page_config(page_title="Productimate Content Generator", layout="wide")
 
+client = get_client(API_URL)
+# Background generation jobs, polled at the end of every script run
+JOB_KEYS = ["ig_job", "fb_job", "li_job", "calendar_job", "regen_job"]
+
+
+def collect(job_key: str, output_key: str, content_field: str, label: str = "Generating ..."):
+    """Move a finished background job into ``st.session_state[output_key]``."""
+    finished = take_result(job_key)
+    if finished is None:
+        if is_pending(job_key):
+            st.info(label)
+        return
+    r, error = finished
+    if error:
+        st.error(error)
+    elif not r.ok:
+        st.error(error_detail(r))
+    else:
+        data = r.json()
+        st.session_state[output_key] = {
+            "content": data.get(content_field, data.get("content")),
+            "output_id": data["output_id"],
+            "validation_passed": data.get("validation_passed", True),
+        }
+        st.success("Generated!")
+
+
+def show_output(output_key: str, label: str, job_key: str):
+    if output_key not in st.session_state:
+        return
+    data = st.session_state[output_key]
+    st.text_area(label, data["content"], height=200, key=f"{output_key}_text")
+    st.write("Output ID:", data["output_id"])
+    if not data.get("validation_passed", True):
+        st.warning("This output did not pass SEO validation. Consider regenerating.")
+        if st.button("Regenerate", key=f"regen_{output_key}", disabled=is_pending(job_key)):
+            submit_background(job_key, client, "/regenerate_output/", {"output_id": data["output_id"]})
+
 # ---- Custom CSS for enhanced design with new color scheme and effects ----
 custom_css = """
 <style>
@@ -128,11 +168,11 @@ if st.sidebar.button("Star & Promote", key="promote_btn"):
             "engagement_metrics": {"likes": 100}
         }
         try:
-            r = requests.post(f"{API_URL}/submit_feedback/", json=payload)
+            r = client.post("/submit_feedback/", payload, timeout=READ_TIMEOUT)
             if r.ok:
                 st.sidebar.success("Promoted! Now in RAG context.")
             else:
-                st.sidebar.error(r.json().get("detail", "Error"))
+                st.sidebar.error(error_detail(r))
         except Exception as e:
             st.sidebar.error(str(e))
     else:
@@ -152,11 +192,12 @@ if st.sidebar.button("(Re)Build RAG Index"):
         tmp_path = "tmp_brochure.pdf"
         with open(tmp_path, "wb") as f:
             f.write(brochure_file.getbuffer())
-        resp = requests.post(f"{API_URL}/rebuild_index/", params={"overwrite": True})
+        with st.spinner("Rebuilding index ..."):
+            resp = client.session.post(f"{client.base_url}/rebuild_index/", params={"overwrite": True}, timeout=(5, 600))
         if resp.status_code == 200:
             st.sidebar.success("Index rebuilt successfully!")
         else:
-            st.sidebar.error(resp.json().get("detail", "Error rebuilding index"))
+            st.sidebar.error(error_detail(resp))
     else:
         st.sidebar.warning("Please upload a brochure first.")
 
@@ -180,37 +221,15 @@ with choice[0]:
         tone = st.selectbox("Tone", ["neutral", "fun", "professional", "inspirational"], help="Select the tone that matches your brand voice.")
         persona = st.text_input("Persona", placeholder="e.g., Startup Founder, Fitness Coach", help="Specify the target audience or persona for the caption.")
 
-        if "ig_generating" not in st.session_state:
-            st.session_state.ig_generating = False
-
-        generate_clicked = st.button("Generate Instagram Caption", disabled=st.session_state.ig_generating)
+        generate_clicked = st.button("Generate Instagram Caption", disabled=is_pending("ig_job"))
         if generate_clicked:
             if not topic.strip():
                 st.error("Please provide a content topic.")
             else:
-                st.session_state.ig_generating = True
                 payload = {"content_topic": topic, "tone": tone, "persona": persona, "length": length}
-                with st.spinner("Generating caption ..."):
-                    r = requests.post(f"{API_URL}/generate_instagram_content/", json=payload)
-                st.session_state.ig_generating = False
-                if r.ok:
-                    data = r.json()
-                    st.success("Generated!")
-                    st.text_area("Caption", data["instagram_caption"], height=200)
-                    st.write("Output ID:", data["output_id"])
-                    if not data.get("validation_passed", True):
-                        st.warning("This caption did not pass SEO validation. Consider regenerating.")
-                        if st.button("Regenerate", key=f"regen_ig_{data['output_id']}"):
-                            regen_resp = requests.post(f"{API_URL}/regenerate_output/", json={"output_id": data["output_id"]})
-                            if regen_resp.ok:
-                                regen_data = regen_resp.json()
-                                st.success("Regenerated!")
-                                st.text_area("New Caption", regen_data["content"], height=200)
-                                st.write("New Output ID:", regen_data["output_id"])
-                            else:
-                                st.error(regen_resp.json().get("detail", "Error"))
-                else:
-                    st.error(r.json().get("detail", "Error"))
+                submit_background("ig_job", client, "/generate_instagram_content/", payload)
+        collect("ig_job", "ig_last_output", "instagram_caption", "Generating caption ...")
+        show_output("ig_last_output", "Caption", "ig_job")
 
 # Tab 1 – Facebook
 with choice[1]:
@@ -222,37 +241,15 @@ with choice[1]:
         tone = st.selectbox("Tone", ["neutral", "casual", "professional"], key="fb_tone", help="Select the tone for the post.")
         audience = st.text_input("Audience", key="fb_aud", placeholder="e.g., Small Business Owners", help="Specify the target audience for the post.")
 
-        if "fb_generating" not in st.session_state:
-            st.session_state.fb_generating = False
-
-        fb_clicked = st.button("Generate Facebook Post", disabled=st.session_state.fb_generating)
+        fb_clicked = st.button("Generate Facebook Post", disabled=is_pending("fb_job"))
         if fb_clicked:
             if not topic.strip():
                 st.error("Please provide a content topic.")
             else:
-                st.session_state.fb_generating = True
                 payload = {"content_topic": topic, "tone": tone, "audience": audience, "length": length_fb}
-                with st.spinner("Generating post ..."):
-                    r = requests.post(f"{API_URL}/generate_facebook_content/", json=payload)
-                st.session_state.fb_generating = False
-                if r.ok:
-                    data = r.json()
-                    st.success("Generated!")
-                    st.text_area("Post", data["facebook_post"], height=200)
-                    st.write("Output ID:", data["output_id"])
-                    if not data.get("validation_passed", True):
-                        st.warning("This post did not pass SEO validation. Consider regenerating.")
-                        if st.button("Regenerate", key=f"regen_fb_{data['output_id']}"):
-                            regen_resp = requests.post(f"{API_URL}/regenerate_output/", json={"output_id": data["output_id"]})
-                            if regen_resp.ok:
-                                regen_data = regen_resp.json()
-                                st.success("Regenerated!")
-                                st.text_area("New Post", regen_data["content"], height=200)
-                                st.write("New Output ID:", regen_data["output_id"])
-                            else:
-                                st.error(regen_resp.json().get("detail", "Error"))
-                else:
-                    st.error(r.json().get("detail", "Error"))
+                submit_background("fb_job", client, "/generate_facebook_content/", payload)
+        collect("fb_job", "fb_last_output", "facebook_post", "Generating post ...")
+        show_output("fb_last_output", "Post", "fb_job")
 
 # Tab 2 – LinkedIn
 with choice[2]:
@@ -303,48 +300,15 @@ with choice[2]:
             unsafe_allow_html=True
         )
 
-        if "li_generating" not in st.session_state:
-            st.session_state.li_generating = False
-
-        li_clicked = st.button("Generate LinkedIn Post", disabled=st.session_state.li_generating)
+        li_clicked = st.button("Generate LinkedIn Post", disabled=is_pending("li_job"))
         if li_clicked:
             if not topic.strip() or not insight.strip():
                 st.error("Please provide both a content topic and a professional insight.")
             else:
-                st.session_state.li_generating = True
                 payload = {"content_topic": topic, "tone": tone, "professional_insight": insight, "length": length_li}
-                with st.spinner("Generating post ..."):
-                    r = requests.post(f"{API_URL}/generate_linkedin_content/", json=payload)
-                st.session_state.li_generating = False
-                if r.ok:
-                    st.session_state.li_last_output = r.json()
-                else:
-                    st.error(r.json().get("detail", "Error"))
-
-        # Show last generated LinkedIn content if available
-        if "li_last_output" in st.session_state:
-            data = st.session_state.li_last_output
-            st.code(data["linkedin_post"], language="markdown")
-            st.write("Output ID:", data["output_id"])
-            if not data.get("validation_passed", True):
-                st.warning("This post did not pass SEO validation. Consider regenerating.")
-                if st.button("Regenerate", key=f"regen_li_{data['output_id']}"):
-                    with st.spinner("Regenerating ..."):
-                        regen_resp = requests.post(f"{API_URL}/regenerate_output/", json={"output_id": data["output_id"]})
-                    if regen_resp.ok:
-                        regen_data = regen_resp.json()
-                        st.session_state.li_last_output = {
-                            "linkedin_post": regen_data["content"],
-                            "output_id": regen_data["output_id"],
-                            "validation_passed": regen_data.get("validation_passed", True)
-                        }
-                        st.success("Regenerated!")
-                        if hasattr(st, "rerun"):
-                            st.rerun()
-                        elif hasattr(st, "experimental_rerun"):
-                            st.experimental_rerun()
-                    else:
-                        st.error(regen_resp.json().get("detail", "Error"))
+                submit_background("li_job", client, "/generate_linkedin_content/", payload)
+        collect("li_job", "li_last_output", "linkedin_post", "Generating post ...")
+        show_output("li_last_output", "Post", "li_job")
 
 # Tab 3 – Content Strategy
 with choice[3]:
@@ -362,23 +326,28 @@ with choice[3]:
             help="Specify your marketing goals for the strategy."
         )
 
-        if "strategy_generating" not in st.session_state:
-            st.session_state.strategy_generating = False
-
-        strat_clicked = st.button("Generate Strategy", disabled=st.session_state.strategy_generating)
+        strat_clicked = st.button("Generate Strategy")
         if strat_clicked:
             if not platforms or not goals.strip():
                 st.error("Please select at least one platform and provide content goals.")
             else:
-                st.session_state.strategy_generating = True
                 payload = {"platforms": platforms, "content_goals": goals}
-                with st.spinner("Generating strategy ..."):
-                    r = requests.post(f"{API_URL}/generate_content_strategy/", json=payload)
-                st.session_state.strategy_generating = False
-                if r.ok:
-                    st.session_state.strategy_last_output = r.json()
-                else:
-                    st.error(r.json().get("detail", "Error"))
+                # Sections are streamed as they are written and shown in order
+                placeholder = st.empty()
+                sections = {}
+                try:
+                    for event in client.stream("/generate_content_strategy/stream", payload):
+                        if "error" in event:
+                            st.error(event["error"])
+                        elif event.get("done"):
+                            st.session_state.strategy_last_output = event
+                        else:
+                            sections[event["section"]] = event["content"]
+                            placeholder.markdown("\n\n".join(sections[n] for n in sorted(sections)))
+                except Exception as e:
+                    st.error(f"Error generating strategy: {str(e)}")
+                if "strategy_last_output" in st.session_state:
+                    placeholder.empty()
 
         if "strategy_last_output" in st.session_state:
             data = st.session_state.strategy_last_output
@@ -401,27 +370,18 @@ with choice[4]:
             help="Enter topics for the content calendar, separated by commas."
         )
 
-        if "calendar_generating" not in st.session_state:
-            st.session_state.calendar_generating = False
-
-        cal_clicked = st.button("Generate Calendar", disabled=st.session_state.calendar_generating)
+        cal_clicked = st.button("Generate Calendar", disabled=is_pending("calendar_job"))
         if cal_clicked:
             if not summary.strip() or not topics.strip():
                 st.error("Please provide a brand summary and topic list.")
             else:
-                st.session_state.calendar_generating = True
                 payload = {"brand_summary": summary, "topic_list": [t.strip() for t in topics.split(",") if t.strip()]}
-                with st.spinner("Generating calendar ..."):
-                    r = requests.post(f"{API_URL}/generate_calendar/", json=payload)
-                st.session_state.calendar_generating = False
-                if r.ok:
-                    st.session_state.calendar_last_output = r.json()
-                else:
-                    st.error(r.json().get("detail", "Error"))
+                submit_background("calendar_job", client, "/generate_calendar/", payload)
+        collect("calendar_job", "calendar_last_output", "calendar", "Generating calendar ...")
 
         if "calendar_last_output" in st.session_state:
             data = st.session_state.calendar_last_output
-            st.code(data["calendar"], language="markdown")
+            st.code(data["content"], language="markdown")
             st.write("Output ID:", data["output_id"])
 
 # Tab 5 – Feedback / Regenerate
@@ -445,22 +405,19 @@ with choice[5]:
                         "comment": comment,
                         "engagement_metrics": {"likes": likes},
                     }
-                    r = requests.post(f"{API_URL}/submit_feedback/", json=payload)
+                    r = client.post("/submit_feedback/", payload, timeout=READ_TIMEOUT)
                     if r.ok:
                         st.success("Feedback submitted!")
                     else:
-                        st.error(r.json().get("detail", "Error"))
+                        st.error(error_detail(r))
         st.markdown("---")
         regen_id = st.text_input("Regenerate from Output ID", placeholder="Enter the Output ID to regenerate", help="Enter the ID of the content to regenerate.")
-        if st.button("Regenerate"):
+        if st.button("Regenerate", disabled=is_pending("regen_job")):
             if not regen_id.strip():
                 st.error("Please provide an Output ID.")
             else:
-                r = requests.post(f"{API_URL}/regenerate_output/", json={"output_id": regen_id})
-                if r.ok:
-                    data = r.json()
-                    st.success("Regenerated!")
-                    st.text_area("New Content", data["content"], height=200)
-                    st.write("New Output ID:", data["output_id"])
-                else:
-                    st.error(r.json().get("detail", "Error"))
\ No newline at end of file
+                submit_background("regen_job", client, "/regenerate_output/", {"output_id": regen_id})
+        collect("regen_job", "regen_last_output", "content", "Regenerating ...")
+        show_output("regen_last_output", "New Content", "regen_job")
+
+poll_pending(JOB_KEYS)
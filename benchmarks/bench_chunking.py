@@ -0,0 +1,129 @@
+"""Chunking strategies compared: index size, build time, retrieval hit rate and context tokens.
+
+Each strategy in ``src.loaders.chunking.CHUNKERS`` chunks the same sources
+(the brochure by default), which are embedded into a FAISS index. Every query
+in the labeled set (``benchmarks/chunking_queries.json``) counts as a hit when
+its expected phrase appears in one of the top ``k`` chunks; context tokens are
+those of the top ``k`` chunks, i.e. what retrieval would put in the prompt.
+
+Embeddings default to a local feature-hashing model (no API key, deterministic,
+lexical), so the numbers compare chunk boundaries rather than embedding
+quality; ``--openai`` uses the configured OpenAI embeddings instead.
+
+    python -m benchmarks.bench_chunking --k 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from src.loaders.bm25 import tokenize
+from src.loaders.chunking import CHUNKERS
+from src.loaders.context_assembler import count_tokens
+from src.loaders.ingest import parse_and_chunk
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BROCHURE = os.path.join(ROOT, "data", "Productimate Brochure.pdf")
+QUERIES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chunking_queries.json")
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag of unigrams and bigrams hashed into ``dim`` buckets, L2-normalised."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        terms = tokenize(text)
+        for term in terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]:
+            vector[zlib.crc32(term.encode()) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def _directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def _contains(text: str, phrase: str) -> bool:
+    # Word-per-line PDF text is compared on collapsed whitespace
+    return " ".join(phrase.lower().split()) in " ".join(text.lower().split())
+
+
+def run(strategy: str, sources: list[str], queries: list[dict], embeddings, k: int) -> dict:
+    started = time.perf_counter()
+    chunks = [chunk for source in sources for chunk in parse_and_chunk(source, strategy)]
+    store = FAISS.from_texts([text for text, _ in chunks], embeddings, metadatas=[m for _, m in chunks])
+    build_seconds = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as index_dir:
+        store.save_local(index_dir)
+        index_bytes = _directory_bytes(index_dir)
+
+    hits, context_tokens, search_seconds = 0, 0, 0.0
+    for item in queries:
+        started = time.perf_counter()
+        docs = store.similarity_search(item["query"], k=k)
+        search_seconds += time.perf_counter() - started
+        hits += any(_contains(doc.page_content, item["expected"]) for doc in docs)
+        context_tokens += sum(count_tokens(doc.page_content) for doc in docs)
+    return {
+        "strategy": strategy,
+        "chunks": len(chunks),
+        "avg_chunk_chars": round(sum(len(text) for text, _ in chunks) / max(1, len(chunks))),
+        "index_kb": round(index_bytes / 1024, 1),
+        "build_seconds": round(build_seconds, 3),
+        "hit_rate": round(hits / len(queries), 3),
+        "avg_context_tokens": round(context_tokens / len(queries), 1),
+        "search_ms": round(1000 * search_seconds / len(queries), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sources", nargs="*", default=[BROCHURE], help="Files to chunk (default: the brochure)")
+    parser.add_argument("--queries", default=QUERIES, help="JSON list of {query, expected} items")
+    parser.add_argument("--strategies", default=",".join(CHUNKERS))
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--openai", action="store_true", help="Use OpenAI embeddings instead of local hashing")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = json.load(f)
+    if args.openai:
+        from src.openai_clients import get_embeddings
+        embeddings = get_embeddings()
+    else:
+        embeddings = HashingEmbeddings()
+
+    results = [run(strategy.strip(), args.sources, queries, embeddings, args.k)
+               for strategy in args.strategies.split(",")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(queries)} queries, top-{args.k}")
+    print(f"{'strategy':<10}{'chunks':>8}{'avg chars':>11}{'index KB':>10}{'build s':>9}"
+          f"{'hit rate':>10}{'ctx tokens':>12}{'search ms':>11}")
+    for r in results:
+        print(f"{r['strategy']:<10}{r['chunks']:>8}{r['avg_chunk_chars']:>11}{r['index_kb']:>10}"
+              f"{r['build_seconds']:>9.3f}{r['hit_rate']:>10.0%}{r['avg_context_tokens']:>12}{r['search_ms']:>11}")
+
+
+if __name__ == "__main__":
+    main()
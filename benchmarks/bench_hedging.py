@@ -0,0 +1,82 @@
+"""Tail latency with and without hedged requests, plus circuit-breaker fail-fast.
+
+A local stub OpenAI server answers in ``--delay-ms`` but stalls every
+``--slow-every``-th request for ``--slow-ms``. The second phase makes the stub
+return 503s to show the breaker opening and rejecting calls without waiting.
+
+    python -m benchmarks.bench_hedging --requests 200
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stub_openai import StubOpenAIServer
+from src import resilience
+from src.openai_clients import get_chat_model
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def _run(llm, requests: int, hedge: bool, use_case: str) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await resilience.resilient_call(lambda: llm.ainvoke("Write an SEO post"), use_case=use_case, hedge=hedge)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(label, latencies):
+    print(
+        f"{label:<12} p50={_percentile(latencies, 50) * 1000:7.1f}ms p95={_percentile(latencies, 95) * 1000:7.1f}ms "
+        f"p99={_percentile(latencies, 99) * 1000:7.1f}ms max={max(latencies) * 1000:7.1f}ms "
+        f"mean={statistics.mean(latencies) * 1000:7.1f}ms"
+    )
+
+
+async def _breaker_phase(base_url: str):
+    breaker = resilience.CircuitBreaker("bench", failure_threshold=3, reset_timeout=60)
+    llm = get_chat_model(base_url=base_url, openai_api_key="stub", max_retries=0)
+    for i in range(6):
+        start = time.perf_counter()
+        try:
+            await resilience.resilient_call(lambda: llm.ainvoke("hi"), breaker=breaker, max_retries=0, hedge=False)
+        except Exception as e:
+            print(f"call {i + 1}: {type(e).__name__:<22} {(time.perf_counter() - start) * 1000:6.1f}ms breaker={breaker.state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=30.0)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--slow-every", type=int, default=25)
+    args = parser.parse_args()
+
+    def delay(number):
+        return args.slow_ms / 1000 if number % args.slow_every == 0 else args.delay_ms / 1000
+
+    resilience.HEDGE_MIN_SAMPLES = 10
+    resilience.HEDGE_FALLBACK_DELAY = 3 * args.delay_ms / 1000
+    resilience.HEDGE_MIN_DELAY = 0.0
+    with StubOpenAIServer(delay=delay) as stub:
+        async def run():
+            llm = get_chat_model(base_url=stub.base_url, openai_api_key="stub", max_retries=0)
+            _report("no hedging", await _run(llm, args.requests, hedge=False, use_case="bench_plain"))
+            _report("hedged", await _run(llm, args.requests, hedge=True, use_case="bench_hedged"))
+        asyncio.run(run())
+
+    with StubOpenAIServer(delay=args.delay_ms / 1000, status=lambda number: 503) as stub:
+        asyncio.run(_breaker_phase(stub.base_url))
+
+
+if __name__ == "__main__":
+    main()
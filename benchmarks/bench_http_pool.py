@@ -0,0 +1,73 @@
+"""Connection reuse benchmark: fresh model client per request vs the shared pool.
+
+Runs sequential chat completions against a local stub OpenAI server that adds
+``--handshake-ms`` on every new connection (standing in for TCP + TLS setup).
+
+    python -m benchmarks.bench_http_pool --requests 50 --handshake-ms 40
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from benchmarks.stub_openai import StubOpenAIServer
+from src.openai_clients import get_chat_model
+
+
+async def _run(make_llm, requests: int) -> list[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        llm = make_llm()
+        await llm.ainvoke("Write an SEO post")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(label: str, latencies: list[float], connections: int):
+    print(
+        f"{label:<14} mean={statistics.mean(latencies) * 1000:7.2f}ms "
+        f"p50={statistics.median(latencies) * 1000:7.2f}ms "
+        f"max={max(latencies) * 1000:7.2f}ms connections={connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with StubOpenAIServer(delay=args.delay_ms / 1000, handshake_delay=args.handshake_ms / 1000) as stub:
+        kwargs = {"base_url": stub.base_url, "openai_api_key": "stub", "max_retries": 0}
+
+        before = stub.connections
+        # A model client with its own connection pool, as every per-request
+        # ChatOpenAI(...) construction had before the shared pool
+        fresh = asyncio.run(_run(
+            lambda: ChatOpenAI(model="gpt-4o-mini", http_async_client=httpx.AsyncClient(), **kwargs),
+            args.requests,
+        ))
+        _report("fresh client", fresh, stub.connections - before)
+
+        async def pooled_run():
+            return await _run(lambda: get_chat_model(model="gpt-4o-mini", **kwargs), args.requests)
+
+        before = stub.connections
+        pooled = asyncio.run(pooled_run())
+        _report("shared pool", pooled, stub.connections - before)
+
+    saved = statistics.mean(fresh) - statistics.mean(pooled)
+    print(f"connection setup removed per request: {saved * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
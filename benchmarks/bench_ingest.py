@@ -0,0 +1,113 @@
+"""Ingestion throughput: serial parse + one embedding call at a time vs the parallel pipeline.
+
+Generates a corpus of ``--docs`` local documents (TXT, HTML, JSON and DOCX,
+plus ``--pdf-copies`` copies of the brochure when it is present) and ingests
+it twice against a local stub OpenAI server whose embedding calls take
+``--embed-ms``.
+
+    python -m benchmarks.bench_ingest --docs 300 --embed-ms 80
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import zipfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stub_openai import StubOpenAIServer
+from src.loaders.ingest import INGEST_WORKERS, IngestStats, ingest, scan
+from src.openai_clients import get_embeddings
+
+WORDS = (
+    "seo website builder conversions site speed structured data backlinks content strategy "
+    "audience engagement brand launch campaign analytics growth product customers search ranking"
+).split()
+
+_DOCX_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>'
+)
+
+
+def _paragraphs(rng: random.Random, count: int) -> list[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "." for _ in range(count)]
+
+
+def _write_docx(path: str, paragraphs: list[str]):
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as docx:
+        docx.writestr("[Content_Types].xml", _DOCX_TYPES)
+        docx.writestr("word/document.xml", document)
+
+
+def build_corpus(root: str, docs: int, pdf_copies: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(docs):
+        paragraphs = _paragraphs(rng, rng.randint(4, 12))
+        kind = i % 4
+        if kind == 0:
+            with open(os.path.join(root, f"doc{i}.txt"), "w") as f:
+                f.write("\n\n".join(paragraphs))
+        elif kind == 1:
+            with open(os.path.join(root, f"doc{i}.html"), "w") as f:
+                f.write(f"<html><head><title>Doc {i}</title></head><body>"
+                        + "".join(f"<p>{p}</p>" for p in paragraphs) + "</body></html>")
+        elif kind == 2:
+            with open(os.path.join(root, f"doc{i}.json"), "w") as f:
+                json.dump({"title": f"Doc {i}", "sections": [{"body": p} for p in paragraphs]}, f)
+        else:
+            _write_docx(os.path.join(root, f"doc{i}.docx"), paragraphs)
+    brochure = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "Productimate Brochure.pdf")
+    if os.path.exists(brochure):
+        for i in range(pdf_copies):
+            shutil.copy(brochure, os.path.join(root, f"brochure{i}.pdf"))
+
+
+async def _ingest(paths, stub, **kwargs) -> dict:
+    embeddings = get_embeddings(base_url=stub.base_url, openai_api_key="stub", check_embedding_ctx_length=False)
+    stats = IngestStats()
+    await ingest(paths, embeddings, stats=stats, **kwargs)
+    return stats.as_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--pdf-copies", type=int, default=10)
+    parser.add_argument("--embed-ms", type=float, default=80.0)
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus, StubOpenAIServer(delay=args.embed_ms / 1000, embedding_dim=256) as stub:
+        build_corpus(corpus, args.docs, args.pdf_copies)
+        paths = scan(corpus)
+        print(f"corpus: {len(paths)} files")
+        runs = {
+            "serial": {"workers": 1, "batch_size": args.batch_size, "concurrency": 1},
+            "parallel": {"workers": args.workers, "batch_size": args.batch_size, "concurrency": args.concurrency},
+        }
+        results = {}
+        for label, kwargs in runs.items():
+            results[label] = asyncio.run(_ingest(paths, stub, **kwargs))
+            r = results[label]
+            print(f"{label:<9} files={r['files']} chunks={r['chunks']} time={r['seconds']:.2f}s "
+                  f"throughput={r['chunks_per_second']:.0f} chunks/s ({r['files'] / r['seconds']:.0f} files/s)")
+    print(f"speedup: {results['serial']['seconds'] / results['parallel']['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
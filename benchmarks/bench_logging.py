@@ -0,0 +1,142 @@
+"""Logging cost on the event loop: synchronous DEBUG logging vs the queued JSON setup.
+
+Each simulated request logs what a generation request logs. The ``sync``
+setup mirrors the old configuration (``basicConfig(level=DEBUG)``, the full
+kwargs at DEBUG and the whole generated text printed to stdout); the
+``queued`` setup is ``src.logging_config`` at INFO with sampled payload logs,
+stage timings and one summary record per request. The log stream is a file
+whose writes take ``--sink-ms`` (a slow terminal, pipe or log collector).
+
+Reported per setup: time spent inside logging calls on the event loop per
+request, and the event loop's worst stall while concurrent requests run.
+
+    python -m benchmarks.bench_logging --requests 2000 --sink-ms 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import logging_config
+from src.logging_config import log_payload, request_context, setup_logging, shutdown_logging, stage
+
+PAYLOAD = {
+    "content_topic": "Launching our AI-driven analytics dashboard",
+    "tone": "professional",
+    "professional_insight": "Teams using unified dashboards cut reporting time in half",
+    "length": "medium",
+}
+GENERATED = "Unlock faster insights with SEO-ready analytics. " * 40  # ~2 KB, a typical post
+
+
+class SlowFile:
+    """File wrapper whose writes block for ``delay`` seconds, like a slow stdout consumer."""
+
+    def __init__(self, path: str, delay: float):
+        self._file = open(path, "w", encoding="utf-8")
+        self.delay = delay
+
+    def write(self, text: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _sync_request(logger):
+    logger.debug(f"Entering generate: platform=linkedin, use_case=content, kwargs={PAYLOAD}")
+    logger.debug("Retrieved 12 candidates")
+    print(f"Validating: {GENERATED}, use_case: content, platform: linkedin")
+    logger.info("Stored output")
+
+
+def _queued_request(logger):
+    with request_context("bench"):
+        log_payload(logger, "Entering generate", platform="linkedin", use_case="content", kwargs=PAYLOAD)
+        with stage("retrieval"):
+            logger.debug("Retrieved 12 candidates")
+        log_payload(logger, "Validating output", content=GENERATED, use_case="content", platform="linkedin")
+        logger.info("Stored output", extra={"stages": {"retrieval": 1.0, "generation": 900.0}})
+
+
+async def _run(request, logger, requests: int, concurrency: int) -> tuple[list[float], float]:
+    """Run ``requests`` fake requests; returns the per-request logging times and the worst loop stall."""
+    logging_times, stalls = [], []
+    stop = asyncio.Event()
+
+    async def monitor():
+        # A 1 ms ticker: how late it wakes up is how long the loop was blocked
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started - 0.001)
+
+    async def worker(count: int):
+        for _ in range(count):
+            started = time.perf_counter()
+            request(logger)
+            logging_times.append(time.perf_counter() - started)
+            await asyncio.sleep(0)  # the request's awaits: retrieval, completion, ...
+
+    ticker = asyncio.ensure_future(monitor())
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    stop.set()
+    await ticker
+    return logging_times, max(stalls, default=0.0)
+
+
+def _report(name: str, times: list[float], stall: float, wall: float):
+    print(
+        f"{name:>7}: {statistics.mean(times) * 1e6:8.1f} us/request on the loop "
+        f"(p99 {sorted(times)[int(len(times) * 0.99)] * 1e6:8.1f} us), "
+        f"worst loop stall {stall * 1000:7.2f} ms, total {wall:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--sink-ms", type=float, default=0.2, help="Blocking time of each write to the log stream")
+    parser.add_argument("--sample-rate", type=float, default=logging_config.LOG_PAYLOAD_SAMPLE_RATE)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench.logging")
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = SlowFile(os.path.join(tmp, "sync.log"), args.sink_ms / 1000)
+        root = logging.getLogger()
+        handler = logging.StreamHandler(sink)
+        root.handlers, root.level = [handler], logging.DEBUG
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            times, stall = asyncio.run(_run(_sync_request, logger, args.requests, args.concurrency))
+        _report("sync", times, stall, time.perf_counter() - started)
+        root.removeHandler(handler)
+        sink.close()
+
+        sink = SlowFile(os.path.join(tmp, "queued.log"), args.sink_ms / 1000)
+        logging_config.LOG_PAYLOAD_SAMPLE_RATE = args.sample_rate
+        setup_logging(level="INFO", levels="bench=DEBUG", stream=sink)
+        started = time.perf_counter()
+        times, stall = asyncio.run(_run(_queued_request, logger, args.requests, args.concurrency))
+        loop_wall = time.perf_counter() - started
+        shutdown_logging()  # drains the queue
+        _report("queued", times, stall, loop_wall)
+        print(f"         writer drained {time.perf_counter() - started - loop_wall:.2f}s after the last request")
+        sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOpenAIServer:
+    """Local stand-in for the OpenAI REST API used by the benchmarks.
+
+    Serves ``/v1/chat/completions`` and ``/v1/embeddings`` over keep-alive
+    HTTP/1.1. Latency and failures are injectable:
+
+    * ``delay`` – seconds (or ``fn(request_number) -> seconds``) before each response
+    * ``handshake_delay`` – extra seconds on every *new* connection, emulating
+      the TCP + TLS round trips a real client pays when it does not reuse a pool
+    * ``status`` – ``fn(request_number) -> int | None``; a non-None value is
+      returned as an error response (e.g. 429 or 503)
+
+    Usage::
+
+        with StubOpenAIServer(delay=0.05) as stub:
+            llm = get_chat_model(base_url=stub.base_url, openai_api_key="stub")
+    """
+
+    def __init__(self, delay=0.0, handshake_delay: float = 0.0, status=None, embedding_dim: int = 1536):
+        self.delay = delay
+        self.handshake_delay = handshake_delay
+        self.status = status
+        self.embedding_dim = embedding_dim
+        self.connections = 0
+        self.requests = 0
+        self._counter = itertools.count(1)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay_for(self, number: int) -> float:
+        return self.delay(number) if callable(self.delay) else self.delay
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+                if stub.handshake_delay:
+                    time.sleep(stub.handshake_delay)
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                number = next(stub._counter)
+                stub.requests += 1
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(stub._delay_for(number))
+                status = stub.status(number) if stub.status else None
+                if status:
+                    self._send(status, {"error": {"message": f"stub error {status}", "type": "stub", "code": status}})
+                elif self.path.endswith("/chat/completions"):
+                    self._send(200, stub._chat_response(request, number))
+                elif self.path.endswith("/embeddings"):
+                    self._send(200, stub._embedding_response(request))
+                else:
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        return Handler
+
+    def _chat_response(self, request: dict, number: int) -> dict:
+        n = request.get("n") or 1
+        return {
+            "id": f"chatcmpl-stub-{number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": f"Stub SEO website post {number}.{i} for our builder."},
+                    "finish_reason": "stop",
+                }
+                for i in range(n)
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    def _embedding_response(self, request: dict) -> dict:
+        inputs = request.get("input")
+        count = len(inputs) if isinstance(inputs, list) and inputs and not isinstance(inputs[0], int) else 1
+        return {
+            "object": "list",
+            "model": request.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": [((i + j) % 7) / 7 for j in range(self.embedding_dim)]}
+                for i in range(count)
+            ],
+            "usage": {"prompt_tokens": count, "total_tokens": count},
+        }
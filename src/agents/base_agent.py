@@ -1,5 +1,5 @@
 from langchain.agents import AgentExecutor, create_react_agent
-from langchain_openai import ChatOpenAI
+from src.openai_clients import get_chat_model
 from langchain_core.prompts import PromptTemplate
 import os
 from dotenv import load_dotenv
@@ -8,7 +8,7 @@ load_dotenv()
 
 class BaseAgent:
     def __init__(self, tools, prompt_template):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, openai_api_key=os.getenv("OPENAI_API_KEY"))
+        self.llm = get_chat_model(model="gpt-4o-mini", temperature=0.7)
         self.tools = tools
         self.prompt = PromptTemplate.from_template(prompt_template)
         self.agent = create_react_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
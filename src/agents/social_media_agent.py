@@ -1,7 +1,10 @@
+import asyncio
 import logging
 from langchain_core.tools import StructuredTool
 from src.loaders.retriever import FeedbackRetriever
+from src.loaders.retrieval_context import RetrievalContext
 from src.langchain_utils import validate_content
+from src.logging_config import log_payload, stage
 from src.rag_pipeline import initialize_chains  
 
 logger = logging.getLogger(__name__)
@@ -11,18 +14,24 @@ class SocialMediaAgent:
         self.platform = platform
         self.chains = initialize_chains()
         self.retriever = FeedbackRetriever()
+        self.last_generation = None  # inputs + candidates of the latest generate() call
 
     async def generate(self, use_case: str, **kwargs):
         platform = kwargs.pop("platform", self.platform)
-        logger.debug(f"Entering generate: platform={platform}, use_case={use_case}, kwargs={kwargs}")
+        log_payload(logger, "Entering generate", platform=platform, use_case=use_case, kwargs=kwargs)
         rag_chain = self.chains.get(platform)
         if not rag_chain:
             raise ValueError(f"No chain found for platform: {platform}")
         
-        # Retrieve high-performing outputs
-        query = kwargs.get("content_topic", kwargs.get("content_goals", kwargs.get("brand_summary", "")))
-        feedback_context = self.retriever.retrieve_relevant_outputs(query, platform)
-        feedback_text = "\n".join([f"Example: {doc['content']}" for doc in feedback_context])
+        # One query embedding per request: knowledge-base context and
+        # high-performing outputs are searched concurrently from the same vector
+        query = rag_chain.build_query(kwargs)
+        retrieval = RetrievalContext(query, self.retriever.embeddings)
+        with stage("retrieval"):
+            documents, feedback_context = await asyncio.gather(
+                rag_chain.aretrieve(query, retrieval),
+                self.retriever.aretrieve_relevant_outputs(retrieval, platform),
+            )
         
         input_data = {
             "content_topic": kwargs.get("content_topic", ""),
@@ -35,11 +44,20 @@ class SocialMediaAgent:
             "topic_list": kwargs.get("topic_list", ""),
             "length": kwargs.get("length", "medium"),
             "context": kwargs.get("context", ""),
-            "feedback_context": feedback_text
+            "feedback_examples": [doc["content"] for doc in feedback_context],
+            "documents": documents,
+            "n": kwargs.get("n", 1)
         }
         
         try:
-            response = await rag_chain.ainvoke(input_data)
+            with stage("completion"):
+                response = await rag_chain.ainvoke(input_data)
+            self.last_generation = {
+                "use_case": rag_chain.use_case,
+                "platform": rag_chain.platform,
+                "prompt_inputs": response["prompt_inputs"],
+                "candidates": response["candidates"],
+            }
             return response["result"]
         except Exception as e:
             logger.error(f"Error in RAG chain invocation: {str(e)}")
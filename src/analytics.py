@@ -0,0 +1,174 @@
+"""SQLite-backed feedback analytics with incrementally maintained aggregates.
+
+Each feedback submission updates the per-platform, per-label and per-day
+aggregate rows in the same transaction as the event itself, so reads are a
+handful of small indexed selects regardless of how much feedback exists.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYTICS_DB_PATH = os.getenv("ANALYTICS_DB_PATH", os.path.join(project_root, "data", "output", "analytics.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback_events (
+    output_id TEXT PRIMARY KEY,
+    platform TEXT NOT NULL,
+    rating INTEGER,
+    likes INTEGER NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0,
+    label TEXT NOT NULL,
+    day TEXT NOT NULL,
+    submitted_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS platform_stats (
+    platform TEXT PRIMARY KEY,
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS label_counts (
+    label TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_engagement (
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, platform)
+);
+"""
+
+
+def _day(timestamp: str | None) -> str:
+    if timestamp:
+        try:
+            return datetime.fromisoformat(timestamp).date().isoformat()
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class FeedbackAnalytics:
+    """Feedback event store; one row per output holding its latest feedback.
+
+    Re-submitting feedback for an output first subtracts the previous
+    contribution from every aggregate, so the aggregates always match the
+    current events.
+    """
+
+    def __init__(self, db_path: str = ANALYTICS_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _apply(self, row, sign: int):
+        rating = row["rating"]
+        self._conn.execute(
+            """INSERT INTO platform_stats (platform, feedback_count, rating_sum, rating_count, likes, shares)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(platform) DO UPDATE SET
+                   feedback_count = feedback_count + excluded.feedback_count,
+                   rating_sum = rating_sum + excluded.rating_sum,
+                   rating_count = rating_count + excluded.rating_count,
+                   likes = likes + excluded.likes,
+                   shares = shares + excluded.shares""",
+            (row["platform"], sign, sign * (rating or 0), sign * (rating is not None),
+             sign * row["likes"], sign * row["shares"]),
+        )
+        self._conn.execute(
+            """INSERT INTO label_counts (label, count) VALUES (?, ?)
+               ON CONFLICT(label) DO UPDATE SET count = count + excluded.count""",
+            (row["label"], sign),
+        )
+        self._conn.execute(
+            """INSERT INTO daily_engagement (day, platform, feedback_count, likes, shares)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(day, platform) DO UPDATE SET
+                   feedback_count = feedback_count + excluded.feedback_count,
+                   likes = likes + excluded.likes,
+                   shares = shares + excluded.shares""",
+            (row["day"], row["platform"], sign, sign * row["likes"], sign * row["shares"]),
+        )
+
+    def record_many(self, events: list[tuple[str, dict]]):
+        """Record ``(output_id, metadata)`` pairs, where metadata carries ``platform``,
+        ``timestamp`` and the ``feedback`` dict stored on the output."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._conn:
+            for output_id, metadata in events:
+                feedback = metadata.get("feedback") or {}
+                engagement = feedback.get("engagement_metrics") or {}
+                row = {
+                    "output_id": output_id,
+                    "platform": metadata.get("platform") or "unknown",
+                    "rating": feedback.get("rating"),
+                    "likes": int(engagement.get("likes", 0) or 0),
+                    "shares": int(engagement.get("shares", 0) or 0),
+                    "label": feedback.get("label") or "unlabelled",
+                    "day": _day(metadata.get("timestamp")),
+                    "submitted_at": now,
+                }
+                previous = self._conn.execute(
+                    "SELECT * FROM feedback_events WHERE output_id = ?", (output_id,)
+                ).fetchone()
+                if previous is not None:
+                    self._apply(previous, -1)
+                self._apply(row, 1)
+                self._conn.execute(
+                    """INSERT OR REPLACE INTO feedback_events
+                       (output_id, platform, rating, likes, shares, label, day, submitted_at)
+                       VALUES (:output_id, :platform, :rating, :likes, :shares, :label, :day, :submitted_at)""",
+                    row,
+                )
+
+    def record(self, output_id: str, metadata: dict):
+        self.record_many([(output_id, metadata)])
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM feedback_events LIMIT 1").fetchone() is None
+
+    def summary(self, days: int = 30) -> dict:
+        """Precomputed aggregates: per-platform ratings, label counts and daily engagement."""
+        with self._lock:
+            platforms = self._conn.execute(
+                "SELECT * FROM platform_stats WHERE feedback_count > 0 ORDER BY platform"
+            ).fetchall()
+            labels = self._conn.execute("SELECT label, count FROM label_counts WHERE count > 0").fetchall()
+            engagement = self._conn.execute(
+                """SELECT day, platform, feedback_count, likes, shares FROM daily_engagement
+                   WHERE feedback_count > 0 AND day >= date('now', ?) ORDER BY day, platform""",
+                (f"-{int(days)} days",),
+            ).fetchall()
+        return {
+            "platforms": [
+                {
+                    "platform": row["platform"],
+                    "feedback_count": row["feedback_count"],
+                    "average_rating": row["rating_sum"] / row["rating_count"] if row["rating_count"] else None,
+                    "likes": row["likes"],
+                    "shares": row["shares"],
+                }
+                for row in platforms
+            ],
+            "labels": {row["label"]: row["count"] for row in labels},
+            "engagement": [dict(row) for row in engagement],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
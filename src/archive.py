@@ -0,0 +1,365 @@
+"""Append-only archive of generated outputs.
+
+Records are appended to rotated ``segment-NNNNNN.jsonl.gz`` files. Every
+record is its own gzip member, so a segment is still a valid gzip/JSONL file
+for streaming (``zcat``) while a single record can be read back by seeking to
+its offset. The offset index (``output_id -> segment, offset, length``) lives
+in SQLite next to the segments. Writes are queued and flushed in batches by a
+background thread, off the request path. Several processes may open the same
+archive (the API, the import and export CLIs): each batch is appended under an
+exclusive ``flock`` on ``writer.lock``, at the segment's current end.
+
+Export everything (or one category) as plain JSONL::
+
+    python -m src.archive export --out outputs.jsonl.gz --category strategies
+"""
+import argparse
+import atexit
+import contextlib
+import gzip
+import itertools
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+from src.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(project_root, "data", "output", "archive"))
+SEGMENT_BYTES = int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "256"))
+COMPRESS_LEVEL = int(os.getenv("ARCHIVE_COMPRESS_LEVEL", "6"))
+# Attempts per batch before its records are dropped (and logged)
+WRITE_ATTEMPTS = int(os.getenv("ARCHIVE_WRITE_ATTEMPTS", "3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    output_id TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    category TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS records_segment ON records (segment, offset);
+"""
+
+_STOP = object()
+# Ids per query, below SQLite's bound-parameter limit
+_QUERY_CHUNK = 500
+
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:06d}.jsonl.gz"
+
+
+def _members(data: bytes):
+    """Yield ``(start, length, record)`` for each complete gzip member in ``data``."""
+    position = 0
+    while position < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            line = decompressor.decompress(data[position:])
+        except zlib.error:
+            return
+        if not decompressor.eof:
+            return  # truncated tail
+        length = len(data) - position - len(decompressor.unused_data)
+        yield position, length, json.loads(line)
+        position += length
+
+
+class OutputArchive:
+    def __init__(self, root: str = ARCHIVE_DIR, segment_bytes: int = SEGMENT_BYTES):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.executescript(_SCHEMA)
+        self._pending = {}  # output_id -> record, until its batch is indexed
+        self._queue = queue.Queue()
+        self._writer_lock = FileLock(os.path.join(root, "writer.lock"))
+        self._segment = max(self._segments(), default=1)
+        with self._exclusive():
+            self._recover()
+        self._file = open(self._path(self._segment), "ab")
+        self._writer = threading.Thread(target=self._run, name="output-archive", daemon=True)
+        self._writer.start()
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.root, _segment_name(segment))
+
+    def _segments(self) -> list[int]:
+        return sorted(
+            int(name[len("segment-"):-len(".jsonl.gz")])
+            for name in os.listdir(self.root)
+            if name.startswith("segment-") and name.endswith(".jsonl.gz")
+        )
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """Hold the inter-process writer lock."""
+        self._writer_lock.acquire(blocking=True, owner="archive")
+        try:
+            yield
+        finally:
+            self._writer_lock.release()
+
+    def _recover(self):
+        """Index records that reached the active segment but not the index; drop a torn tail.
+
+        Runs under the writer lock: every other writer has finished its batch,
+        so an unindexed tail is left by a crashed writer."""
+        path = self._path(self._segment)
+        if not os.path.exists(path):
+            return
+        row = self._index.execute(
+            "SELECT MAX(offset + length) FROM records WHERE segment = ?", (self._segment,)
+        ).fetchone()
+        indexed_end = row[0] or 0
+        with open(path, "rb") as f:
+            f.seek(indexed_end)
+            tail = f.read()
+        if not tail:
+            return
+        entries, end = [], indexed_end
+        for start, length, record in _members(tail):
+            entries.append((record["output_id"], self._segment, indexed_end + start, length,
+                            record.get("category"), record.get("timestamp")))
+            end = indexed_end + start + length
+        with self._index:
+            self._index.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", entries)
+        if end < indexed_end + len(tail):
+            os.truncate(path, end)
+        logger.info(f"Recovered {len(entries)} archive records from {_segment_name(self._segment)}")
+
+    def append(self, record: dict) -> str:
+        """Queue a record (must carry ``output_id``); returns immediately."""
+        with self._lock:
+            self._pending[record["output_id"]] = record
+        self._queue.put(record)
+        return record["output_id"]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not _STOP and len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            records = [record for record in batch if record is not _STOP]
+            try:
+                if records:
+                    self._write_with_retries(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if item is _STOP:
+                return
+
+    def _write_with_retries(self, records: list[dict]):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._write(records)
+                return
+            except Exception:
+                if attempt < WRITE_ATTEMPTS:
+                    logger.warning(f"Archiving {len(records)} outputs failed (attempt {attempt}); retrying", exc_info=True)
+                    time.sleep(0.5 * attempt)
+        logger.error(
+            f"Dropping {len(records)} outputs after {WRITE_ATTEMPTS} failed archive writes: "
+            f"{[record['output_id'] for record in records]}"
+        )
+        self._discard(records)
+
+    def _discard(self, records: list[dict]):
+        with self._lock:
+            for record in records:
+                if self._pending.get(record["output_id"]) is record:
+                    del self._pending[record["output_id"]]
+
+    def _sync_segment(self):
+        """Follow rotations by other processes; returns the active segment's current end."""
+        segment = max(self._segments(), default=self._segment)
+        if segment != self._segment or self._file.closed:
+            self._file.close()
+            self._segment = segment
+            self._file = open(self._path(segment), "ab")
+        return os.fstat(self._file.fileno()).st_size
+
+    def _write(self, records: list[dict]):
+        entries = []
+        with self._exclusive():
+            end = start = self._sync_segment()
+            if end >= self.segment_bytes:
+                # Rotate between batches only, so a failed batch lives in one segment
+                self._file.close()
+                self._segment += 1
+                self._file = open(self._path(self._segment), "ab")
+                end = start = 0
+            try:
+                for record in records:
+                    data = gzip.compress(
+                        (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"), COMPRESS_LEVEL, mtime=0,
+                    )
+                    self._file.write(data)
+                    entries.append((record["output_id"], self._segment, end, len(data),
+                                    record.get("category"), record.get("timestamp")))
+                    end += len(data)
+                self._file.flush()
+                with self._lock, self._index:
+                    self._index.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", entries)
+            except BaseException:
+                # Leave nothing of the batch behind: it is retried from scratch
+                self._file.close()
+                os.truncate(self._path(self._segment), start)
+                raise
+        self._discard(records)
+
+    def get(self, output_id: str) -> dict | None:
+        with self._lock:
+            record = self._pending.get(output_id)
+            if record is not None:
+                return record
+            row = self._index.execute(
+                "SELECT segment, offset, length FROM records WHERE output_id = ?", (output_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        segment, offset, length = row
+        with open(self._path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+
+    def get_many(self, output_ids) -> dict:
+        """``get`` for several ids in one index query, opening each segment once.
+
+        Returns ``{output_id: record}`` for the ids that are archived.
+        """
+        found, missing, rows = {}, [], []
+        with self._lock:
+            for output_id in output_ids:
+                record = self._pending.get(output_id)
+                if record is not None:
+                    found[output_id] = record
+                else:
+                    missing.append(output_id)
+            for start in range(0, len(missing), _QUERY_CHUNK):
+                chunk = missing[start:start + _QUERY_CHUNK]
+                rows.extend(self._index.execute(
+                    f"SELECT output_id, segment, offset, length FROM records WHERE output_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+        rows.sort(key=lambda row: (row[1], row[2]))
+        for segment, group in itertools.groupby(rows, key=lambda row: row[1]):
+            with open(self._path(segment), "rb") as f:
+                for output_id, _, offset, length in group:
+                    f.seek(offset)
+                    found[output_id] = json.loads(gzip.decompress(f.read(length)))
+        return found
+
+    def iter_records(self, category: str | None = None):
+        """Stream archived records segment by segment (constant memory)."""
+        self.flush()
+        for segment in self._segments():
+            with gzip.open(self._path(segment), "rt", encoding="utf-8") as f:
+                try:
+                    for line in f:
+                        record = json.loads(line)
+                        if category is None or record.get("category") == category:
+                            yield record
+                except EOFError:
+                    continue  # torn tail of a crashed writer
+
+    def flush(self):
+        """Block until every queued record is written and indexed."""
+        self._queue.join()
+
+    def close(self):
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._file.close()
+        with self._lock:
+            self._index.close()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> OutputArchive:
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = OutputArchive()
+            atexit.register(_archive.close)
+        return _archive
+
+
+def archive_output(content: str, category: str, prefix: str, output_id: str | None = None,
+                   metadata: dict | None = None, generation: dict | None = None) -> str:
+    record = {
+        "output_id": output_id or str(uuid.uuid4()),
+        "category": category,
+        "prefix": prefix,
+        "timestamp": datetime.utcnow().isoformat(),
+        "content": content,
+        "metadata": metadata or {},
+    }
+    if generation:
+        record["generation"] = generation
+    return get_archive().append(record)
+
+
+def export(out, category: str | None = None) -> int:
+    count = 0
+    for record in get_archive().iter_records(category):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Output archive tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Stream archived outputs as JSONL")
+    export_parser.add_argument("--out", default="-", help="Output file ('-' for stdout, '.gz' to compress)")
+    export_parser.add_argument("--category", help="Only records of this category, e.g. instagram_contents")
+    get_parser = commands.add_parser("get", help="Print one archived output")
+    get_parser.add_argument("output_id")
+    args = parser.parse_args(argv)
+
+    if args.command == "get":
+        record = get_archive().get(args.output_id)
+        if record is None:
+            sys.exit(f"{args.output_id} not found")
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+        return
+    if args.out == "-":
+        count = export(sys.stdout, args.category)
+    else:
+        opener = gzip.open if args.out.endswith(".gz") else open
+        with opener(args.out, "wt", encoding="utf-8") as out:
+            count = export(out, args.category)
+    print(f"Exported {count} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
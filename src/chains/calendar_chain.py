@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+
+from src.loaders.context_assembler import assemble_context
+from src.openai_clients import get_chat_model
+from src.prompts.social_media_prompt import calendar_row_prompt
+from src.rag_pipeline import get_rag_chain
+from src.resilience import resilient_call
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_CONCURRENCY = int(os.getenv("CALENDAR_CONCURRENCY", "10"))
+MAX_CALENDAR_DAYS = 31
+DEFAULT_PLATFORMS = ["instagram", "facebook", "linkedin"]
+TABLE_HEADER = "Day | Platform | Content Type | Topic | Caption Summary | CTA"
+
+
+class CalendarEngine:
+    """Row-parallel content calendar generation.
+
+    A compact skeleton (one row per day and platform, with its topic) is laid
+    out locally, the RAG context is retrieved once, and every row's content
+    type, caption summary and CTA are filled in by concurrent completions
+    (bounded by ``concurrency``), so wall-clock time grows with
+    ``rows / concurrency`` rather than with the size of the table.
+    """
+
+    def __init__(self, concurrency: int = CALENDAR_CONCURRENCY):
+        self.concurrency = concurrency
+        self.llm = get_chat_model(temperature=0.5, model="gpt-4o-mini", max_retries=0)
+
+    @staticmethod
+    def build_skeleton(topics: list[str], days: int = 7, platforms: list[str] | None = None) -> list[dict]:
+        """One row per (day, platform); topics rotate across the days."""
+        platforms = platforms or DEFAULT_PLATFORMS
+        topics = topics or ["Brand highlights"]
+        return [
+            {"day": day, "platform": platform, "topic": topics[(day - 1) % len(topics)]}
+            for day in range(1, days + 1)
+            for platform in platforms
+        ]
+
+    @staticmethod
+    def _keyword_rule(first_row: bool) -> str:
+        # Mirrors calendar_prompt: "SEO" once in the whole table, in the first row
+        if first_row:
+            return 'Use the exact word "SEO" once in this row.'
+        return 'Do NOT use the words "SEO", "conversions" or "website"; prefer synonyms like "search", "sales" or "site".'
+
+    @staticmethod
+    def _parse_row(text: str) -> tuple[str, str, str]:
+        line = next((candidate for candidate in text.strip().splitlines() if "|" in candidate), text.strip())
+        parts = [p.strip() for p in line.strip().strip("|").split("|")]
+        if len(parts) >= 3:
+            return parts[0], " ".join(parts[1:-1]), parts[-1]
+        return "Post", line.strip(), "Learn more"
+
+    async def _retrieve_context(self, brand_summary: str, feedback_context: str) -> tuple[str, str]:
+        rag_chain = get_rag_chain(use_case="calendar", platform="all")
+        query = rag_chain.build_query({"brand_summary": brand_summary})
+        scored_docs = await rag_chain.aretrieve(query)
+        return assemble_context("all", scored_docs, [feedback_context] if feedback_context else [])
+
+    async def _fill_row(self, semaphore, row: dict, brand_summary: str, context: str, feedback_context: str,
+                        first_row: bool = False) -> str:
+        prompt = calendar_row_prompt.format(
+            brand_summary=brand_summary,
+            keyword_rule=self._keyword_rule(first_row),
+            context=context,
+            feedback_context=feedback_context,
+            **row,
+        )
+        async with semaphore:
+            message = await resilient_call(lambda: self.llm.ainvoke(prompt), use_case="calendar")
+        content_type, caption, cta = self._parse_row(message.content)
+        return f"Day {row['day']} | {row['platform'].title()} | {content_type} | {row['topic']} | {caption} | {cta}"
+
+    async def generate(self, brand_summary: str, topic_list, days: int = 7, platforms: list[str] | None = None,
+                       feedback_context: str = "", **kwargs) -> str:
+        if not 1 <= days <= MAX_CALENDAR_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_CALENDAR_DAYS}")
+        if isinstance(topic_list, str):
+            topic_list = [t.strip() for t in topic_list.split(",") if t.strip()]
+        skeleton = self.build_skeleton(topic_list, days, platforms)
+        context, feedback_context = await self._retrieve_context(brand_summary, feedback_context)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        rows = await asyncio.gather(*(
+            self._fill_row(semaphore, row, brand_summary, context, feedback_context, first_row=index == 0)
+            for index, row in enumerate(skeleton)
+        ))
+        logger.info(f"Calendar generated: {days} days x {len(rows) // days} platforms, {len(rows)} rows, concurrency {self.concurrency}")
+        return "\n".join([TABLE_HEADER, *rows])
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+from src.loaders.retrieval_context import RetrievalContext
+from src.rag_pipeline import get_rag_chain
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PLATFORMS = ("instagram", "facebook", "linkedin")
+
+
+class FanOutEngine:
+    """Generate one topic for several platforms from a single retrieval.
+
+    The knowledge-base search and every platform's high-engagement example
+    search share one query embedding; the platform variants are then
+    generated concurrently.
+    """
+
+    def __init__(self, feedback_retriever):
+        self.feedback_retriever = feedback_retriever
+        self.generations = {}  # platform -> stored inputs/candidates, for context-reusing regeneration
+
+    async def _retrieve(self, content_topic: str, platforms: list[str], chains: dict):
+        query = f"Provide context for a content post about {content_topic} for {', '.join(platforms)}."
+        retrieval = RetrievalContext(query, self.feedback_retriever.embeddings)
+        scored_docs, *examples = await asyncio.gather(
+            chains[platforms[0]].aretrieve(query, retrieval),
+            *(self.feedback_retriever.aretrieve_relevant_outputs(retrieval, p) for p in platforms),
+        )
+        return scored_docs, {p: [doc["content"] for doc in found] for p, found in zip(platforms, examples)}
+
+    async def _generate_one(self, chain, platform: str, params: dict, scored_docs, examples):
+        # One failing platform must not take the other variants down with it
+        try:
+            response = await chain.ainvoke({**params, "documents": scored_docs, "feedback_examples": examples})
+            self.generations[platform] = {
+                "use_case": chain.use_case,
+                "platform": platform,
+                "prompt_inputs": response["prompt_inputs"],
+                "candidates": response["candidates"],
+            }
+            return platform, response["result"], None
+        except Exception as e:
+            logger.exception(f"Fan-out generation failed for {platform}")
+            return platform, None, e
+
+    async def stream(self, content_topic: str, platform_params: dict):
+        """Yield ``(platform, content, error)`` as each variant finishes.
+
+        ``platform_params`` maps platform -> generation kwargs (tone, length, persona, ...).
+        """
+        platforms = [p for p in platform_params if p in SUPPORTED_PLATFORMS]
+        if not platforms:
+            raise ValueError(f"No supported platforms requested (expected any of {SUPPORTED_PLATFORMS})")
+        chains = {p: get_rag_chain(use_case="content", platform=p) for p in platforms}
+        scored_docs, examples = await self._retrieve(content_topic, platforms, chains)
+        tasks = [
+            asyncio.ensure_future(self._generate_one(
+                chains[p], p, {"content_topic": content_topic, **platform_params[p]}, scored_docs, examples[p],
+            ))
+            for p in platforms
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate(self, content_topic: str, platform_params: dict) -> dict:
+        return {
+            platform: (content, error)
+            async for platform, content, error in self.stream(content_topic, platform_params)
+        }
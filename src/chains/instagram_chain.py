@@ -1,12 +1,13 @@
 from src.chains.base_chain import BaseChain
 from src.prompts.social_media_prompt import instagram_content_prompt, instagram_strategy_prompt
 from src.rag_pipeline import get_rag_chain
-from src.langchain_utils import save_output, timestamp
+from src.chains.calendar_chain import CalendarEngine
 import asyncio
 
 class InstagramContentChain(BaseChain):
     def __init__(self):
         self.rag_chain = get_rag_chain(use_case="content", platform="instagram")
+        self.last_generation = None
 
     async def get_prompt(self, mode, **kwargs):
         if mode == "content":
@@ -26,21 +27,13 @@ class InstagramContentChain(BaseChain):
             raise ValueError("Mode must be 'content', 'strategy', or 'calendar'")
         kwargs.setdefault("feedback_context", "")
 
-        # For calendar we use a dedicated calendar RAG chain targeting the pseudo platform "all"
+        # Calendars are laid out as a skeleton and filled row-by-row in parallel
         if mode == "calendar":
-            # Use a generic RAG chain that is configured for calendar creation
-            calendar_chain = get_rag_chain(use_case="calendar", platform="all")
-            response = await calendar_chain.ainvoke(kwargs)
-            result = response["result"]
-            output_dir = "data/output/calendars"
-            save_output(result, output_dir, "content_calendar")
-            return result
+            return await CalendarEngine().generate(**kwargs)
 
         # Default path for content / strategy
-        prompt = await self.get_prompt(mode, **kwargs)
         from src.agents.social_media_agent import SocialMediaAgent
         agent = SocialMediaAgent(platform="instagram")
         result = await agent.generate(use_case=mode, **kwargs)
-        output_dir = f"data/output/instagram_{mode}s"
-        save_output(result, output_dir, f"instagram_{mode}")
+        self.last_generation = agent.last_generation
         return result
\ No newline at end of file
@@ -1,12 +1,13 @@
 from src.chains.base_chain import BaseChain
 from src.prompts.social_media_prompt import linkedin_content_prompt, linkedin_strategy_prompt
 from src.rag_pipeline import get_rag_chain
-from src.langchain_utils import save_output, timestamp
+from src.chains.calendar_chain import CalendarEngine
 import asyncio
 
 class LinkedInContentChain(BaseChain):
     def __init__(self):
         self.rag_chain = get_rag_chain(use_case="content", platform="linkedin")
+        self.last_generation = None
 
     async def get_prompt(self, mode, **kwargs):
         if mode == "content":
@@ -30,17 +31,10 @@ class LinkedInContentChain(BaseChain):
             kwargs.setdefault("content_goals", "")
 
         if mode == "calendar":
-            calendar_chain = get_rag_chain(use_case="calendar", platform="all")
-            response = await calendar_chain.ainvoke(kwargs)
-            result = response["result"]
-            output_dir = "data/output/calendars"
-            save_output(result, output_dir, "content_calendar")
-            return result
+            return await CalendarEngine().generate(**kwargs)
 
-        prompt = await self.get_prompt(mode, **kwargs)
         from src.agents.social_media_agent import SocialMediaAgent
         agent = SocialMediaAgent(platform="linkedin")
         result = await agent.generate(use_case=mode, **kwargs)
-        output_dir = f"data/output/linkedin_{mode}s"
-        save_output(result, output_dir, f"linkedin_{mode}")
+        self.last_generation = agent.last_generation
         return result
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+
+from src.loaders.context_assembler import assemble_context
+from src.loaders.retrieval_context import RetrievalContext
+from src.openai_clients import get_chat_model
+from src.prompts.social_media_prompt import strategy_outline_prompt, strategy_section_prompt, strategy_sections
+from src.rag_pipeline import get_rag_chain
+from src.resilience import resilient_call
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_CONCURRENCY = int(os.getenv("STRATEGY_CONCURRENCY", "9"))
+
+
+class StrategyEngine:
+    """Section-parallel strategy generation.
+
+    Context is retrieved once and a short outline is drafted so sections stay
+    consistent; then every section of the chosen template is written by its
+    own concurrent completion and stitched back in order. Wall-clock time is
+    roughly outline + slowest section instead of the sum of all sections.
+    """
+
+    def __init__(self, feedback_retriever=None, concurrency: int = STRATEGY_CONCURRENCY):
+        self.feedback_retriever = feedback_retriever
+        self.concurrency = concurrency
+        self.llm = get_chat_model(temperature=0.5, model="gpt-4o-mini", max_retries=0)
+
+    @staticmethod
+    def template_for(platforms) -> str:
+        """Use a platform's dedicated template for single-platform strategies, else the combined one."""
+        if isinstance(platforms, str):
+            platforms = [platforms]
+        if len(platforms) == 1 and platforms[0].lower() in strategy_sections:
+            return platforms[0].lower()
+        return "all"
+
+    async def _retrieve_context(self, content_goals: str, template: str) -> tuple[str, str]:
+        rag_chain = get_rag_chain(use_case="strategy", platform="all")
+        query = rag_chain.build_query({"content_goals": content_goals})
+        if self.feedback_retriever is None:
+            scored_docs, examples = await rag_chain.aretrieve(query), []
+        else:
+            retrieval = RetrievalContext(query, self.feedback_retriever.embeddings)
+            scored_docs, feedback = await asyncio.gather(
+                rag_chain.aretrieve(query, retrieval),
+                self.feedback_retriever.aretrieve_relevant_outputs(retrieval, template),
+            )
+            examples = [doc["content"] for doc in feedback]
+        return assemble_context("all", scored_docs, examples)
+
+    async def _complete(self, prompt: str) -> str:
+        message = await resilient_call(lambda: self.llm.ainvoke(prompt), use_case="strategy")
+        return message.content.strip()
+
+    async def _prepare(self, platforms, content_goals: str):
+        template = self.template_for(platforms)
+        spec = strategy_sections[template]
+        platforms_text = ", ".join(platforms) if isinstance(platforms, (list, tuple)) else platforms
+        context, feedback_context = await self._retrieve_context(content_goals, template)
+        outline = await self._complete(strategy_outline_prompt.format(
+            horizon=spec["horizon"], platforms=platforms_text, content_goals=content_goals, context=context,
+        ))
+        shared = {
+            "horizon": spec["horizon"],
+            "platforms": platforms_text,
+            "content_goals": content_goals,
+            "outline": outline,
+            "context": context,
+            "feedback_context": feedback_context,
+        }
+        return spec["sections"], shared
+
+    async def _section(self, semaphore, number: int, title: str, guidance: str, shared: dict):
+        async with semaphore:
+            body = await self._complete(strategy_section_prompt.format(
+                number=number, title=title, guidance=guidance, **shared,
+            ))
+        return number, title, f"### {number}. {title}\n\n{body}"
+
+    async def stream(self, platforms, content_goals: str, **kwargs):
+        """Yield ``(number, title, markdown)`` for each section as soon as it is complete."""
+        sections, shared = await self._prepare(platforms, content_goals)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.ensure_future(self._section(semaphore, number, title, guidance, shared))
+            for number, (title, guidance) in enumerate(sections, start=1)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def stitch(parts) -> str:
+        return "\n\n".join(markdown for _, _, markdown in sorted(parts))
+
+    async def generate(self, platforms, content_goals: str, **kwargs) -> str:
+        parts = [part async for part in self.stream(platforms, content_goals)]
+        logger.info(f"Strategy generated from {len(parts)} parallel sections")
+        return self.stitch(parts)
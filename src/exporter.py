@@ -0,0 +1,210 @@
+"""Streaming dataset export of stored outputs with their feedback labels.
+
+Outputs are paged from the output catalog (filters hit its indexes) and
+joined with content and metadata from the FAISS docstore. With embeddings,
+the FAISS rows are walked in index (insertion) order instead, a slice at a
+time, and joined with their catalog rows. Rows are written as NDJSON or as Parquet row groups
+(requires ``pyarrow``), one page at a time, so memory stays constant however
+large the history is.
+
+    python -m src.exporter --format parquet --out dataset.parquet --label high_engagement
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+FORMATS = ("ndjson", "parquet")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet exports
+    pa = pq = None
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def _export_row(store, item: dict, embedding=None) -> dict | None:
+    doc = store.docstore.search(item["output_id"])
+    if not hasattr(doc, "metadata"):
+        return None  # catalogued but no longer indexed
+    metadata = dict(doc.metadata)
+    feedback = metadata.pop("feedback", None) or {}
+    row = {
+        "output_id": item["output_id"],
+        "platform": item["platform"],
+        "use_case": item["use_case"],
+        "label": feedback.get("label"),
+        "rating": feedback.get("rating"),
+        "timestamp": item["timestamp"],
+        "content": doc.page_content,
+        "metadata": metadata,
+        "feedback": feedback,
+    }
+    if embedding is not None:
+        row["embedding"] = embedding.tolist()
+    return row
+
+
+def _index_order_pages(retriever, catalog, filters: dict, page_size: int):
+    """Pages with embeddings: walk the FAISS rows ``page_size`` at a time and join each
+    slice with its catalog rows, so no id -> row map of the whole index is built."""
+    store = retriever.vector_store
+    start, last_id = 0, None
+    while True:
+        # Positions and vectors are read together, under the lock index writers hold
+        with retriever.index_lock:
+            if last_id is not None and store.index_to_docstore_id.get(start - 1) != last_id:
+                raise RuntimeError("The index changed during the export (outputs were deleted); retry the export")
+            end = min(start + page_size, store.index.ntotal)
+            if end <= start:
+                return
+            ids = [store.index_to_docstore_id[position] for position in range(start, end)]
+            vectors = store.index.reconstruct_n(start, end - start)
+        start, last_id = end, ids[-1]
+        items, _ = catalog.query(**filters, output_ids=ids, limit=len(ids))
+        items = {item["output_id"]: item for item in items}
+        page = [
+            row for row in (
+                _export_row(store, items[doc_id], vector)
+                for doc_id, vector in zip(ids, vectors) if doc_id in items
+            ) if row is not None
+        ]
+        if page:
+            yield page
+
+
+def iter_pages(retriever, catalog, platform=None, label=None, since=None, until=None,
+               include_embeddings=False, page_size=EXPORT_PAGE_SIZE):
+    """Yield lists of export rows ``page_size`` at a time: oldest first, or in index
+    (insertion) order when embeddings are included."""
+    filters = {"platform": platform, "label": label, "since": since, "until": until}
+    if include_embeddings:
+        yield from _index_order_pages(retriever, catalog, filters, page_size)
+        return
+    cursor = None
+    while True:
+        items, cursor = catalog.query(**filters, sort="timestamp", order="asc", limit=page_size, cursor=cursor)
+        page = [row for row in (_export_row(retriever.vector_store, item) for item in items) if row is not None]
+        if page:
+            yield page
+        if cursor is None:
+            return
+
+
+def iter_ndjson(pages):
+    for page in pages:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in page).encode("utf-8")
+
+
+def _schema(include_embeddings: bool):
+    fields = [
+        ("output_id", pa.string()),
+        ("platform", pa.string()),
+        ("use_case", pa.string()),
+        ("label", pa.string()),
+        ("rating", pa.int64()),
+        ("timestamp", pa.string()),
+        ("content", pa.string()),
+        ("metadata", pa.string()),  # JSON
+        ("feedback", pa.string()),  # JSON
+    ]
+    if include_embeddings:
+        fields.append(("embedding", pa.list_(pa.float32())))
+    return pa.schema(fields)
+
+
+def _table(page, schema):
+    rows = [
+        {**row, "metadata": json.dumps(row["metadata"]), "feedback": json.dumps(row["feedback"])}
+        for row in page
+    ]
+    return pa.Table.from_pylist(rows, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands back what was written since the last ``drain``."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def iter_parquet(pages, include_embeddings=False):
+    """Yield Parquet bytes as each page is written as a row group."""
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    schema = _schema(include_embeddings)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for page in pages:
+            writer.write_table(_table(page, schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export(retriever, catalog, out, fmt="ndjson", include_embeddings=False, **filters) -> None:
+    """Write the export to a binary file object."""
+    pages = iter_pages(retriever, catalog, include_embeddings=include_embeddings, **filters)
+    chunks = iter_parquet(pages, include_embeddings) if fmt == "parquet" else iter_ndjson(pages)
+    for chunk in chunks:
+        out.write(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored outputs and feedback as a dataset")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--out", default="-", help="Output file ('-' for stdout)")
+    parser.add_argument("--platform")
+    parser.add_argument("--label", help="e.g. high_engagement or needs_improvement")
+    parser.add_argument("--since", help="ISO timestamp (inclusive)")
+    parser.add_argument("--until", help="ISO timestamp (exclusive)")
+    parser.add_argument("--include-embeddings", action="store_true")
+    parser.add_argument("--index-path", help="FAISS index directory (default: the retriever's)")
+    args = parser.parse_args(argv)
+
+    from src.loaders.retriever import FeedbackRetriever
+    from src.output_catalog import OutputCatalog
+
+    retriever = FeedbackRetriever(index_path=args.index_path)
+    catalog = OutputCatalog()
+    if catalog.is_empty():
+        catalog.upsert_many(retriever.stored_outputs())
+    filters = {"platform": args.platform, "label": args.label, "since": args.since, "until": args.until}
+    if args.out == "-":
+        export(retriever, catalog, sys.stdout.buffer, args.format, args.include_embeddings, **filters)
+    else:
+        with open(args.out, "wb") as out:
+            export(retriever, catalog, out, args.format, args.include_embeddings, **filters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Advisory inter-process file locks (``flock``) for single-writer data files."""
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; single-writer rules are not enforced there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LockHeld(RuntimeError):
+    """Another process holds the lock."""
+
+
+class FileLock:
+    """Exclusive lock on ``path``, held until ``release()`` or process exit.
+
+    The lock file records the holder's pid for the error message; the lock
+    itself is the ``flock`` on the open file, so a crashed holder never
+    leaves a stale lock behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking: bool = False, owner: str = "") -> "FileLock":
+        if self._fd is not None:
+            return self
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            logger.warning(f"File locking is unavailable on this platform; not locking {self.path}")
+        else:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                holder = os.read(fd, 200).decode(errors="replace").strip() or "another process"
+                os.close(fd)
+                raise LockHeld(f"{self.path} is locked by {holder}")
+        os.ftruncate(fd, 0)
+        os.write(fd, f"pid {os.getpid()} {owner}".strip().encode())
+        self._fd = fd
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
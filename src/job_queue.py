@@ -0,0 +1,320 @@
+"""Durable SQLite job queue for generation jobs.
+
+The API enqueues jobs; worker processes (``python -m src.job_worker``, any
+number) claim them with a lease, run the generation and record the result.
+A worker that dies simply lets its lease expire and the job is claimed again;
+failed attempts are retried with backoff up to ``JOB_MAX_ATTEMPTS``.
+
+Scope: the queue is single-host. Workers scale across cores, not machines:
+SQLite in WAL mode needs shared memory between its processes and its locks
+are unreliable on network filesystems, so the API and every worker must run
+on the machine that holds ``JOBS_DB_PATH`` (and the FAISS index the workers
+read). Opening the queue on a network filesystem is refused. Workers on other
+nodes would need a network database with row locking in place of SQLite.
+
+Job lifecycle::
+
+    queued -> running -> generated -> storing -> succeeded   (the API stored the output)
+                    \\-> queued (retry) / failed
+
+Workers only generate: the API process owns the FAISS index, archive and
+catalog, so it stores ``generated`` results as regular outputs (see
+``claim_generated``) and delivers webhooks for finished jobs.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(project_root, "data", "output", "jobs.sqlite3"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+JOB_WEBHOOK_ATTEMPTS = int(os.getenv("JOB_WEBHOOK_ATTEMPTS", "5"))
+
+# Filesystems whose locking SQLite cannot rely on (see /proc/mounts)
+NETWORK_FILESYSTEMS = ("nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "fuse.sshfs", "glusterfs", "ceph")
+
+JOB_KINDS = ("instagram_content", "facebook_content", "linkedin_content", "content_strategy", "calendar")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    worker_id TEXT,
+    lease_expires REAL,
+    result TEXT,
+    response TEXT,
+    error TEXT,
+    webhook_url TEXT,
+    webhook_attempts INTEGER NOT NULL DEFAULT 0,
+    webhook_next_at REAL,
+    webhook_delivered_at TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_webhooks ON jobs (webhook_delivered_at, webhook_next_at);
+"""
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def network_filesystem(path: str, mounts: str = "/proc/mounts") -> str | None:
+    """Filesystem type of ``path`` if it is a network filesystem, else None (also when unknown)."""
+    try:
+        with open(mounts, encoding="utf-8") as f:
+            entries = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    best, fstype = "", None
+    for mount_point, kind in entries:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best):
+            best, fstype = mount_point, kind
+    return fstype if fstype in NETWORK_FILESYSTEMS else None
+
+
+def job_view(job: dict) -> dict:
+    """Public representation of a job (API responses and webhook bodies)."""
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        # Results still being stored are reported as running
+        "status": "running" if job["status"] in ("generated", "storing") else job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["response"],
+        "error": job["error"] if job["status"] == "failed" else None,
+    }
+
+
+class JobQueue:
+    def __init__(self, db_path: str = JOBS_DB_PATH, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        fstype = network_filesystem(os.path.dirname(os.path.abspath(db_path)))
+        if fstype is not None:
+            raise RuntimeError(
+                f"JOBS_DB_PATH {db_path} is on a network filesystem ({fstype}); the job queue is "
+                "single-host and must live on a local disk"
+            )
+        self._lock = threading.Lock()
+        # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE) so that
+        # claims from several processes never hand out the same job
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def submit(self, kind: str, payload: dict, webhook_url: str | None = None) -> str:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {JOB_KINDS}")
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO jobs (job_id, kind, payload, status, available_at, webhook_url, created_at)
+                   VALUES (?, ?, ?, 'queued', ?, ?, ?)""",
+                (job_id, kind, json.dumps(payload), time.time(), webhook_url, _now()),
+            )
+        return job_id
+
+    @staticmethod
+    def _job(row) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("payload", "result", "response"):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._job(self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def claim(self, worker_id: str) -> dict | None:
+        """Lease the oldest runnable job (queued, or running with an expired lease) to ``worker_id``."""
+        def claim():
+            now = time.time()
+            while True:
+                row = self._conn.execute(
+                    """SELECT job_id, status, attempts FROM jobs
+                       WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?)
+                       ORDER BY available_at LIMIT 1""",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["status"] == "running" and row["attempts"] >= self.max_attempts:
+                    # Its last worker died mid-run; do not hand it out again
+                    self._finish(row["job_id"], "failed", error="Worker lease expired")
+                    continue
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'running', worker_id = ?, lease_expires = ?, attempts = attempts + 1,
+                              started_at = COALESCE(started_at, ?) WHERE job_id = ?""",
+                    (worker_id, now + self.lease_seconds, _now(), row["job_id"]),
+                )
+                return self._job(self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone())
+        return self._transaction(claim)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False when the job is no longer leased to this worker."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE jobs SET status = 'generated', result = ?, error = NULL, lease_expires = NULL
+                   WHERE job_id = ? AND worker_id = ? AND status = 'running'""",
+                (json.dumps(result, default=str), job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> str | None:
+        """Record a failed attempt; requeue with backoff while attempts remain. Returns the new status."""
+        def fail():
+            row = self._conn.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if retry and row["attempts"] < self.max_attempts:
+                delay = JOB_RETRY_BACKOFF * 2 ** (row["attempts"] - 1)
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'queued', error = ?, available_at = ?, worker_id = NULL,
+                              lease_expires = NULL WHERE job_id = ?""",
+                    (error, time.time() + delay, job_id),
+                )
+                return "queued"
+            self._finish(job_id, "failed", error=error)
+            return "failed"
+        return self._transaction(fail)
+
+    def _finish(self, job_id: str, status: str, response: dict | None = None, error: str | None = None):
+        self._conn.execute(
+            """UPDATE jobs SET status = ?, response = ?, error = ?, lease_expires = NULL, finished_at = ?,
+                      webhook_next_at = CASE WHEN webhook_url IS NULL THEN NULL ELSE ? END
+               WHERE job_id = ?""",
+            (status, json.dumps(response) if response is not None else None, error, _now(), time.time(), job_id),
+        )
+
+    def claim_generated(self, job_id: str | None = None, owner: str = "api") -> dict | None:
+        """Take one ``generated`` job (a specific one, or the oldest) for storing; it moves to ``storing``."""
+        def claim():
+            if job_id is not None:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE job_id = ? AND status = 'generated'", (job_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'generated' ORDER BY available_at LIMIT 1"
+                ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'storing', worker_id = ?, lease_expires = ? WHERE job_id = ?",
+                (owner, time.time() + self.lease_seconds, row["job_id"]),
+            )
+            return self._job(self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone())
+        return self._transaction(claim)
+
+    def release_stale_storing(self):
+        """Hand back ``storing`` jobs whose API owner died mid-store."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'generated' WHERE status = 'storing' AND lease_expires < ?", (time.time(),)
+            )
+
+    def succeed(self, job_id: str, response: dict):
+        self._transaction(lambda: self._finish(job_id, "succeeded", response=response))
+
+    def fail_final(self, job_id: str, error: str):
+        self._transaction(lambda: self._finish(job_id, "failed", error=error))
+
+    def due_webhooks(self, limit: int = 20) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT * FROM jobs WHERE webhook_delivered_at IS NULL AND webhook_next_at <= ?
+                   AND webhook_attempts < ? ORDER BY webhook_next_at LIMIT ?""",
+                (time.time(), JOB_WEBHOOK_ATTEMPTS, limit),
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def webhook_result(self, job_id: str, delivered: bool):
+        with self._lock:
+            if delivered:
+                self._conn.execute(
+                    "UPDATE jobs SET webhook_attempts = webhook_attempts + 1, webhook_delivered_at = ? WHERE job_id = ?",
+                    (_now(), job_id),
+                )
+            else:
+                # Exponential backoff between deliveries: 2, 4, 8, ... seconds
+                self._conn.execute(
+                    """UPDATE jobs SET webhook_attempts = webhook_attempts + 1,
+                              webhook_next_at = ? + (2 << webhook_attempts) WHERE job_id = ?""",
+                    (time.time(), job_id),
+                )
+
+    async def deliver_webhooks(self, client) -> int:
+        """POST the public view of every finished job whose webhook is due; returns deliveries."""
+        delivered = 0
+        for job in await asyncio.to_thread(self.due_webhooks):
+            try:
+                response = await client.post(job["webhook_url"], json=job_view(job))
+                ok = response.status_code < 300
+                if not ok:
+                    logger.warning(f"Webhook for job {job['job_id']} returned {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Webhook for job {job['job_id']} failed: {e}")
+                ok = False
+            await asyncio.to_thread(self.webhook_result, job["job_id"], ok)
+            delivered += ok
+        return delivered
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,192 @@
+"""Out-of-process generation worker for the job queue.
+
+    python -m src.job_worker --processes 4 --concurrency 2
+
+Each process claims jobs from the shared SQLite queue (``JOBS_DB_PATH``),
+keeps its lease alive while generating, and records the generated content
+and generation record for the API to store. Start as many processes as the
+LLM rate limits allow, on the API's host (the queue and the index are local
+files); SIGTERM/SIGINT stops claiming and lets in-flight jobs finish.
+
+Jobs run in the scheduler's ``batch`` lane, behind interactive requests. The
+workers of one ``--processes`` run share ``JOB_WORKER_RATE_SHARE`` of
+``OPENAI_RPM``/``OPENAI_TPM`` (each process gets an equal part), so adding
+processes does not multiply the request rate.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from src.job_queue import JobQueue
+from src.logging_config import setup_logging, shutdown_logging
+from src.metrics import metrics
+from src.scheduler import REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE, lane, scheduler
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# Share of the OpenAI rate limits used by all worker processes together
+JOB_WORKER_RATE_SHARE = float(os.getenv("JOB_WORKER_RATE_SHARE", "1.0"))
+
+_feedback_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def _retriever():
+    # Read-only in workers: only the API process saves the index. Reloaded when
+    # the API has saved new outputs or feedback since, so examples stay current
+    global _feedback_retriever
+    with _retriever_lock:
+        if _feedback_retriever is None:
+            from src.loaders.retriever import FeedbackRetriever
+            _feedback_retriever = FeedbackRetriever()
+        else:
+            _feedback_retriever.refresh()
+        return _feedback_retriever
+
+
+async def generate(kind: str, payload: dict) -> dict:
+    """Run the generation behind a job kind; returns ``{"content", "generation"}``."""
+    # Queued work yields to interactive requests in the rate-limit scheduler
+    with lane("batch"):
+        return await _generate(kind, payload)
+
+
+async def _generate(kind: str, payload: dict) -> dict:
+    if kind in ("instagram_content", "facebook_content", "linkedin_content"):
+        from src.chains.facebook_chain import FacebookContentChain
+        from src.chains.instagram_chain import InstagramContentChain
+        from src.chains.linkedin_chain import LinkedInContentChain
+
+        chain_class = {
+            "instagram_content": InstagramContentChain,
+            "facebook_content": FacebookContentChain,
+            "linkedin_content": LinkedInContentChain,
+        }[kind]
+        chain = chain_class()
+        content = await chain.generate(mode="content", **payload)
+        return {"content": content, "generation": chain.last_generation}
+    if kind == "content_strategy":
+        if payload.get("sectioned", True):
+            from src.chains.strategy_chain import StrategyEngine
+            content = await StrategyEngine(feedback_retriever=await asyncio.to_thread(_retriever)).generate(**payload)
+        else:
+            from src.chains.linkedin_chain import LinkedInContentChain
+            content = await LinkedInContentChain().generate(mode="strategy", **payload)
+        return {"content": content, "generation": None}
+    if kind == "calendar":
+        from src.chains.calendar_chain import CalendarEngine
+        return {"content": await CalendarEngine().generate(**payload), "generation": None}
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, concurrency: int = JOB_WORKER_CONCURRENCY,
+                 poll_interval: float = JOB_POLL_INTERVAL, worker_id: str | None = None):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = asyncio.Event()
+
+    async def _heartbeat(self, job_id: str, generation: asyncio.Task, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id, self.worker_id):
+                logger.warning(f"Lost the lease on job {job_id}; abandoning it")
+                lost.set()
+                generation.cancel()
+                return
+
+    async def run_job(self, job: dict):
+        job_id = job["job_id"]
+        logger.info(f"Running job {job_id} ({job['kind']}, attempt {job['attempts']})")
+        lost = asyncio.Event()
+        generation = asyncio.ensure_future(generate(job["kind"], job["payload"]))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id, generation, lost))
+        try:
+            result = await generation
+        except asyncio.CancelledError:
+            if lost.is_set():
+                return  # another worker owns the job now
+            raise
+        except Exception as e:
+            # Invalid input never succeeds on retry
+            status = await asyncio.to_thread(
+                self.queue.fail, job_id, self.worker_id, str(e), not isinstance(e, (ValueError, TypeError)),
+            )
+            metrics.incr("jobs.failed_attempts")
+            logger.warning(f"Job {job_id} failed ({status}): {e}")
+        else:
+            await asyncio.to_thread(self.queue.complete, job_id, self.worker_id, result)
+            metrics.incr("jobs.generated")
+            logger.info(f"Job {job_id} generated")
+        finally:
+            heartbeat.cancel()
+
+    async def _loop(self):
+        while not self.stopping.is_set():
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_job(job)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+                pass
+        logger.info(f"Worker {self.worker_id} polling {self.queue.db_path} with {self.concurrency} slots")
+        await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+
+def _run_process(concurrency: int, poll_interval: float, processes: int = 1):
+    setup_logging()
+    share = JOB_WORKER_RATE_SHARE / processes
+    scheduler.set_limits(REQUESTS_PER_MINUTE * share, TOKENS_PER_MINUTE * share)
+    try:
+        asyncio.run(Worker(JobQueue(), concurrency, poll_interval).run())
+    finally:
+        shutdown_logging()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run generation workers for the job queue")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this host")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY, help="Jobs in flight per process")
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _run_process(args.concurrency, args.poll_interval)
+        return
+    processes = [
+        multiprocessing.Process(target=_run_process, args=(args.concurrency, args.poll_interval, args.processes))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Children got the same SIGINT and are finishing their in-flight jobs
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from langchain_openai import ChatOpenAI
+from src.archive import archive_output
+from src.openai_clients import get_chat_model
 import os
 from dotenv import load_dotenv
 import re
@@ -10,14 +11,25 @@ load_dotenv()
 def timestamp():
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
-def save_output(content, output_dir, filename_prefix):
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{filename_prefix}_{timestamp}.md"
-    filepath = os.path.join(output_dir, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
-    return filepath
+def save_output(content, output_dir, filename_prefix, output_id=None, metadata=None, generation=None):
+    """Archive an output (see src/archive.py) and return its output id.
+
+    The archive write is queued to a background thread; ``output_dir`` only
+    names the record's category (e.g. ``instagram_contents``). ``generation``
+    (prompt inputs and candidates) is archived with the output so
+    ``/regenerate_output/`` can reuse its context after a restart.
+    """
+    category = os.path.basename(os.path.normpath(output_dir))
+    return archive_output(content, category, filename_prefix, output_id=output_id, metadata=metadata,
+                          generation=generation)
+
+def feedback_label(rating=None, engagement_metrics=None) -> str:
+    """Engagement label used to pick few-shot examples (shared by feedback and imports)."""
+    if rating and rating >= 4:
+        return "high_engagement"
+    elif engagement_metrics and engagement_metrics.get("likes", 0) > 50:
+        return "high_engagement"
+    return "needs_improvement"
 
 PRIMARY_KEYWORDS = [
     "seo", "search engine", "rank", "conversions", "website", "site speed",
@@ -35,7 +47,7 @@ def _keyword_density(text: str, keyword: str) -> float:
     return kw_occurrences / len(tokens)
 
 
-def validate_content(content: str, use_case: str | None = None) -> tuple[bool, str]:
+def seo_report(content: str, use_case: str | None = None) -> tuple[bool, dict]:
     """Enhanced SEO validation.
 
     Checks:
@@ -81,10 +93,29 @@ def validate_content(content: str, use_case: str | None = None) -> tuple[bool, s
         "flesch_score": round(readability, 2),
         "readability_ok": readability_ok,
     }
+    return passed, message
+
+
+def validate_content(content: str, use_case: str | None = None) -> tuple[bool, str]:
+    """SEO validation as ``(passed, message)``; see ``seo_report`` for the checks."""
+    passed, message = seo_report(content, use_case)
     return passed, str(message)
 
+
+def score_content(content: str, use_case: str | None = None) -> float:
+    """Rank candidates: one point per passed SEO check, readability breaks ties."""
+    _, report = seo_report(content, use_case)
+    checks = bool(report["keywords_present"]) + report["density_ok"] + report["readability_ok"]
+    return checks + max(0.0, min(report["flesch_score"], 100.0)) / 1000
+
+
+def rank_candidates(candidates: list[str], use_case: str | None = None) -> list[tuple[str, float]]:
+    """Return ``(candidate, score)`` pairs, best first."""
+    scored = [(candidate, score_content(candidate, use_case)) for candidate in candidates]
+    return sorted(scored, key=lambda item: item[1], reverse=True)
+
 # Initialize LLM
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     raise ValueError("OPENAI_API_KEY not found in environment variables")
-llm = ChatOpenAI(temperature=0.7, model="gpt-4o-mini", openai_api_key=api_key)
\ No newline at end of file
+llm = get_chat_model(temperature=0.7, model="gpt-4o-mini", openai_api_key=api_key)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import logging
+import math
+import os
+import pickle
+import re
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+BM25_FILENAME = "bm25.pkl"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Common English words plus the boilerplate of the templated retrieval
+# queries in rag_pipeline, which would otherwise match every chunk.
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+you your we our they their them he she his her not but if so than then there these those into about
+provide context post tone insight audience persona general topic neutral content strategy calendar
+""".split())
+
+_LEXICAL_CACHE = {}
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def is_knowledge_document(doc) -> bool:
+    """Generated outputs are stored in the same FAISS index with an ``output_id``."""
+    return "output_id" not in (doc.metadata or {})
+
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {position: term frequency}
+        self.doc_ids = []
+        self.doc_len = []
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, text: str):
+        tokens = tokenize(text)
+        position = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_len.append(len(tokens))
+        self.total_len += len(tokens)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[position] = tf
+
+    def idf(self, term: str) -> float:
+        n = len(self.doc_ids)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> tuple[list[tuple[str, float]], float]:
+        """Return the top ``k`` ``(doc_id, score)`` pairs and a confidence in [0, 1).
+
+        The confidence is the best score as a fraction of the highest score any
+        document could reach for this query, so it is comparable across queries.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.doc_ids:
+            return [], 0.0
+        avgdl = self.total_len / len(self.doc_ids) or 1.0
+        scores = {}
+        upper_bound = 0.0
+        for term in terms:
+            idf = self.idf(term)
+            upper_bound += idf * (self.k1 + 1)
+            for position, tf in self.postings.get(term, {}).items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[position] / avgdl)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        if not scores:
+            return [], 0.0
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        confidence = top[0][1] / upper_bound if upper_bound else 0.0
+        return [(self.doc_ids[position], score) for position, score in top], confidence
+
+    def save(self, index_path: str):
+        from src.loaders.index_files import write_atomic
+
+        os.makedirs(index_path, exist_ok=True)
+        # Other processes load the sidecar while it is rewritten
+        write_atomic(os.path.join(index_path, BM25_FILENAME), pickle.dumps(self))
+
+    @staticmethod
+    def load(index_path: str) -> "BM25Index | None":
+        path = os.path.join(index_path, BM25_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def _knowledge_documents(vector_store):
+    for doc_id in vector_store.index_to_docstore_id.values():
+        doc = vector_store.docstore.search(doc_id)
+        if hasattr(doc, "page_content") and is_knowledge_document(doc):
+            yield doc_id, doc.page_content
+
+
+def build_lexical_index(vector_store) -> BM25Index:
+    """Build a BM25 index over the knowledge-base documents of a FAISS store."""
+    index = BM25Index()
+    for doc_id, text in _knowledge_documents(vector_store):
+        index.add(doc_id, text)
+    return index
+
+
+def load_lexical_index(vector_store, index_path: str) -> BM25Index:
+    """Load the BM25 sidecar for ``index_path``, rebuilding it if it is stale.
+
+    ``vector_store`` is the store loaded from ``index_path``. The index is
+    cached per index-file fingerprint (see ``index_files.fingerprint``), so the
+    docstore is only scanned after the index was saved again. The sidecar is
+    considered fresh when it covers exactly the knowledge-base documents
+    currently in the FAISS docstore.
+    """
+    from src.loaders.index_files import fingerprint
+
+    # ntotal guards against a save between loading the store and this call
+    key = (fingerprint(index_path), vector_store.index.ntotal)
+    cached = _LEXICAL_CACHE.get(index_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    current_ids = {doc_id for doc_id, _ in _knowledge_documents(vector_store)}
+    if cached is not None and set(cached[1].doc_ids) == current_ids:
+        index = cached[1]
+    else:
+        index = BM25Index.load(index_path)
+        if index is None or set(index.doc_ids) != current_ids:
+            logger.info(f"Rebuilding BM25 index for {index_path} ({len(current_ids)} documents)")
+            index = build_lexical_index(vector_store)
+            index.save(index_path)
+    _LEXICAL_CACHE[index_path] = (key, index)
+    return index
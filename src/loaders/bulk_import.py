@@ -0,0 +1,305 @@
+"""Streaming bulk import of historical posts (with engagement metrics) as feedback examples.
+
+Rows are streamed from CSV or JSONL, embedded in large batches with several
+batches in flight (on the ``batch`` scheduler lane, so interactive requests
+keep priority), added to the FAISS store directly and committed every
+``commit_every`` rows. A commit saves the index, then archives the new
+outputs and records them in the catalog and analytics, then writes a
+checkpoint of how many rows are durable, so an interrupted import resumes
+where it stopped. Output ids are derived from platform + content, so
+re-importing a row is a no-op: rows already in the saved index are skipped,
+and only archived if a crash interrupted their commit.
+
+    python -m src.loaders.bulk_import posts.csv --platform linkedin
+
+The index has a single writer: the CLI refuses to run while the API (or
+another import) holds the index's writer lock; use ``POST /import_outputs/``
+to import into a running API.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+
+from src.archive import get_archive
+from src.langchain_utils import feedback_label, save_output
+from src.metrics import metrics
+from src.scheduler import lane
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "512"))
+IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", "4"))
+IMPORT_COMMIT_ROWS = int(os.getenv("IMPORT_COMMIT_ROWS", "10000"))
+
+SUPPORTED_PLATFORMS = ("instagram", "facebook", "linkedin")
+# Accepted column names for each field, first match wins
+COLUMNS = {
+    "content": ("content", "text", "post", "caption", "message"),
+    "platform": ("platform", "network"),
+    "likes": ("likes", "like_count", "reactions"),
+    "shares": ("shares", "share_count", "reposts"),
+    "rating": ("rating",),
+    "comment": ("comment", "notes"),
+    "timestamp": ("timestamp", "date", "published_at", "created_at"),
+    "content_topic": ("content_topic", "topic"),
+}
+
+
+def _field(row: dict, name: str):
+    for column in COLUMNS[name]:
+        value = row.get(column)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _int(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_rows(path: str):
+    """Stream raw rows from a ``.csv`` or ``.jsonl``/``.ndjson`` file."""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported import format: {path} (expected .csv or .jsonl)")
+
+
+def to_output(row: dict, default_platform: str | None = None) -> tuple[str, dict] | None:
+    """Map an import row to ``(content, metadata)``; None for rows that cannot be used."""
+    content = (_field(row, "content") or "").strip()
+    platform = (_field(row, "platform") or default_platform or "").strip().lower()
+    if not content or platform not in SUPPORTED_PLATFORMS:
+        return None
+    rating = _int(_field(row, "rating")) or None
+    engagement = {"likes": _int(_field(row, "likes")), "shares": _int(_field(row, "shares"))}
+    metadata = {
+        "output_id": row.get("output_id") or str(uuid.uuid5(uuid.NAMESPACE_URL, f"{platform}:{content}")),
+        "platform": platform,
+        "use_case": "content",
+        "content_topic": _field(row, "content_topic"),
+        "timestamp": _field(row, "timestamp") or datetime.utcnow().isoformat(),
+        "source": "import",
+        "feedback": {
+            "rating": rating,
+            "comment": _field(row, "comment"),
+            "engagement_metrics": engagement,
+            "label": feedback_label(rating, engagement),
+        },
+    }
+    return content, metadata
+
+
+def checkpoint_path_for(source: str) -> str:
+    return f"{source}.import-checkpoint.json"
+
+
+def read_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"rows_done": 0, "imported": 0, "skipped": 0, "finished": False}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_checkpoint(path: str, state: dict):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**state, "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp, path)
+
+
+class BulkImporter:
+    def __init__(self, retriever, catalog=None, analytics=None, batch_size: int = IMPORT_BATCH_SIZE,
+                 concurrency: int = IMPORT_CONCURRENCY, commit_every: int = IMPORT_COMMIT_ROWS):
+        self.retriever = retriever
+        self.catalog = catalog
+        self.analytics = analytics
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.commit_every = commit_every
+
+    def _batches(self, source: str, default_platform: str | None, start: int):
+        """Yield ``(rows_consumed, [(content, metadata), ...], indexed)`` batches after ``start`` rows.
+
+        ``indexed`` are the rows that are already in the index; they are not
+        embedded again.
+        """
+        docstore = self.retriever.vector_store.docstore
+        batch, indexed, consumed = [], [], 0
+        for index, row in enumerate(iter_rows(source)):
+            if index < start:
+                continue
+            consumed += 1
+            output = to_output(row, default_platform)
+            if output is not None:
+                if hasattr(docstore.search(output[1]["output_id"]), "metadata"):
+                    indexed.append(output)
+                else:
+                    batch.append(output)
+            if consumed >= self.batch_size:
+                yield consumed, batch, indexed
+                batch, indexed, consumed = [], [], 0
+        if consumed:
+            yield consumed, batch, indexed
+
+    async def _embed(self, batch):
+        if not batch:
+            return batch, []
+        vectors = await self.retriever.embeddings.aembed_documents([content for content, _ in batch])
+        return batch, vectors
+
+    def _add(self, batch, vectors) -> list[tuple[str, dict]]:
+        """Add embedded rows to the index; returns the ``(content, metadata)`` added."""
+        # Batches of one window are filtered before any of them is added, so recheck;
+        # duplicates in the source keep their first row
+        docstore = self.retriever.vector_store.docstore
+        seen, texts, added = set(), [], []
+        for (content, metadata), vector in zip(batch, vectors):
+            if metadata["output_id"] in seen or hasattr(docstore.search(metadata["output_id"]), "metadata"):
+                continue
+            seen.add(metadata["output_id"])
+            texts.append((content, vector))
+            added.append((content, metadata))
+        if texts:
+            with self.retriever.index_lock:
+                self.retriever.vector_store.add_embeddings(
+                    texts, metadatas=[m for _, m in added], ids=[m["output_id"] for _, m in added],
+                )
+        return added
+
+    @staticmethod
+    def _unrecorded(outputs):
+        """Indexed rows whose commit was interrupted before they were archived."""
+        archive = get_archive()
+        return [(content, metadata) for content, metadata in outputs if archive.get(metadata["output_id"]) is None]
+
+    def _record(self, outputs):
+        """Archive outputs the saved index holds and record them in the catalog and analytics.
+
+        Runs after the index save: archiving earlier would append the rows
+        again when a crash before the save makes the resumed import re-add them.
+        """
+        seen, metadatas = set(), []
+        for content, metadata in outputs:
+            # A source row repeated within one commit is both added and already indexed
+            if metadata["output_id"] in seen:
+                continue
+            seen.add(metadata["output_id"])
+            metadatas.append(metadata)
+            save_output(content, "data/output/imports", f"{metadata['platform']}_import",
+                        output_id=metadata["output_id"], metadata=metadata)
+        if not metadatas:
+            return
+        # Durable before the checkpoint skips these rows
+        get_archive().flush()
+        if self.catalog is not None:
+            self.catalog.upsert_many(metadatas)
+        if self.analytics is not None:
+            self.analytics.record_many([(m["output_id"], m) for m in metadatas])
+
+    async def run(self, source: str, default_platform: str | None = None, checkpoint: str | None = None,
+                  progress=None) -> dict:
+        """Import ``source``; resumes from ``checkpoint`` (default ``<source>.import-checkpoint.json``)."""
+        checkpoint = checkpoint or checkpoint_path_for(source)
+        state = read_checkpoint(checkpoint)
+        if state.get("finished"):
+            return state
+        state["source"] = source
+        if state["rows_done"]:
+            logger.info(f"Resuming import of {source} after {state['rows_done']} rows")
+        started = time.monotonic()
+        uncommitted, pending = 0, []
+        batches = self._batches(source, default_platform, state["rows_done"])
+
+        async def commit():
+            nonlocal uncommitted, pending
+            await asyncio.to_thread(self.retriever.save_index)
+            await asyncio.to_thread(self._record, pending)
+            _write_checkpoint(checkpoint, state)
+            uncommitted, pending = 0, []
+            if progress is not None:
+                progress(state)
+
+        with lane("batch"):
+            while True:
+                # Bounded window: at most `concurrency` batches are held and embedded at once
+                window = [item for _, item in zip(range(self.concurrency), batches)]
+                if not window:
+                    break
+                embedded = await asyncio.gather(*(self._embed(batch) for _, batch, _ in window))
+                for (consumed, batch, indexed), (_, vectors) in zip(window, embedded):
+                    # Off the loop: the index lock may be held by a save in progress
+                    added = await asyncio.to_thread(self._add, batch, vectors)
+                    if indexed:
+                        pending.extend(await asyncio.to_thread(self._unrecorded, indexed))
+                    pending.extend(added)
+                    state["rows_done"] += consumed
+                    state["imported"] += len(added)
+                    state["skipped"] += consumed - len(added)
+                    uncommitted += consumed
+                metrics.incr("import.rows", sum(consumed for consumed, _, _ in window))
+                if uncommitted >= self.commit_every:
+                    await commit()
+            state["finished"] = True
+            await commit()
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Imported {state['imported']} posts from {source} ({state['skipped']} skipped) in {elapsed:.1f}s"
+        )
+        return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import historical posts as feedback examples")
+    parser.add_argument("source", help="CSV or JSONL file of posts with engagement metrics")
+    parser.add_argument("--platform", choices=SUPPORTED_PLATFORMS, help="Platform for rows without a platform column")
+    parser.add_argument("--index-path", help="FAISS index directory (default: the retriever's)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=IMPORT_CONCURRENCY)
+    parser.add_argument("--commit-every", type=int, default=IMPORT_COMMIT_ROWS)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    from src.analytics import FeedbackAnalytics
+    from src.file_lock import LockHeld
+    from src.loaders.retriever import FeedbackRetriever
+    from src.output_catalog import OutputCatalog
+
+    logging.basicConfig(level=logging.INFO)
+    if args.restart and os.path.exists(checkpoint_path_for(args.source)):
+        os.remove(checkpoint_path_for(args.source))
+    retriever = FeedbackRetriever(index_path=args.index_path)
+    try:
+        retriever.acquire_writer_lock("bulk_import")
+    except LockHeld as e:
+        parser.exit(1, f"Cannot import while another process writes the index ({e}); "
+                       "stop it or use POST /import_outputs/\n")
+    importer = BulkImporter(
+        retriever, catalog=OutputCatalog(), analytics=FeedbackAnalytics(),
+        batch_size=args.batch_size, concurrency=args.concurrency, commit_every=args.commit_every,
+    )
+    state = asyncio.run(importer.run(
+        args.source, args.platform,
+        progress=lambda s: logger.info(f"{s['rows_done']} rows committed ({s['imported']} imported)"),
+    ))
+    print(json.dumps(state))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Registry of chunking strategies, selectable per source.
+
+Chunk size drives vector count, search time and prompt tokens, so the
+splitter is chosen per source type instead of being hardcoded:
+
+* ``fixed`` – recursive character splitting (the original 500/50 behaviour)
+* ``sentence`` – packs whole sentences up to the chunk size, overlapping by sentences
+* ``heading`` – one chunk per heading section of a page (brochure-style
+  documents), long sections sentence-split, ``section`` kept in metadata
+* ``semantic`` – merges short adjacent fragments while they stay on the same
+  topic (lexical overlap), so bullet lists don't become one vector per line
+
+Selection: ``CHUNKING_STRATEGIES="pdf=heading,html=sentence,default=fixed"``.
+See ``benchmarks/bench_chunking.py`` for index size / hit-rate numbers.
+"""
+import os
+import re
+
+from src.loaders.bm25 import tokenize
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
+# Semantic merge: fragments shorter than this are always merged into a neighbour
+CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", "150"))
+CHUNK_MERGE_SIMILARITY = float(os.getenv("CHUNK_MERGE_SIMILARITY", "0.15"))
+
+CHUNKERS = {}
+
+# Not after list numbers ("5. Service"), which are part of the next sentence
+_SENTENCE_END = re.compile(r"(?<=[.!?])(?<!\b\d\.)\s+(?=[\"'“(\[A-Z0-9])|\n{2,}")
+_BULLET = re.compile(r"\s+(?=[●○•▪])")
+_HEADING = re.compile(r"^\s*(#{1,6}\s+\S.*|\d+(\.\d+)*\.?\s+[A-Z][^.:!?]{0,60}|[A-Z][A-Z0-9 &/,'-]{3,60})\s*$")
+# A numbered section whose body follows on the same line ("5.1 Web Development ● ...")
+_SECTION_START = re.compile(r"^\s*\d+(\.\d+)*\.?\s+[A-Z]")
+_SUBSECTION = re.compile(r"\s+(?=\d+\.\d+\.?\s+[A-Z])")
+_LABEL_END = re.compile(r"\s[●○•▪]\s|:|\s\d+(\.\d+)*\.?\s")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n[ \t]*\n")
+# pypdf's word-per-line layout separates words with whitespace-only lines ("word\n \nword")
+_WORD_BREAK = re.compile(r"\n[ \t]+\n")
+
+
+def register(name: str):
+    """Register ``fn(text, **params) -> [(chunk_text, extra_metadata), ...]`` under ``name``."""
+    def decorator(fn):
+        CHUNKERS[name] = fn
+        return fn
+    return decorator
+
+
+def _strategy_map() -> dict:
+    mapping = {"default": "fixed"}
+    for item in os.getenv("CHUNKING_STRATEGIES", "").split(","):
+        if "=" in item:
+            source, strategy = (part.strip().lower() for part in item.split("=", 1))
+            mapping[source.lstrip(".")] = strategy
+    return mapping
+
+
+def strategy_for(source: str | None) -> str:
+    """Configured strategy for a source path or URL, by file extension (web pages count as ``html``)."""
+    mapping = _strategy_map()
+    if (source or "").startswith(("http://", "https://")):
+        extension = "html"
+    else:
+        extension = os.path.splitext(source or "")[1].lower().lstrip(".")
+    strategy = mapping.get(extension, mapping["default"])
+    if strategy not in CHUNKERS:
+        raise ValueError(f"Unknown chunking strategy {strategy!r}; expected one of {sorted(CHUNKERS)}")
+    return strategy
+
+
+def normalize(text: str) -> str:
+    """Rejoin word-per-line PDF extractions (``word\\n \\nword``) into one paragraph per line."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    # Short lines alone are not enough: bullet-heavy Markdown has them too
+    if not lines or sum(map(len, lines)) / len(lines) >= 15 or len(_WORD_BREAK.findall(text)) < len(lines) / 2:
+        return text
+    return "\n".join(" ".join(p.split()) for p in _PARAGRAPH_BREAK.split(text) if p.strip())
+
+
+def sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def _wrap(sentence: str, size: int) -> list[str]:
+    """Split an over-long sentence at bullets, then at word boundaries, then inside over-long words."""
+    pieces = []
+    for part in _BULLET.split(sentence):
+        line = ""
+        for word in part.split():
+            if len(word) > size:
+                # A URL, hash or run-on token: no boundary to respect
+                if line:
+                    pieces.append(line)
+                    line = ""
+                pieces.extend(word[start:start + size] for start in range(0, len(word), size))
+                continue
+            if line and len(line) + len(word) + 1 > size:
+                pieces.append(line)
+                line = ""
+            line = f"{line} {word}" if line else word
+        if line:
+            pieces.append(line)
+    return pieces
+
+
+def _pack(pieces: list[str], chunk_size: int, chunk_overlap: int) -> list[str]:
+    """Greedily pack pieces up to ``chunk_size``, carrying trailing pieces up to ``chunk_overlap``."""
+    chunks, current, length = [], [], 0
+    for piece in pieces:
+        if current and length + len(piece) + 1 > chunk_size:
+            chunks.append(" ".join(current))
+            carried, carried_len = [], 0
+            for previous in reversed(current):
+                if carried_len + len(previous) > chunk_overlap:
+                    break
+                carried.insert(0, previous)
+                carried_len += len(previous) + 1
+            current, length = carried, carried_len
+        current.append(piece)
+        length += len(piece) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+@register("fixed")
+def fixed_chunks(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP, **_):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [(chunk, {}) for chunk in splitter.split_text(text)]
+
+
+@register("sentence")
+def sentence_chunks(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP, **_):
+    pieces = []
+    for sentence in sentences(normalize(text)):
+        pieces.extend(_wrap(sentence, chunk_size) if len(sentence) > chunk_size else [sentence])
+    return [(chunk, {}) for chunk in _pack(pieces, chunk_size, chunk_overlap)]
+
+
+@register("heading")
+def heading_chunks(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP,
+                   min_chars: int = CHUNK_MIN_CHARS, **_):
+    sections, heading, body = [], None, []
+    lines = [part for line in normalize(text).splitlines() for part in _SUBSECTION.split(line)]
+    for line in lines:
+        standalone = _HEADING.match(line) and len(line.strip()) < 80
+        if standalone or _SECTION_START.match(line):
+            if body or heading:
+                sections.append((heading, "\n".join(body).strip()))
+            if standalone:
+                heading, body = line.strip().lstrip("#").strip(), []
+            else:
+                heading, body = _LABEL_END.split(line.strip(), maxsplit=1)[0][:60].strip(), [line]
+        else:
+            body.append(line)
+    sections.append((heading, "\n".join(body).strip()))
+
+    chunks, pending = [], ""
+    for heading, body in sections:
+        section = body if heading and body.startswith(heading) else f"{heading or ''}\n{body}".strip()
+        if not section:
+            continue
+        if pending:
+            section, pending = f"{pending}\n{section}", ""
+        if len(section) < min_chars and heading and not body:
+            pending = section  # a heading with no body of its own belongs to the next section
+            continue
+        metadata = {"section": heading} if heading else {}
+        if len(section) <= chunk_size:
+            chunks.append((section, metadata))
+            continue
+        inline = bool(heading) and body.startswith(heading)
+        for index, (piece, _) in enumerate(sentence_chunks(body, chunk_size - len(heading or "") - 1, chunk_overlap)):
+            # Every piece keeps its heading so it is retrievable on its own
+            if heading and not (inline and index == 0):
+                piece = f"{heading}\n{piece}"
+            chunks.append((piece, metadata))
+    if pending:
+        chunks.append((pending, {}))
+    return chunks
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@register("semantic")
+def semantic_chunks(text: str, chunk_size: int = CHUNK_SIZE, min_chars: int = CHUNK_MIN_CHARS,
+                    threshold: float = CHUNK_MERGE_SIMILARITY, **_):
+    fragments = []
+    for sentence in sentences(normalize(text).replace("\n", "\n\n")):
+        # Over-long sentences (bullet lists extracted as one line) become their bullets
+        fragments.extend(_wrap(sentence, chunk_size) if len(sentence) > chunk_size else [sentence])
+    chunks, current, current_terms = [], "", set()
+    for fragment in fragments:
+        terms = set(tokenize(fragment))
+        fits = len(current) + len(fragment) + 1 <= chunk_size
+        related = len(current) < min_chars or len(fragment) < min_chars // 2 or \
+            _similarity(current_terms, terms) >= threshold
+        if current and fits and related:
+            current = f"{current} {fragment}"
+            current_terms |= terms
+            continue
+        if current:
+            chunks.append(current)
+        current, current_terms = fragment, set(tokenize(fragment))
+    if current:
+        chunks.append(current)
+    return [(chunk, {}) for chunk in chunks]
+
+
+def chunk_text(text: str, metadata: dict | None = None, strategy: str | None = None, **params):
+    """Split one parsed unit (a page, a file) into ``(text, metadata)`` chunks."""
+    metadata = metadata or {}
+    strategy = strategy or strategy_for(metadata.get("source"))
+    return [
+        (chunk, {**metadata, **extra, "chunking": strategy})
+        for chunk, extra in CHUNKERS[strategy](text, **params)
+        if chunk.strip()
+    ]
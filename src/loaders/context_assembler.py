@@ -0,0 +1,133 @@
+import logging
+import os
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Combined token budget for knowledge context + feedback examples, per platform.
+# Override with CONTEXT_TOKEN_BUDGET_<PLATFORM>, e.g. CONTEXT_TOKEN_BUDGET_LINKEDIN=1500.
+DEFAULT_TOKEN_BUDGETS = {
+    "instagram": 700,
+    "facebook": 900,
+    "linkedin": 1100,
+    "all": 2000,
+}
+# Share of the budget reserved for feedback examples; unused share goes to knowledge context
+FEEDBACK_BUDGET_SHARE = float(os.getenv("CONTEXT_FEEDBACK_SHARE", "0.35"))
+# Retrieved chunks with a relevance score below this are dropped
+MIN_RELEVANCE = float(os.getenv("CONTEXT_MIN_RELEVANCE", "0.2"))
+# Upper bound on candidates fetched before budgeting (adaptive k)
+MAX_CANDIDATES = int(os.getenv("CONTEXT_MAX_CANDIDATES", "8"))
+# Overlapping chunks are stitched when they share at least this many characters
+MIN_MERGE_OVERLAP = 20
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.encoding_for_model("gpt-4o-mini")
+except Exception:  # tiktoken missing or model unknown: fall back to a char heuristic
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else _ENCODING.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def token_budget(platform: str) -> int:
+    override = os.getenv(f"CONTEXT_TOKEN_BUDGET_{platform.upper()}")
+    if override:
+        return int(override)
+    return DEFAULT_TOKEN_BUDGETS.get(platform, DEFAULT_TOKEN_BUDGETS["all"])
+
+
+def _source_key(doc) -> tuple:
+    meta = doc.metadata or {}
+    return meta.get("source"), meta.get("page")
+
+
+def _stitch(first: str, second: str) -> str | None:
+    """Join two chunks if one contains the other or the end of ``first`` is the start of ``second``."""
+    if second in first:
+        return first
+    if first in second:
+        return second
+    for size in range(min(len(first), len(second)) - 1, MIN_MERGE_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return None
+
+
+def merge_chunks(docs) -> list[str]:
+    """Merge adjacent/overlapping chunks from the same source and page, keeping rank order."""
+    merged = []  # [source_key, text]
+    for doc in docs:
+        key = _source_key(doc)
+        text = doc.page_content
+        for entry in merged:
+            if entry[0] != key:
+                continue
+            stitched = _stitch(entry[1], text) or _stitch(text, entry[1])
+            if stitched is not None:
+                entry[1] = stitched
+                break
+        else:
+            merged.append([key, text])
+    return [text for _, text in merged]
+
+
+def _fill(texts, budget: int) -> tuple[list[str], int]:
+    """Take texts in order while they fit in ``budget``; truncate the first one if nothing fits."""
+    chosen, used = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if used + tokens <= budget:
+            chosen.append(text)
+            used += tokens
+        elif not chosen:
+            chosen.append(truncate_to_tokens(text, budget))
+            used = budget
+            break
+    return chosen, used
+
+
+def assemble_context(platform: str, scored_docs, feedback_examples: list[str], budget: int | None = None) -> tuple[str, str]:
+    """Fit knowledge context and feedback examples into the platform's token budget.
+
+    ``scored_docs`` are ``(document, relevance)`` pairs in rank order (see
+    ``HybridRetriever.asearch``). Returns ``(context, feedback_context)``.
+    """
+    budget = budget or token_budget(platform)
+    naive_tokens = (
+        count_tokens("\n".join(doc.page_content for doc, _ in scored_docs[:3]))
+        + count_tokens("\n".join(f"Example: {ex}" for ex in feedback_examples))
+    )
+
+    examples, feedback_used = _fill(
+        [f"Example: {ex}" for ex in feedback_examples],
+        int(budget * FEEDBACK_BUDGET_SHARE),
+    )
+    relevant = [doc for doc, score in scored_docs if score >= MIN_RELEVANCE]
+    chunks, context_used = _fill(merge_chunks(relevant), budget - feedback_used)
+
+    used = feedback_used + context_used
+    saved = max(0, naive_tokens - used)
+    metrics.incr("context.tokens_saved", saved)
+    metrics.observe("context.tokens_used", used)
+    logger.info(
+        f"Context assembly ({platform}): {len(chunks)}/{len(scored_docs)} chunks, "
+        f"{len(examples)}/{len(feedback_examples)} examples, {used}/{budget} tokens, {saved} tokens saved"
+    )
+    return "\n".join(chunks), "\n".join(examples)
@@ -0,0 +1,117 @@
+import logging
+import os
+import time
+
+import numpy as np
+
+from src.loaders.retrieval_cache import knowledge_version, retrieval_cache
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Minimum BM25 confidence (see BM25Index.search) at which the lexical results
+# are trusted on their own and the embedding call + FAISS search are skipped.
+LEXICAL_CONFIDENCE = float(os.getenv("HYBRID_LEXICAL_CONFIDENCE", "0.25"))
+RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+
+
+def reciprocal_rank_fusion(*rankings: list[str], rrf_k: int = RRF_K) -> list[tuple[str, float]]:
+    """Fuse ranked lists of ids, scoring each id by sum(1 / (rrf_k + rank))."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    """BM25 + vector retrieval over a FAISS store, fused with reciprocal rank fusion.
+
+    Exposes ``ainvoke(query)`` so it can stand in for ``vector_store.as_retriever()``.
+    Results are cached per knowledge-index version (see ``retrieval_cache``).
+    """
+
+    def __init__(self, vector_store, lexical_index, k: int = 3, fetch_k: int | None = None,
+                 lexical_confidence: float = LEXICAL_CONFIDENCE, cache=retrieval_cache):
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.k = k
+        self.fetch_k = fetch_k or k * 3
+        self.lexical_confidence = lexical_confidence
+        self.cache = cache
+        self.version = knowledge_version(lexical_index)
+
+    def _scored_documents(self, scored_ids):
+        results = []
+        for doc_id, score in scored_ids:
+            doc = self.vector_store.docstore.search(doc_id)
+            if hasattr(doc, "page_content"):
+                results.append((doc, score))
+        return results
+
+    def lexical_search(self, query: str, k: int | None = None):
+        """Return ``({doc_id: relevance}, confidence)`` from the local inverted index only.
+
+        Relevance is the BM25 score as a fraction of the top hit's score, so it
+        lies in (0, 1] like the vector relevance scores. It is not scaled by the
+        confidence: a long query matching one rare term has a low confidence,
+        but its exact-term match is still relevant.
+        """
+        hits, confidence = self.lexical_index.search(query, k or self.fetch_k)
+        if not hits:
+            return {}, confidence
+        top_score = hits[0][1]
+        return {doc_id: score / top_score for doc_id, score in hits}, confidence
+
+    async def _vector_search(self, query: str, k: int, retrieval=None) -> dict[str, float]:
+        if retrieval is not None:
+            embedding = await retrieval.embedding()
+        else:
+            embedding = await self.vector_store.embeddings.aembed_query(query)
+        vector = np.array([embedding], dtype=np.float32)
+        if getattr(self.vector_store, "_normalize_L2", False):
+            import faiss
+            faiss.normalize_L2(vector)
+        distances, indices = self.vector_store.index.search(vector, k)
+        relevance_fn = self.vector_store._select_relevance_score_fn()
+        return {
+            self.vector_store.index_to_docstore_id[i]: relevance_fn(float(d))
+            for d, i in zip(distances[0], indices[0]) if i != -1
+        }
+
+    async def asearch(self, query: str, retrieval=None, k: int | None = None):
+        """Return up to ``k`` ``(document, relevance)`` pairs in fused rank order.
+
+        Relevance is the best of the document's vector and lexical relevance,
+        both in [0, 1], so callers can apply a single score threshold.
+        """
+        k = k or self.k
+        key = self.cache.key(self.version, query, k) if self.cache is not None else None
+        scored_ids = self.cache.get(key) if key is not None else None
+        if scored_ids is None:
+            scored_ids = await self._search(query, retrieval, k)
+            if key is not None:
+                self.cache.put(key, scored_ids)
+        return self._scored_documents(scored_ids)
+
+    async def _search(self, query: str, retrieval, k: int) -> tuple:
+        fetch_k = max(self.fetch_k, k)
+        start = time.perf_counter()
+        lexical, confidence = self.lexical_search(query, fetch_k)
+        if len(lexical) >= min(k, self.k) and confidence >= self.lexical_confidence:
+            metrics.incr("retrieval.lexical_fast_path")
+            metrics.observe("retrieval.lexical_fast_path", time.perf_counter() - start)
+            return tuple(list(lexical.items())[:k])
+
+        vector = await self._vector_search(query, fetch_k, retrieval)
+        fused = reciprocal_rank_fusion(list(lexical), list(vector))
+        metrics.incr("retrieval.hybrid")
+        metrics.observe("retrieval.hybrid", time.perf_counter() - start)
+        logger.debug(f"Hybrid retrieval: lexical confidence {confidence:.2f}, {len(fused)} fused candidates")
+        return tuple(
+            (doc_id, max(lexical.get(doc_id, 0.0), vector.get(doc_id, 0.0))) for doc_id, _ in fused[:k]
+        )
+
+    async def ainvoke(self, query: str, retrieval=None):
+        """Retrieve ``k`` documents, reusing the embedding of ``retrieval`` when given."""
+        return [doc for doc, _ in await self.asearch(query, retrieval)]
@@ -0,0 +1,90 @@
+"""Crash- and reader-safe saving and loading of the FAISS index directory.
+
+``save_faiss`` writes ``index.faiss``/``index.pkl`` to a temporary directory
+and moves each into place with ``os.replace`` (readers never see a partly
+written file), then records both files' identities in ``index.manifest.json``.
+``load_faiss`` only accepts a pair that matches the manifest and did not change
+while it was read, retrying otherwise, so processes that load the index while
+the API saves it (job workers, per-request retrievers) never get a torn or
+mismatched pair.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILES = ("index.faiss", "index.pkl")
+MANIFEST = "index.manifest.json"
+_LOAD_ATTEMPTS = 20
+_LOAD_RETRY_DELAY = 0.05
+
+
+def _fingerprint(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def fingerprint(index_path: str, *extra: str) -> tuple:
+    """Identity of the index files (plus ``extra`` files); changes on every save."""
+    return tuple(
+        tuple(_fingerprint(os.path.join(index_path, name)) or ()) for name in INDEX_FILES + extra
+    )
+
+
+def write_atomic(path: str, data: bytes):
+    """Replace ``path`` with ``data`` without readers ever seeing a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save_faiss(vector_store, index_path: str):
+    os.makedirs(index_path, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=index_path, prefix=".save-")
+    try:
+        vector_store.save_local(tmp)
+        for name in INDEX_FILES:
+            os.replace(os.path.join(tmp, name), os.path.join(index_path, name))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    manifest = {name: _fingerprint(os.path.join(index_path, name)) for name in INDEX_FILES}
+    write_atomic(os.path.join(index_path, MANIFEST), json.dumps(manifest).encode())
+
+
+def _manifest(index_path: str) -> dict | None:
+    try:
+        with open(os.path.join(index_path, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def load_faiss(index_path: str, embeddings):
+    """Load a consistent ``index.faiss``/``index.pkl`` pair, waiting out a concurrent save."""
+    for _ in range(_LOAD_ATTEMPTS):
+        before = {name: _fingerprint(os.path.join(index_path, name)) for name in INDEX_FILES}
+        manifest = _manifest(index_path)
+        # No manifest: an index written by an older version, accepted if stable while read
+        if manifest is None or manifest == before:
+            vector_store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+            after = {name: _fingerprint(os.path.join(index_path, name)) for name in INDEX_FILES}
+            if after == before and vector_store.index.ntotal == len(vector_store.index_to_docstore_id):
+                return vector_store
+        time.sleep(_LOAD_RETRY_DELAY)
+    raise RuntimeError(f"FAISS index at {index_path} kept changing while it was loaded")
@@ -0,0 +1,257 @@
+"""Parallel ingestion of a data directory into the FAISS index.
+
+Files are parsed *and* chunked in a process pool (PDF via pypdf, DOCX via
+docx2txt, JSON, HTML via BeautifulSoup, plain text). Chunks stream back as
+each file finishes and are embedded in concurrent batches, then added to the
+index batch by batch; at most a small window of files and batches is held in
+memory at any time, never the whole corpus as ``Document`` objects. Embedding
+calls run in the scheduler's ``background`` lane, behind user requests.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from langchain_community.vectorstores import FAISS
+
+from src.loaders.bm25 import build_lexical_index
+from src.loaders.chunking import chunk_text, strategy_for
+from src.loaders.index_files import save_faiss
+from src.metrics import metrics
+from src.openai_clients import get_embeddings
+from src.scheduler import lane
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(8, os.cpu_count() or 1))))
+INGEST_EMBED_BATCH = int(os.getenv("INGEST_EMBED_BATCH", "256"))
+INGEST_EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "4"))
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".json", ".html", ".htm", ".txt", ".md")
+# Subdirectories of the data directory holding runtime data (generated outputs,
+# archive, import uploads and checkpoints), never company knowledge
+INGEST_EXCLUDE_DIRS = tuple(
+    name.strip().strip("/") for name in os.getenv("INGEST_EXCLUDE_DIRS", "output,imports").split(",") if name.strip()
+)
+
+
+def scan(data_dir: str, exclude=INGEST_EXCLUDE_DIRS) -> list[str]:
+    """Every supported file under ``data_dir``, in a stable order, skipping the ``exclude`` subdirectories."""
+    paths = []
+    for root, dirs, files in os.walk(data_dir):
+        relative = os.path.relpath(root, data_dir)
+        dirs[:] = [d for d in dirs if os.path.normpath(os.path.join(relative, d)) not in exclude]
+        for name in files:
+            if name.endswith(".import-checkpoint.json"):
+                continue
+            if name.lower().endswith(SUPPORTED_EXTENSIONS) and not name.startswith("."):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _parse_pdf(path: str):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages):
+        yield page.extract_text() or "", {"page": number}
+
+
+def _parse_docx(path: str):
+    import docx2txt
+
+    yield docx2txt.process(path) or "", {}
+
+
+def _flatten_json(value, path: str = ""):
+    """``key.sub: value`` lines for every leaf of a JSON document."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten_json(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten_json(item, path)
+    elif value is not None:
+        yield f"{path}: {value}" if path else str(value)
+
+
+def _parse_json(path: str):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    yield "\n".join(_flatten_json(data)), {}
+
+
+def _parse_html(path: str):
+    from bs4 import BeautifulSoup
+
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    for tag in soup(["script", "style", "nav", "footer"]):
+        tag.decompose()
+    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    yield soup.get_text(separator="\n", strip=True), {"title": title} if title else {}
+
+
+def _parse_text(path: str):
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        yield f.read(), {}
+
+
+PARSERS = {
+    ".pdf": _parse_pdf,
+    ".docx": _parse_docx,
+    ".json": _parse_json,
+    ".html": _parse_html,
+    ".htm": _parse_html,
+    ".txt": _parse_text,
+    ".md": _parse_text,
+}
+
+
+def parse_and_chunk(path: str, strategy: str | None = None) -> list[tuple[str, dict]]:
+    """Parse one file and split it into ``(text, metadata)`` chunks (runs in a worker process)."""
+    strategy = strategy or strategy_for(path)
+    chunks = []
+    for text, metadata in PARSERS[os.path.splitext(path)[1].lower()](path):
+        if text.strip():
+            chunks.extend(chunk_text(text, {"source": path, **metadata}, strategy))
+    return chunks
+
+
+def chunk_documents(documents, strategy: str | None = None) -> list[tuple[str, dict]]:
+    """Chunk already-loaded ``Document`` objects (e.g. fetched web pages) in-process."""
+    chunks = []
+    for doc in documents:
+        chunks.extend(chunk_text(doc.page_content, dict(doc.metadata), strategy))
+    return chunks
+
+
+async def _parsed_chunks(paths: list[str], workers: int, strategy: str | None = None):
+    """Yield each file's chunks as its worker finishes; at most ``2 * workers`` files in flight."""
+    loop = asyncio.get_running_loop()
+    pending = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        while True:
+            while len(in_flight) < workers * 2:
+                path = next(pending, None)
+                if path is None:
+                    break
+                in_flight[loop.run_in_executor(pool, parse_and_chunk, path, strategy)] = path
+            if not in_flight:
+                return
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.warning(f"Skipping {path}: {e}")
+                    metrics.incr("ingest.failed_files")
+
+
+class IngestStats:
+    def __init__(self):
+        self.files = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "chunks": self.chunks,
+            "seconds": round(self.elapsed, 3),
+            "chunks_per_second": round(self.chunks / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+
+
+async def ingest(paths: list[str], embeddings=None, extra_chunks=None, workers: int = INGEST_WORKERS,
+                 batch_size: int = INGEST_EMBED_BATCH, concurrency: int = INGEST_EMBED_CONCURRENCY,
+                 stats: IngestStats | None = None, strategy: str | None = None) -> FAISS | None:
+    """Parse, chunk, embed and index ``paths`` (plus ``extra_chunks``); returns the vector store.
+
+    ``strategy`` forces one chunking strategy for every file; by default each
+    file uses the one configured for its type (see ``src.loaders.chunking``).
+    """
+    # Built inside the running loop so its pooled async client belongs to this loop
+    embeddings = embeddings or get_embeddings()
+    stats = stats or IngestStats()
+    store = None
+    semaphore = asyncio.Semaphore(concurrency)
+    embedding_tasks = set()
+
+    async def embed(batch):
+        # Re-indexing must not compete with interactive generations for rate limits
+        with lane("background"):
+            async with semaphore:
+                vectors = await embeddings.aembed_documents([text for text, _ in batch])
+        return batch, vectors
+
+    def add(batch, vectors):
+        nonlocal store
+        pairs = [(text, vector) for (text, _), vector in zip(batch, vectors)]
+        metadatas = [metadata for _, metadata in batch]
+        if store is None:
+            store = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas)
+        else:
+            store.add_embeddings(pairs, metadatas=metadatas)
+        stats.chunks += len(batch)
+
+    async def dispatch(batch):
+        # Keep at most `concurrency` batches waiting beyond the ones being embedded
+        while len(embedding_tasks) >= concurrency * 2:
+            done, _ = await asyncio.wait(embedding_tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                embedding_tasks.discard(task)
+                add(*task.result())
+        embedding_tasks.add(asyncio.ensure_future(embed(batch)))
+
+    buffer = list(extra_chunks or [])
+    async for chunks in _parsed_chunks(paths, workers, strategy):
+        stats.files += 1
+        buffer.extend(chunks)
+        while len(buffer) >= batch_size:
+            await dispatch(buffer[:batch_size])
+            buffer = buffer[batch_size:]
+    if buffer:
+        await dispatch(buffer)
+    for task in asyncio.as_completed(list(embedding_tasks)):
+        add(*await task)
+    metrics.incr("ingest.chunks", stats.chunks)
+    logger.info(f"Ingested {stats.files} files into {stats.chunks} chunks in {stats.elapsed:.1f}s")
+    return store
+
+
+def _run(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from async code (e.g. API startup): run on a private loop in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coro).result()
+
+
+def build_index(paths: list[str], index_path: str, extra_documents=None, embedding_kwargs: dict | None = None,
+                **kwargs) -> dict:
+    """Ingest ``paths`` into a new index saved at ``index_path`` (with its BM25 sidecar); returns stats."""
+    extra_chunks = chunk_documents(extra_documents, kwargs.get("strategy")) if extra_documents else None
+    stats = IngestStats()
+
+    async def run():
+        store = await ingest(
+            paths, get_embeddings(**(embedding_kwargs or {})), extra_chunks=extra_chunks, stats=stats, **kwargs,
+        )
+        if store is None:
+            raise ValueError("No documents could be ingested")
+        save_faiss(store, index_path)
+        build_lexical_index(store).save(index_path)
+
+    _run(run())
+    return stats.as_dict()
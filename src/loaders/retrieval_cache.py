@@ -0,0 +1,92 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from src.metrics import metrics
+
+# Entries kept (0 disables the cache) and their lifetime in seconds
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "600"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a retrieval query."""
+    return _WHITESPACE_RE.sub(" ", query).strip().lower().rstrip(".?! ")
+
+
+def knowledge_version(lexical_index) -> str:
+    """Fingerprint of the knowledge documents an index serves.
+
+    The BM25 sidecar always covers exactly the knowledge chunks of its FAISS
+    store (see ``load_lexical_index``), so its ids change whenever the
+    knowledge index is rebuilt, but not when generated outputs are added.
+    """
+    digest = hashlib.sha1()
+    for doc_id in sorted(lexical_index.doc_ids):
+        digest.update(doc_id.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class RetrievalCache:
+    """Thread-safe LRU + TTL cache of retrieval results.
+
+    Keys are ``(index_version, normalized query, k)``; values are ranked
+    ``(doc_id, relevance)`` lists, so documents are read from the docstore on
+    every hit and entries for a replaced index simply stop being looked up
+    (and age out). Hits, misses and evictions go to ``src.metrics``.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_SIZE, ttl: float = RETRIEVAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version: str, query: str, k: int) -> tuple:
+        return version, normalize_query(query), k
+
+    def get(self, key):
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                metrics.incr("retrieval_cache.expired")
+                metrics.set_gauge("retrieval_cache.entries", len(self._entries))
+                entry = None
+            if entry is None:
+                metrics.incr("retrieval_cache.misses")
+                return None
+            self._entries.move_to_end(key)
+        metrics.incr("retrieval_cache.hits")
+        return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.incr("retrieval_cache.evictions")
+            metrics.set_gauge("retrieval_cache.entries", len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            metrics.set_gauge("retrieval_cache.entries", 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+retrieval_cache = RetrievalCache()
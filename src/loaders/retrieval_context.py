@@ -0,0 +1,28 @@
+import asyncio
+
+from src.metrics import metrics
+
+
+class RetrievalContext:
+    """Per-request retrieval state shared by every search issued for one generation.
+
+    The query embedding is computed lazily and at most once; concurrent callers
+    await the same in-flight embedding call. Searches that never need a vector
+    (e.g. the BM25 fast path) never trigger it.
+    """
+
+    def __init__(self, query: str, embeddings):
+        self.query = query
+        self._embeddings = embeddings
+        self._embedding_task = None
+
+    @property
+    def has_embedding(self) -> bool:
+        return self._embedding_task is not None and self._embedding_task.done()
+
+    async def embedding(self) -> list[float]:
+        if self._embedding_task is None:
+            metrics.incr("retrieval.embedding_calls")
+            self._embedding_task = asyncio.ensure_future(self._embeddings.aembed_query(self.query))
+        # Shield so one cancelled waiter does not cancel the shared call
+        return await asyncio.shield(self._embedding_task)
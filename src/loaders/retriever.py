@@ -1,10 +1,20 @@
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from src.openai_clients import get_embeddings
+from src.file_lock import FileLock
+from src.loaders.index_files import fingerprint, load_faiss, save_faiss
+import asyncio
+import json
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Append-only log of metadata-only updates (feedback), replayed onto the
+# docstore on load and cleared whenever the full index is saved.
+METADATA_JOURNAL = "metadata_journal.jsonl"
+# Held by the one process allowed to modify the index (the API or an import CLI)
+WRITER_LOCK = "writer.lock"
+
 class FeedbackRetriever:
     def __init__(self, index_path: str = None):
         
@@ -20,41 +30,201 @@ class FeedbackRetriever:
                 self.index_path = candidate1
             else:
                 self.index_path = candidate2
-        self.embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
+        self.embeddings = get_embeddings()
         
         # Check if index exists, create if it doesn't (optional fallback)
         index_file = os.path.join(self.index_path, "index.faiss")
         if not os.path.exists(index_file):
             print(f"Warning: FAISS index not found at {index_file}. Please initialize it using setup_rag_pipeline.")
         
-        self.vector_store = FAISS.load_local(self.index_path, self.embeddings, allow_dangerous_deserialization=True)
         self.output_store = {}  # In-memory store; replace with database for production
+        # One lock around every mutation of the store and every save, so a save
+        # (often on a worker thread) never pickles a docstore that is changing
+        self.index_lock = threading.RLock()
+        self._writer_lock = FileLock(os.path.join(self.index_path, WRITER_LOCK))
+        self._journal_path = os.path.join(self.index_path, METADATA_JOURNAL)
+        self._load()
+
+    def _load(self):
+        loaded = fingerprint(self.index_path, METADATA_JOURNAL)
+        self.vector_store = load_faiss(self.index_path, self.embeddings)
+        self._replay_journal()
+        self._loaded = loaded
+        # The index files this copy holds; save_index refuses to overwrite others
+        self._index_files = loaded[:-1]
+
+    def refresh(self) -> bool:
+        """Reload if another process saved the index or journaled feedback since it was loaded.
+
+        For read-only copies (job workers); the writing process is always current.
+        """
+        if fingerprint(self.index_path, METADATA_JOURNAL) == self._loaded:
+            return False
+        self.reload()
+        return True
+
+    def reload(self):
+        """Load the index from disk again, e.g. after it was rebuilt in place."""
+        with self.index_lock:
+            self._load()
+
+    def store_output(self, content: str, metadata: dict, generation: dict | None = None):
+        """Index an output; ``generation`` (prompt inputs incl. retrieved context) is kept
+        alongside the record so it can be regenerated without retrieving again (the
+        archive keeps it across restarts)."""
+        record = {"content": content, "metadata": metadata}
+        if generation:
+            record["generation"] = generation
+        with self.index_lock:
+            self.vector_store.add_texts([content], metadatas=[metadata], ids=[metadata["output_id"]])
+            self.output_store[metadata["output_id"]] = record
+            self.save_index()
+
+    async def astore_output(self, content: str, metadata: dict, generation: dict | None = None):
+        """``store_output`` for the event loop: embeds with the async client, then adds
+        and saves on a worker thread, so neither a rate-limit pause nor the index
+        write blocks the loop."""
+        [vector] = await self.embeddings.aembed_documents([content])
+        record = {"content": content, "metadata": metadata}
+        if generation:
+            record["generation"] = generation
+
+        def add():
+            with self.index_lock:
+                self.vector_store.add_embeddings([(content, vector)], metadatas=[metadata], ids=[metadata["output_id"]])
+                self.output_store[metadata["output_id"]] = record
+                self.save_index()
+
+        await asyncio.to_thread(add)
+
+    def acquire_writer_lock(self, owner: str = ""):
+        """Claim the index for this process; raises ``LockHeld`` if another writer has it."""
+        self._writer_lock.acquire(owner=owner)
+
+    def release_writer_lock(self):
+        self._writer_lock.release()
+
+    def save_index(self):
+        # The pickled docstore now carries every journaled metadata update
+        with self.index_lock:
+            if fingerprint(self.index_path) != self._index_files:
+                # Saving would overwrite an index rebuilt since this copy was loaded
+                raise RuntimeError(f"The index at {self.index_path} was replaced on disk; reload it before saving")
+            save_faiss(self.vector_store, self.index_path)
+            self._index_files = fingerprint(self.index_path)
+            if os.path.exists(self._journal_path):
+                os.remove(self._journal_path)
 
-    def store_output(self, content: str, metadata: dict):
-        self.vector_store.add_texts([content], metadatas=[metadata], ids=[metadata["output_id"]])
-        self.output_store[metadata["output_id"]] = {"content": content, "metadata": metadata}
-        self.vector_store.save_local(self.index_path)
+    def _document(self, output_id: str):
+        doc = self.vector_store.docstore.search(output_id)
+        return doc if hasattr(doc, "metadata") else None
+
+    def _replay_journal(self):
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line the writer is still appending
+                doc = self._document(entry["output_id"])
+                if doc is not None:
+                    doc.metadata.update(entry["metadata"])
 
     def get_output(self, output_id: str) -> dict:
-        return self.output_store.get(output_id)
+        record = self.output_store.get(output_id)
+        if record is None:
+            # Outputs stored by an earlier process are still in the docstore
+            doc = self._document(output_id)
+            if doc is not None and "output_id" in doc.metadata:
+                record = {"content": doc.page_content, "metadata": doc.metadata}
+        return record
+
+    def update_metadata_bulk(self, updates: dict[str, dict]) -> list[str]:
+        """Merge metadata updates ``{output_id: {key: value}}`` without touching vectors.
+
+        No embedding calls and no index rewrite: docstore metadata is updated in
+        place and the updates are appended to the metadata journal in one write.
+        Returns the ids that were not found.
+        """
+        missing, lines = [], []
+        with self.index_lock:
+            for output_id, changes in updates.items():
+                doc = self._document(output_id)
+                if doc is None:
+                    missing.append(output_id)
+                    continue
+                doc.metadata.update(changes)
+                record = self.output_store.get(output_id)
+                if record is not None and record["metadata"] is not doc.metadata:
+                    record["metadata"].update(changes)
+                lines.append(json.dumps({"output_id": output_id, "metadata": changes}))
+            if lines:
+                with open(self._journal_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        return missing
+
+    def update_metadata(self, output_id: str, changes: dict) -> bool:
+        return not self.update_metadata_bulk({output_id: changes})
+
+    def stored_outputs(self):
+        """Yield the metadata of every indexed output (knowledge-base chunks excluded)."""
+        with self.index_lock:
+            docs = list(self.vector_store.docstore._dict.values())
+        for doc in docs:
+            if "output_id" in doc.metadata:
+                yield doc.metadata
+
+    def outputs_with_feedback(self):
+        """Yield ``(output_id, metadata)`` for every indexed output that has feedback."""
+        for metadata in self.stored_outputs():
+            if metadata.get("feedback"):
+                yield metadata["output_id"], metadata
 
     def update_output(self, output_id: str, updated_data: dict):
-        self.output_store[output_id] = updated_data
-        self.vector_store.delete([output_id])
-        self.vector_store.add_texts(
-            [updated_data["content"]],
-            metadatas=[updated_data["metadata"]],
-            ids=[output_id]
-        )
-        self.vector_store.save_local(self.index_path)
+        existing = self._document(output_id)
+        if existing is not None and existing.page_content == updated_data["content"]:
+            # Content unchanged (e.g. feedback attached): metadata-only update, no re-embedding
+            self.update_metadata(output_id, updated_data["metadata"])
+            self.output_store[output_id] = updated_data
+            return
+        with self.index_lock:
+            self.output_store[output_id] = updated_data
+            self.vector_store.delete([output_id])
+            self.vector_store.add_texts(
+                [updated_data["content"]],
+                metadatas=[updated_data["metadata"]],
+                ids=[output_id]
+            )
+            self.save_index()
+
+    @staticmethod
+    def _high_engagement_filter(platform: str):
+        return lambda x: x.get("platform") == platform and x.get("feedback", {}).get("label") == "high_engagement"
 
     def retrieve_relevant_outputs(self, query: str, platform: str, k: int = 3):
         results = self.vector_store.similarity_search(
             query,
             k=k,
-            filter=lambda x: x.get("platform") == platform and x.get("feedback", {}).get("label") == "high_engagement"
+            filter=self._high_engagement_filter(platform)
         )
         return [doc.metadata for doc in results]
 
+    async def aretrieve_relevant_outputs(self, retrieval, platform: str, k: int = 3):
+        """Search high-engagement examples with the request's shared query embedding.
+
+        Returns records shaped like ``output_store`` entries (``content`` + ``metadata``).
+        """
+        embedding = await retrieval.embedding()
+        results = await self.vector_store.asimilarity_search_by_vector(
+            embedding,
+            k=k,
+            filter=self._high_engagement_filter(platform)
+        )
+        return [{"content": doc.page_content, "metadata": doc.metadata} for doc in results]
+
     def as_retriever(self, **kwargs):
         return self.vector_store.as_retriever(**kwargs)
\ No newline at end of file
@@ -1,6 +1,11 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 
-def split_documents(documents):
-  """Split documents into smaller chunks for vector storage."""
-  splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-  return splitter.split_documents(documents)
\ No newline at end of file
+from src.loaders.chunking import chunk_text
+
+def split_documents(documents, strategy=None):
+  """Split documents into smaller chunks for vector storage (strategy per source, see src.loaders.chunking)."""
+  return [
+    Document(page_content=text, metadata=metadata)
+    for doc in documents
+    for text, metadata in chunk_text(doc.page_content, dict(doc.metadata), strategy)
+  ]
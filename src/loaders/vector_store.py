@@ -1,5 +1,5 @@
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from src.openai_clients import get_embeddings
 import os
 from dotenv import load_dotenv
 
@@ -7,7 +7,7 @@ load_dotenv()
 
 def create_vector_store(documents, index_path="faiss_index"):
   """Create and save a FAISS vector store from documents."""
-  embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
+  embeddings = get_embeddings()
   db = FAISS.from_documents(documents, embeddings)
   db.save_local(index_path)
   return db
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Process-wide logging: structured JSON records written off the event loop.
+
+``setup_logging()`` installs a single ``QueueHandler`` on the root logger; a
+background ``QueueListener`` thread formats and writes the records, so a log
+call on a request path costs a queue put instead of blocking stdout I/O. When
+the queue is full records are dropped (and counted as ``logging.dropped``)
+rather than stalling requests.
+
+Every record carries the current request id (see ``request_id_var``, set by
+``api.request_logging.RequestLoggingMiddleware``) and any ``extra`` fields.
+``stage()`` times a step of the request and adds it to the request's summary
+record; ``log_payload()`` logs full prompts/outputs for only a sample of calls.
+
+Configuration:
+    LOG_LEVEL=INFO                            root level
+    LOG_LEVELS=src.loaders=DEBUG,httpx=WARNING  per-logger levels
+    LOG_FORMAT=json                           or ``text`` for local development
+    LOG_PAYLOAD_SAMPLE_RATE=0.01              share of payload logs kept
+"""
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from src.metrics import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+# Stage timings of the current request (a dict shared with tasks spawned for it)
+stages_var = contextvars.ContextVar("stages", default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Captures request context on the calling thread and never blocks on a full queue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here: args may not be safe to format later
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("logging.dropped")
+
+
+def parse_levels(spec: str) -> dict:
+    """``"src.loaders=DEBUG,httpx=WARNING"`` -> ``{"src.loaders": "DEBUG", "httpx": "WARNING"}``."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = (part.strip() for part in item.split("=", 1))
+            levels[name] = level.upper()
+    return levels
+
+
+def setup_logging(level: str = LOG_LEVEL, levels: str = LOG_LEVELS, fmt: str = LOG_FORMAT, stream=None):
+    """Route all logging through the background writer; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, logger_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+    _listener = logging.handlers.QueueListener(log_queue, writer)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@contextlib.contextmanager
+def request_context(request_id: str):
+    """Bind a request id and a fresh stage-timing dict for the enclosed work."""
+    stages = {}
+    id_token = request_id_var.set(request_id)
+    stages_token = stages_var.set(stages)
+    try:
+        yield stages
+    finally:
+        request_id_var.reset(id_token)
+        stages_var.reset(stages_token)
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a step of the current request (``with stage("retrieval"): ...``), in milliseconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        stages = stages_var.get()
+        if stages is not None:
+            stages[name] = round(stages.get(name, 0) + elapsed, 2)
+
+
+def _truncate(value):
+    if isinstance(value, str) and len(value) > LOG_PAYLOAD_MAX_CHARS:
+        return value[:LOG_PAYLOAD_MAX_CHARS] + f"... ({len(value)} chars)"
+    if isinstance(value, dict):
+        return {key: _truncate(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_truncate(item) for item in value]
+    return value
+
+
+def log_payload(logger: logging.Logger, message: str, rate: float = None, **payload):
+    """DEBUG-log prompts, outputs or request bodies for a sample (``LOG_PAYLOAD_SAMPLE_RATE``) of calls."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= (LOG_PAYLOAD_SAMPLE_RATE if rate is None else rate):
+        return
+    logger.debug(message, extra={"payload": _truncate(payload)})
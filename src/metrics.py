@@ -0,0 +1,63 @@
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """Tiny in-process registry of counters, gauges and observed values (timings, sizes).
+
+    Everything is kept in memory and exposed as a plain dict through
+    ``snapshot()`` so the API can serve it without extra dependencies.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._timings = defaultdict(lambda: deque(maxlen=window))
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._timings[name].append(value)
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return len(self._timings.get(name, ()))
+
+    def percentile(self, name: str, pct: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._timings.get(name, ()))
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[idx]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timings = {}
+            for name, samples in self._timings.items():
+                ordered = sorted(samples)
+                if not ordered:
+                    continue
+                timings[name] = {
+                    "count": len(ordered),
+                    "avg": sum(ordered) / len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                    "max": ordered[-1],
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+
+metrics = Metrics()
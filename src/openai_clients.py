@@ -0,0 +1,135 @@
+"""Shared, pooled HTTP clients and factories for every OpenAI model client.
+
+All ``ChatOpenAI`` / ``OpenAIEmbeddings`` instances are built through
+``get_chat_model`` and ``get_embeddings`` so they reuse one keep-alive
+connection pool instead of opening (and TLS-handshaking) their own, and so
+every call passes through the rate-limit scheduler (see src/scheduler.py).
+The SDK's own retries are off by default: the scheduled transport retries
+429s, so SDK retries would stack a second retry layer on top of it.
+"""
+import asyncio
+import logging
+import os
+import threading
+import weakref
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from src.scheduler import ScheduledAsyncTransport, ScheduledTransport
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "120"))
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("OPENAI_HTTP2", "1") == "0":
+        return False
+    try:
+        import h2  # noqa: F401  (httpx[http2] extra)
+    except ImportError:
+        return False
+    return True
+
+
+HTTP2 = _http2_enabled()
+
+_lock = threading.Lock()
+_sync_client = None
+# AsyncClient pools are bound to the event loop they were first used on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _transport_kwargs() -> dict:
+    return {
+        "http2": HTTP2,
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled ``httpx.Client`` for synchronous OpenAI calls."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            # Every request is admitted through the rate-limit scheduler
+            _sync_client = httpx.Client(
+                transport=ScheduledTransport(httpx.HTTPTransport(**_transport_kwargs())),
+                timeout=_timeout(),
+            )
+            logger.info(f"Created shared OpenAI HTTP pool (http2={HTTP2}, max_connections={MAX_CONNECTIONS})")
+        return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Pooled ``httpx.AsyncClient`` for the running event loop (or a loop-less default)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    key = loop if loop is not None else _LoopLess
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                transport=ScheduledAsyncTransport(httpx.AsyncHTTPTransport(**_transport_kwargs())),
+                timeout=_timeout(),
+            )
+            _async_clients[key] = client
+        return client
+
+
+class _LoopLess:
+    """Weak-referenceable key for async clients created outside a running loop."""
+
+
+async def aclose_http_clients():
+    """Close the pools; call on application shutdown."""
+    global _sync_client
+    with _lock:
+        sync_client, _sync_client = _sync_client, None
+        async_clients = list(_async_clients.values())
+        _async_clients.clear()
+    if sync_client is not None:
+        sync_client.close()
+    for client in async_clients:
+        await client.aclose()
+
+
+def get_chat_model(temperature: float = 0.7, model: str = "gpt-4o-mini", **kwargs) -> ChatOpenAI:
+    kwargs.setdefault("openai_api_key", os.getenv("OPENAI_API_KEY"))
+    # 429s are retried by the scheduled transport and errors by src/resilience, not the SDK
+    kwargs.setdefault("max_retries", 0)
+    return ChatOpenAI(
+        temperature=temperature,
+        model=model,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs,
+    )
+
+
+def get_embeddings(**kwargs) -> OpenAIEmbeddings:
+    kwargs.setdefault("openai_api_key", os.getenv("OPENAI_API_KEY"))
+    kwargs.setdefault("max_retries", 0)
+    return OpenAIEmbeddings(
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs,
+    )
@@ -0,0 +1,190 @@
+"""Queryable catalog of stored outputs.
+
+One SQLite row per output with the fields we filter and sort on, backed by
+composite secondary indexes so listing pages stay index range scans no
+matter how many outputs exist. Topic substring search goes through an FTS5
+trigram index (plain ``LIKE`` for queries shorter than three characters or
+SQLite builds without trigram support).
+"""
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", os.path.join(project_root, "data", "output", "catalog.sqlite3"))
+
+SORT_COLUMNS = {"timestamp": "timestamp", "engagement": "engagement"}
+CONTENT_PLATFORMS = ("instagram", "facebook", "linkedin")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    output_id TEXT PRIMARY KEY,
+    platform TEXT,
+    use_case TEXT,
+    label TEXT,
+    rating INTEGER,
+    engagement INTEGER NOT NULL DEFAULT 0,
+    topic TEXT,
+    timestamp TEXT NOT NULL,
+    regenerated_from TEXT
+);
+CREATE INDEX IF NOT EXISTS outputs_timestamp ON outputs (timestamp, output_id);
+CREATE INDEX IF NOT EXISTS outputs_engagement ON outputs (engagement, output_id);
+CREATE INDEX IF NOT EXISTS outputs_platform_timestamp ON outputs (platform, timestamp, output_id);
+CREATE INDEX IF NOT EXISTS outputs_platform_engagement ON outputs (platform, engagement, output_id);
+CREATE INDEX IF NOT EXISTS outputs_use_case_timestamp ON outputs (use_case, timestamp, output_id);
+CREATE INDEX IF NOT EXISTS outputs_label_timestamp ON outputs (label, timestamp, output_id);
+CREATE INDEX IF NOT EXISTS outputs_label_engagement ON outputs (label, engagement, output_id);
+CREATE INDEX IF NOT EXISTS outputs_rating ON outputs (rating);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS outputs_topic USING fts5(output_id UNINDEXED, topic, tokenize='trigram');
+"""
+
+
+def use_case_of(metadata: dict) -> str:
+    if metadata.get("use_case"):
+        return metadata["use_case"]
+    if "brand_summary" in metadata:
+        return "calendar"
+    if metadata.get("platform") in CONTENT_PLATFORMS and "content_goals" not in metadata:
+        return "content"
+    return "strategy"
+
+
+def _row(metadata: dict) -> dict:
+    feedback = metadata.get("feedback") or {}
+    engagement = feedback.get("engagement_metrics") or {}
+    return {
+        "output_id": metadata["output_id"],
+        "platform": metadata.get("platform"),
+        "use_case": use_case_of(metadata),
+        "label": feedback.get("label"),
+        "rating": feedback.get("rating"),
+        "engagement": int(engagement.get("likes", 0) or 0) + int(engagement.get("shares", 0) or 0),
+        "topic": metadata.get("content_topic") or metadata.get("content_goals") or metadata.get("brand_summary"),
+        "timestamp": metadata.get("timestamp") or "",
+        "regenerated_from": metadata.get("regenerated_from"),
+    }
+
+
+def encode_cursor(sort_value, output_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_value, output_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, output_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return sort_value, output_id
+
+
+class OutputCatalog:
+    def __init__(self, db_path: str = CATALOG_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.trigram = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite has no FTS5 trigram tokenizer; topic search falls back to LIKE scans")
+            self.trigram = False
+
+    def upsert_many(self, metadatas):
+        """Insert or refresh catalog rows from output metadata dicts."""
+        rows = [_row(metadata) for metadata in metadatas]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT OR REPLACE INTO outputs
+                   (output_id, platform, use_case, label, rating, engagement, topic, timestamp, regenerated_from)
+                   VALUES (:output_id, :platform, :use_case, :label, :rating, :engagement, :topic, :timestamp,
+                           :regenerated_from)""",
+                rows,
+            )
+            if self.trigram:
+                self._conn.executemany("DELETE FROM outputs_topic WHERE output_id = ?", [(r["output_id"],) for r in rows])
+                self._conn.executemany(
+                    "INSERT INTO outputs_topic (output_id, topic) VALUES (?, ?)",
+                    [(r["output_id"], r["topic"]) for r in rows if r["topic"]],
+                )
+
+    def upsert(self, metadata: dict):
+        self.upsert_many([metadata])
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM outputs LIMIT 1").fetchone() is None
+
+    def query(self, platform=None, use_case=None, label=None, min_rating=None, max_rating=None,
+              since=None, until=None, topic=None, sort="timestamp", order="desc", limit=50, cursor=None,
+              output_ids=None):
+        """Return ``(rows, next_cursor)``; pass ``next_cursor`` back to get the following page.
+
+        ``output_ids`` restricts the query to those outputs (e.g. one page of index rows).
+        """
+        column = SORT_COLUMNS.get(sort)
+        if column is None:
+            raise ValueError(f"sort must be one of {sorted(SORT_COLUMNS)}")
+        descending = order == "desc"
+        where, params = [], []
+        for field, value in (("platform", platform), ("use_case", use_case), ("label", label)):
+            if value is not None:
+                where.append(f"{field} = ?")
+                params.append(value)
+        if min_rating is not None:
+            where.append("rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            where.append("rating <= ?")
+            params.append(max_rating)
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("timestamp < ?")
+            params.append(until)
+        if output_ids is not None:
+            where.append(f"output_id IN ({', '.join('?' * len(output_ids))})")
+            params.extend(output_ids)
+        if topic:
+            if self.trigram and len(topic) >= 3:
+                where.append("output_id IN (SELECT output_id FROM outputs_topic WHERE topic MATCH ?)")
+                params.append('"' + topic.replace('"', '""') + '"')
+            else:
+                where.append("topic LIKE ? ESCAPE '\\'")
+                escaped = topic.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params.append(f"%{escaped}%")
+        if cursor:
+            # Keyset pagination: continue strictly after the last row of the previous page
+            sort_value, last_id = decode_cursor(cursor)
+            op = "<" if descending else ">"
+            where.append(f"({column}, output_id) {op} (?, ?)")
+            params.extend([sort_value, last_id])
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM outputs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column} {direction}, output_id {direction} LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][column], rows[-1]["output_id"])
+        return rows, next_cursor
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -115,4 +115,99 @@ Use the context and high-performing examples provided to inform the plan.
 High-performing examples: {feedback_context}
 Context: {context}
 """
-)
\ No newline at end of file
+)
+calendar_row_prompt = PromptTemplate(
+    input_variables=["brand_summary", "day", "platform", "topic", "keyword_rule", "context", "feedback_context"],
+    template="""You are filling in one row of a content calendar for this brand: {brand_summary}
+Day {day} | Platform: {platform} | Topic: {topic}
+Return ONE line in exactly this format, nothing else:
+Content Type | Caption Summary | CTA
+Guidelines:
+• Content Type fits {platform} (e.g. Reel, Carousel, Story, Poll, Article, Post).
+• Caption Summary is concise (≤12 words) and specific to the topic.
+• {keyword_rule}
+Use these high-performing examples for inspiration: {feedback_context}
+Context: {context}
+"""
+)
+
+# Section lists of the strategy prompts above, used to generate sections in parallel.
+# Each entry is (title, guidance); "horizon" is the planning period the prompt asks for.
+strategy_sections = {
+    "all": {
+        "horizon": "3-month",
+        "sections": [
+            ("Objectives", "what we aim to achieve (aligned with the content goals)"),
+            ("Target Audience", "key personas & pain-points"),
+            ("Key Messages & Content Pillars", "3-5 pillars with examples"),
+            ("Channel-Specific Approach", "for each platform outline best formats, tone, CTAs"),
+            ("Posting Cadence & Formats", "weekly frequency, content types"),
+            ("SEO & Conversion Tactics", "keyword strategy, internal linking, CTAs"),
+            ("Measurement & KPIs", "how success will be tracked"),
+            ("Timeline / Next Steps", "high-level roadmap"),
+        ],
+    },
+    "linkedin": {
+        "horizon": "90-day LinkedIn",
+        "sections": [
+            ("Objectives & KPIs", "measurable goals and the KPIs that track them"),
+            ("Audience Personas", "2-3 bullet points each"),
+            ("Core Content Pillars", "table with Pillar | Topic Examples | Goal"),
+            ("Content Formats & Cadence", "weekly schedule (e.g., Mon-Fri posts, polls, carousels)"),
+            ("SEO & Conversion Tactics", "keyword approach, hooks, CTAs"),
+            ("Engagement Plan", "how to interact with comments, communities, influencers"),
+            ("Measurement", "metrics, tools, review cadence"),
+            ("Action Plan / Timeline", "next steps for the first 4 weeks"),
+        ],
+    },
+    "facebook": {
+        "horizon": "90-day Facebook",
+        "sections": [
+            ("Objectives & KPIs", "measurable goals and the KPIs that track them"),
+            ("Audience Segments & Pain-Points", "segments and what they struggle with"),
+            ("Content Pillars", "table: Pillar | Post Types | Goal"),
+            ("Format & Cadence", "mix of long-form posts, Reels, Lives, Groups; week-by-week schedule"),
+            ("SEO & Distribution Tactics", "keyword usage, link previews, alt-text, cross-posting"),
+            ("Engagement & Community Building", "comments, groups, messenger, events"),
+            ("Paid Amplification", "boosting best posts, audience targeting"),
+            ("Measurement & Reporting", "metrics, toolset, review cycles"),
+            ("First 4-Week Roadmap", "tasks & milestones"),
+        ],
+    },
+    "instagram": {
+        "horizon": "30-day Instagram",
+        "sections": [
+            ("Objectives & KPIs", "measurable goals and the KPIs that track them"),
+            ("Audience Personas", "bullet points"),
+            ("Visual Style & Aesthetic", "color, typography, mood"),
+            ("Core Content Pillars", "table: Pillar | Example Topics | Desired Outcome"),
+            ("Format Mix & Cadence", "Reels vs. Carousels vs. Stories; weekly schedule optimized for reach & saves"),
+            ("Hashtag & SEO Tactics", "keyword placement in caption, 3-tier hashtag sets, alt-text"),
+            ("Engagement & Algorithm Signals", "early engagement tactics, collabs, UGC, saves/shares"),
+            ("Measurement & Iteration", "metrics, review cadence"),
+            ("Next 2-Week Action Plan", "immediate steps"),
+        ],
+    },
+}
+
+strategy_outline_prompt = PromptTemplate(
+    input_variables=["horizon", "platforms", "content_goals", "context"],
+    template="""Draft a SHORT outline (max 80 words, bullet points) for a {horizon} content strategy for {platforms} to achieve: {content_goals}.
+List the 3-5 content pillars and the core message so separately written sections stay consistent. No headings, no preamble.
+Context: {context}
+"""
+)
+
+strategy_section_prompt = PromptTemplate(
+    input_variables=["horizon", "platforms", "content_goals", "outline", "number", "title", "guidance", "context", "feedback_context"],
+    template="""You are writing one section of a {horizon} content marketing strategy for {platforms} to achieve: {content_goals}.
+Keep it consistent with this outline:
+{outline}
+
+Write ONLY section {number}. **{title}** – {guidance}
+Respond in Markdown (bullet lists or tables where appropriate). Do not repeat the section heading, other sections or any preamble.
+Emphasize SEO and conversions where relevant.
+High-performing examples: {feedback_context}
+Context: {context}
+"""
+)
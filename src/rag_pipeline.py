@@ -1,16 +1,16 @@
 import os
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain.chains import LLMChain
+from src.openai_clients import get_chat_model, get_embeddings
 from langchain_core.prompts import PromptTemplate
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, JSONLoader
-from langchain_core.runnables import RunnableLambda
+from src.loaders.bm25 import load_lexical_index
+from src.loaders.ingest import build_index, scan
+from src.loaders.index_files import load_faiss
+from src.loaders.hybrid import HybridRetriever
+from src.loaders.context_assembler import MAX_CANDIDATES, assemble_context
+from src.resilience import resilient_call
+from src.langchain_utils import rank_candidates
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -28,49 +28,46 @@ def setup_rag_pipeline(data_path: str = None, index_path: str = None):
     index_path = index_path or os.path.join(project_root, "src", "faiss_index")
     os.makedirs(index_path, exist_ok=True)
     
-    embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+    embeddings = get_embeddings(openai_api_key=api_key)
     
     index_file = os.path.join(index_path, "index.faiss")
     if not os.path.exists(index_file):
         logger.info(f"FAISS index not found at {index_file}. Creating new index.")
-        brochure_path = os.path.join(data_path, "Productimate Brochure.pdf")
-        json_path = os.path.join(data_path, "social_media_links.json")  # Updated to match structure
-    
-        all_documents = []
-        if os.path.exists(brochure_path):
-            loader = PyPDFLoader(brochure_path)
-            documents = loader.load()
-            all_documents.extend(documents)
-        else:
-            raise ValueError(f"Company brochure not found at {brochure_path}")
-        
-        if os.path.exists(json_path):
-            loader = JSONLoader(file_path=json_path, jq_schema=".[]")
-            documents = loader.load()
-            all_documents.extend(documents)
-        
+        # Every supported file under data/ (brochure PDF, social links JSON, DOCX, HTML, ...)
+        paths = scan(data_path)
+        if not any(path.lower().endswith(".pdf") for path in paths):
+            raise ValueError(f"Company brochure not found in {data_path}")
+
         # Attempt to load company website content
+        web_docs = []
         company_url = os.getenv("COMPANY_URL", "https://productimate.io/")
         try:
             from src.loaders.web_loader import load_website_content
             web_docs = load_website_content(company_url)
-            all_documents.extend(web_docs)
         except Exception as e:
             logger.warning(f"Failed to fetch website content from {company_url}: {e}")
 
-        if not all_documents:
-            raise ValueError("No documents loaded from data folder or website")
-        
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        docs = splitter.split_documents(all_documents)
-        db = FAISS.from_documents(docs, embeddings)
-        db.save_local(index_path)
+        stats = build_index(paths, index_path, extra_documents=web_docs, embedding_kwargs={"openai_api_key": api_key})
+        logger.info(f"Ingested {stats['files']} files into {stats['chunks']} chunks in {stats['seconds']}s")
         logger.info(f"FAISS index created and saved at {index_file}")
     
-    vector_store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+    vector_store = load_faiss(index_path, embeddings)
     logger.info(f"FAISS index loaded from {index_file}")
     return vector_store
 
+def build_retrieval_query(platform: str, use_case: str, input_dict: dict) -> str:
+    """Templated knowledge-base query for a platform and use case (also used to warm the cache)."""
+    query = ""
+    if platform == "linkedin":
+        query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone with insight: {input_dict.get('professional_insight', '')} for LinkedIn audience."
+    elif platform == "instagram":
+        query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone for {input_dict.get('persona', 'general persona')} on Instagram."
+    elif platform == "facebook":
+        query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone for {input_dict.get('audience', 'general audience')} on Facebook."
+    elif platform == "all" and use_case in ["strategy", "calendar"]:
+        query = f"Provide context for a {use_case} about {input_dict.get('content_goals', input_dict.get('brand_summary', 'general topic'))}."
+    return query
+
 def get_rag_chain(index_path: str = None, use_case: str = "content", platform: str = "linkedin", **kwargs):
     """
     Create an async-compatible RAG chain tailored to the use case and platform with dynamic input variables.
@@ -79,8 +76,9 @@ def get_rag_chain(index_path: str = None, use_case: str = "content", platform: s
     index_path = index_path or os.path.join(project_root, "src", "faiss_index")
     
     vector_store = setup_rag_pipeline(index_path=index_path)
-    retriever = vector_store.as_retriever(search_kwargs={"k": 3})
-    llm = ChatOpenAI(temperature=0.3, model="gpt-4o-mini", openai_api_key=os.getenv("OPENAI_API_KEY"))
+    retriever = HybridRetriever(vector_store, load_lexical_index(vector_store, index_path), k=3)
+    # Retries, hedging and deadlines are handled by resilient_call around the chain
+    llm = get_chat_model(temperature=0.3, model="gpt-4o-mini", max_retries=0)
     
     # Define platform-specific prompts with feedback_context
     if platform == "linkedin":
@@ -160,22 +158,26 @@ Length: {length}
     else:
         raise ValueError(f"Unsupported platform or use case: {platform}, {use_case}")
     
-    rag_chain = LLMChain(llm=llm, prompt=prompt)
-    
+    def build_query(input_dict):
+        """Templated retrieval query for this chain's platform and use case."""
+        return build_retrieval_query(platform, use_case, input_dict)
+
+    async def retrieve(query, retrieval=None):
+        # Over-fetch scored candidates; assemble_context decides how many fit the budget
+        return await retriever.asearch(query, retrieval=retrieval, k=MAX_CANDIDATES)
+
     async def preprocess_input(input_dict):
-        query = ""
-        if platform == "linkedin":
-            query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone with insight: {input_dict.get('professional_insight', '')} for LinkedIn audience."
-        elif platform == "instagram":
-            query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone for {input_dict.get('persona', 'general persona')} on Instagram."
-        elif platform == "facebook":
-            query = f"Provide context for a {use_case} post about {input_dict.get('content_topic', 'general topic')} with a {input_dict.get('tone', 'neutral')} tone for {input_dict.get('audience', 'general audience')} on Facebook."
-        elif platform == "all" and use_case in ["strategy", "calendar"]:
-            query = f"Provide context for a {use_case} about {input_dict.get('content_goals', input_dict.get('brand_summary', 'general topic'))}."
-        
-        docs = await retriever.ainvoke(query)
+        query = build_query(input_dict)
+        # Callers that already retrieved (see SocialMediaAgent.generate) pass the documents in
+        scored_docs = input_dict.get("documents")
+        if scored_docs is None:
+            scored_docs = await retrieve(query, input_dict.get("retrieval"))
+        feedback_examples = input_dict.get("feedback_examples")
+        if feedback_examples is None:
+            feedback_examples = [input_dict["feedback_context"]] if input_dict.get("feedback_context") else []
+        context, feedback_context = assemble_context(platform, scored_docs, feedback_examples)
         return {
-            "context": "\n".join(doc.page_content for doc in docs),
+            "context": context,
             "content_topic": input_dict.get("content_topic", ""),
             "tone": input_dict.get("tone", "neutral"),
             "professional_insight": input_dict.get("professional_insight", ""),
@@ -185,32 +187,34 @@ Length: {length}
             "brand_summary": input_dict.get("brand_summary", ""),
             "topic_list": input_dict.get("topic_list", ""),
             "length": input_dict.get("length", "medium"),
-            "feedback_context": input_dict.get("feedback_context", ""),
+            "feedback_context": feedback_context,
             "query": query
         }
     
     class _RAGChainWrapper:
-        """Thin proxy that preprocesses input before delegating to the underlying chain."""
-        def __init__(self, chain, preprocess):
-            self._chain = chain
+        """Preprocesses input (retrieval, context assembly) and completes the prompt."""
+        def __init__(self, preprocess, build_query, retrieve):
             self._preprocess = preprocess
+            self.build_query = build_query
+            self.aretrieve = retrieve
+            self.use_case = use_case
+            self.platform = platform
+        async def acomplete(self, prompt_inputs, n=1):
+            """Run the completion on already-preprocessed inputs, skipping retrieval.
+
+            Asks the model for ``n`` candidates in one call and returns them
+            ranked best-first as ``(text, score)`` pairs.
+            """
+            messages = prompt.format_prompt(**{k: prompt_inputs.get(k, "") for k in prompt.input_variables}).to_messages()
+            result = await resilient_call(lambda: llm.agenerate([messages], n=n), use_case=use_case)
+            return rank_candidates([generation.text for generation in result.generations[0]], use_case)
         async def ainvoke(self, input_dict):
             processed = await self._preprocess(input_dict)
-            res = await self._chain.ainvoke(processed)
-            if isinstance(res, dict):
-                if "result" in res:
-                    return res
-                # LangChain LLMChain returns {'text': '...'}
-                if "text" in res:
-                    return {"result": res["text"]}
-                # Fallback: wrap entire dict as string
-                return {"result": str(res)}
-            return {"result": res}
-        def __getattr__(self, name):
-            # Delegate everything else to the wrapped chain
-            return getattr(self._chain, name)
+            ranked = await self.acomplete(processed, n=input_dict.get("n") or 1)
+            # prompt_inputs lets callers store the context and regenerate without retrieving again
+            return {"result": ranked[0][0], "candidates": ranked, "prompt_inputs": processed}
     
-    return _RAGChainWrapper(rag_chain, preprocess_input)
+    return _RAGChainWrapper(preprocess_input, build_query, retrieve)
 
 def initialize_chains():
     """
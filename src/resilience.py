@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+import openai
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Overall deadline (seconds) for one chat completion, retries and hedges included.
+# Override with LLM_DEADLINE_<USE_CASE>, e.g. LLM_DEADLINE_STRATEGY=120.
+DEFAULT_DEADLINES = {
+    "content": 30.0,
+    "strategy": 90.0,
+    "calendar": 60.0,
+}
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "1") != "0"
+# Hedge after the observed p95; until enough samples exist use the fallback delay
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_FALLBACK_DELAY = float(os.getenv("LLM_HEDGE_FALLBACK_DELAY", "10"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# 429s are absorbed (and paced) by the scheduled transport (src/scheduler.py);
+# a RateLimitError that still reaches this layer is final and not retried here
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMTimeoutError(TimeoutError):
+    """The completion did not finish within its use-case deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream is considered degraded; calls fail fast until the breaker resets."""
+
+
+def deadline_for(use_case: str) -> float:
+    override = os.getenv(f"LLM_DEADLINE_{use_case.upper()}")
+    if override:
+        return float(override)
+    return DEFAULT_DEADLINES.get(use_case, DEFAULT_DEADLINES["content"])
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half_open" and self._trial_in_flight):
+                metrics.incr(f"breaker.{self.name}.rejected")
+                raise CircuitOpenError(f"Circuit '{self.name}' is open; upstream degraded")
+            if state == "half_open":
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+        metrics.set_gauge(f"breaker.{self.name}.open", 0)
+
+    def release(self):
+        """Give up a half-open trial without a verdict (e.g. the caller was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+        if self._opened_at is not None:
+            metrics.set_gauge(f"breaker.{self.name}.open", 1)
+
+
+chat_breaker = CircuitBreaker("openai_chat")
+
+
+def hedge_delay(use_case: str) -> float:
+    name = f"llm.latency.{use_case}"
+    if metrics.count(name) < HEDGE_MIN_SAMPLES:
+        return HEDGE_FALLBACK_DELAY
+    return max(HEDGE_MIN_DELAY, metrics.percentile(name, 95))
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _timed(factory, use_case: str):
+    """Await ``factory()`` and record this single request's latency for the hedge p95."""
+    started = time.monotonic()
+    try:
+        result = await factory()
+    except asyncio.CancelledError:
+        # A request cancelled because its duplicate won ran at least this long; keeping
+        # the lower bound keeps slow requests in the p95 instead of only the winners
+        metrics.observe(f"llm.latency.{use_case}", time.monotonic() - started)
+        raise
+    metrics.observe(f"llm.latency.{use_case}", time.monotonic() - started)
+    return result
+
+
+async def _hedged(factory, use_case: str, hedge: bool):
+    """Run ``factory()``; if it outlives the p95, race a duplicate and keep the first success."""
+    primary = asyncio.ensure_future(_timed(factory, use_case))
+    pending = {primary}
+    try:
+        if hedge:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay(use_case))
+            if not done:
+                metrics.incr(f"llm.hedged.{use_case}")
+                pending.add(asyncio.ensure_future(_timed(factory, use_case)))
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        metrics.incr(f"llm.hedge_won.{use_case}")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        await _cancel([task for task in pending if not task.done()])
+
+
+async def resilient_call(factory, use_case: str = "content", breaker: CircuitBreaker = chat_breaker,
+                         max_retries: int = MAX_RETRIES, hedge: bool = HEDGING_ENABLED, deadline: float | None = None):
+    """Await ``factory()`` (a zero-arg coroutine factory) under a deadline, hedging,
+    jittered retries and a circuit breaker.
+
+    Raises ``LLMTimeoutError`` when the deadline passes and ``CircuitOpenError``
+    when the breaker is open.
+    """
+    deadline = deadline or deadline_for(use_case)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        breaker.before_call()
+        remaining = deadline - (time.monotonic() - started)
+        try:
+            result = await asyncio.wait_for(_hedged(factory, use_case, hedge), timeout=max(remaining, 0.001))
+        except RETRYABLE_ERRORS as e:
+            breaker.record_failure()
+            metrics.incr(f"llm.failures.{use_case}")
+            elapsed = time.monotonic() - started
+            if attempt >= max_retries or elapsed >= deadline:
+                if isinstance(e, asyncio.TimeoutError) or elapsed >= deadline:
+                    raise LLMTimeoutError(f"{use_case} completion exceeded its {deadline:.0f}s deadline") from e
+                raise
+            delay = min(_backoff(attempt), max(0.0, deadline - elapsed))
+            logger.warning(f"Retrying {use_case} completion after {type(e).__name__} (attempt {attempt + 1}, sleeping {delay:.2f}s)")
+            attempt += 1
+            metrics.incr(f"llm.retries.{use_case}")
+            await asyncio.sleep(delay)
+            continue
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            # Non-retryable errors (bad request, auth, our own bugs) mean the
+            # upstream answered, so they do not count against the breaker
+            breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
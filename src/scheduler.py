@@ -0,0 +1,253 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_RPM", "500"))
+TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TPM", "200000"))
+# Completion tokens assumed for chat requests that do not set max_tokens
+DEFAULT_COMPLETION_TOKENS = int(os.getenv("OPENAI_EST_COMPLETION_TOKENS", "600"))
+MAX_RATE_LIMIT_RETRIES = int(os.getenv("OPENAI_429_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("OPENAI_429_BACKOFF", "1.0"))
+BACKOFF_MAX = float(os.getenv("OPENAI_429_BACKOFF_MAX", "30"))
+
+# Lower number = higher priority
+LANES = {"interactive": 0, "batch": 1, "background": 2}
+_POLL_INTERVAL = 0.05
+
+_current_lane = contextvars.ContextVar("llm_lane", default="interactive")
+
+
+@contextmanager
+def lane(name: str):
+    """Route every OpenAI call made inside the block through the given priority lane."""
+    if name not in LANES:
+        raise ValueError(f"Unknown lane: {name}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """Central admission point for OpenAI calls.
+
+    Requests/min and tokens/min are enforced with token buckets; a lane only
+    gets capacity when no higher-priority lane is waiting. 429 responses pause
+    all lanes with an adaptive backoff that grows while 429s keep arriving.
+    """
+
+    def __init__(self, rpm: float = REQUESTS_PER_MINUTE, tpm: float = TOKENS_PER_MINUTE):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waiting = {name: 0 for name in LANES}
+        self._paused_until = 0.0
+        self._backoff = BACKOFF_BASE
+
+    def set_limits(self, rpm: float, tpm: float):
+        """Replace the requests/min and tokens/min budgets (e.g. a worker's share of them)."""
+        with self._lock:
+            self.requests = TokenBucket(rpm)
+            self.tokens = TokenBucket(tpm)
+
+    def _try_acquire(self, tokens: float, lane_name: str) -> float:
+        """Take capacity and return 0, or return how long to wait before retrying."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._paused_until:
+                return self._paused_until - now
+            priority = LANES[lane_name]
+            if any(count for name, count in self.waiting.items() if LANES[name] < priority):
+                return _POLL_INTERVAL
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait == 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+            return wait
+
+    def _enqueue(self, lane_name: str, delta: int):
+        with self._lock:
+            self.waiting[lane_name] += delta
+            depth = self.waiting[lane_name]
+        metrics.set_gauge(f"scheduler.{lane_name}.queued", depth)
+
+    def _admitted(self, lane_name: str, started: float):
+        metrics.observe(f"scheduler.{lane_name}.wait", time.monotonic() - started)
+        metrics.incr(f"scheduler.{lane_name}.admitted")
+
+    async def acquire(self, tokens: float, lane_name: str | None = None):
+        lane_name = lane_name or current_lane()
+        started = time.monotonic()
+        wait = self._try_acquire(tokens, lane_name)
+        if wait:
+            self._enqueue(lane_name, 1)
+            try:
+                while wait:
+                    await asyncio.sleep(min(wait, _POLL_INTERVAL))
+                    wait = self._try_acquire(tokens, lane_name)
+            finally:
+                self._enqueue(lane_name, -1)
+        self._admitted(lane_name, started)
+
+    def acquire_sync(self, tokens: float, lane_name: str | None = None):
+        """Blocking ``acquire`` for the sync client: may sleep up to ``BACKOFF_MAX``, so it
+        must only run on worker threads, never on the event loop."""
+        lane_name = lane_name or current_lane()
+        started = time.monotonic()
+        wait = self._try_acquire(tokens, lane_name)
+        if wait:
+            self._enqueue(lane_name, 1)
+            try:
+                while wait:
+                    time.sleep(min(wait, _POLL_INTERVAL))
+                    wait = self._try_acquire(tokens, lane_name)
+            finally:
+                self._enqueue(lane_name, -1)
+        self._admitted(lane_name, started)
+
+    def rate_limited(self, retry_after: float | None = None) -> float:
+        """Record a 429: pause every lane and return the pause length."""
+        with self._lock:
+            delay = max(retry_after or 0.0, self._backoff)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._backoff = min(BACKOFF_MAX, self._backoff * 2)
+        metrics.incr("scheduler.rate_limited")
+        logger.warning(f"OpenAI rate limit hit; pausing all lanes for {delay:.1f}s")
+        return delay
+
+    def succeeded(self):
+        with self._lock:
+            self._backoff = max(BACKOFF_BASE, self._backoff / 2)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            stats = {
+                "paused_for": max(0.0, self._paused_until - now),
+                "requests_available": self.requests.level,
+                "tokens_available": self.tokens.level,
+                "lanes": {},
+            }
+            waiting = dict(self.waiting)
+        for name in LANES:
+            stats["lanes"][name] = {
+                "queued": waiting[name],
+                "wait_p50": metrics.percentile(f"scheduler.{name}.wait", 50),
+                "wait_p95": metrics.percentile(f"scheduler.{name}.wait", 95),
+            }
+        return stats
+
+
+scheduler = LLMScheduler()
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """Rough prompt + completion token estimate from an OpenAI request body."""
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return DEFAULT_COMPLETION_TOKENS
+    if "messages" in body:
+        prompt = sum(len(str(m.get("content", ""))) for m in body["messages"]) // 4
+        completion = body.get("max_tokens") or body.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+        return prompt + completion * (body.get("n") or 1)
+    inputs = body.get("input", "")
+    if isinstance(inputs, str):
+        return len(inputs) // 4 + 1
+    if inputs and isinstance(inputs[0], list):  # pre-tokenised input
+        return sum(len(item) for item in inputs)
+    return sum(len(str(item)) // 4 + 1 for item in inputs)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ScheduledAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport that admits each request through the scheduler and absorbs 429s."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, llm_scheduler: LLMScheduler = scheduler):
+        self._transport = transport
+        self._scheduler = llm_scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_tokens(request)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self._scheduler.acquire(tokens)
+            response = await self._transport.handle_async_request(request)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            await response.aclose()
+            self._scheduler.rate_limited(_retry_after(response))
+        if response.status_code != 429:
+            self._scheduler.succeeded()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ScheduledTransport(httpx.BaseTransport):
+    """Synchronous counterpart of ``ScheduledAsyncTransport``."""
+
+    def __init__(self, transport: httpx.BaseTransport, llm_scheduler: LLMScheduler = scheduler):
+        self._transport = transport
+        self._scheduler = llm_scheduler
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_tokens(request)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self._scheduler.acquire_sync(tokens)
+            response = self._transport.handle_request(request)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            response.close()
+            self._scheduler.rate_limited(_retry_after(response))
+        if response.status_code != 429:
+            self._scheduler.succeeded()
+        return response
+
+    def close(self):
+        self._transport.close()
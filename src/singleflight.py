@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to run every request on its own, even when identical ones are in flight
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "true").lower() != "false"
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def request_key(endpoint: str, payload: dict) -> str:
+    """Key of a request: the endpoint plus its payload, ignoring case and whitespace."""
+    body = json.dumps(_normalize(payload), sort_keys=True, default=str)
+    return f"{endpoint}:{hashlib.sha1(body.encode()).hexdigest()}"
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces identical concurrent async calls onto one in-flight task.
+
+    The first caller for a key starts ``fn()``; callers arriving while it runs
+    await the same task and get the same result (or exception). A waiter that
+    is cancelled (e.g. its client disconnected) only stops waiting; the shared
+    task is cancelled once its last waiter has gone. Results are not cached:
+    the key is released as soon as the task finishes.
+    """
+
+    def __init__(self, enabled: bool = COALESCE_REQUESTS):
+        self.enabled = enabled
+        self._calls = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _release(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        metrics.set_gauge("singleflight.in_flight", len(self._calls))
+
+    async def do(self, key: str, fn):
+        """Await ``fn()`` (a coroutine function), sharing it with identical in-flight calls."""
+        if not self.enabled:
+            return await fn()
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._release(key, call))
+            metrics.incr("singleflight.started")
+            metrics.set_gauge("singleflight.in_flight", len(self._calls))
+        else:
+            metrics.incr("singleflight.coalesced")
+            logger.debug(f"Coalesced request {key} onto an in-flight call ({call.waiters} waiting)")
+        call.waiters += 1
+        try:
+            # Shield so one waiter's cancellation does not cancel the others' result
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # Last waiter gone: nobody wants the result, stop the generation
+                self._release(key, call)
+                call.task.cancel()
+                metrics.incr("singleflight.abandoned")
+            raise
+        finally:
+            call.waiters -= 1
+
+
+generations = SingleFlight()
@@ -0,0 +1,167 @@
+"""Startup warm-up behind the ``/readyz`` probe.
+
+After the index is loaded the API pre-touches the index files, opens the
+pooled OpenAI connections, builds one chain per platform and runs the most
+frequent recent retrieval queries (or a few representative ones on a fresh
+install) so the retrieval cache is populated before traffic arrives. The
+instance reports ready once the warm-up has finished; a failing or slow
+warm-up is logged and does not keep it out of rotation. Its OpenAI calls run
+in the scheduler's ``background`` lane, behind user requests.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+
+from src.loaders.retrieval_context import RetrievalContext
+from src.output_catalog import use_case_of
+from src.rag_pipeline import build_retrieval_query, get_rag_chain
+from src.scheduler import lane
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to report ready as soon as the index is loaded
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() != "false"
+WARMUP_QUERIES = int(os.getenv("WARMUP_QUERIES", "20"))
+WARMUP_RECENT_OUTPUTS = int(os.getenv("WARMUP_RECENT_OUTPUTS", "500"))
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "120"))
+
+CONTENT_PLATFORMS = ("linkedin", "instagram", "facebook")
+# Used when there is no generation history yet
+DEFAULT_TOPICS = ("product launch", "customer success story", "industry trends", "company services")
+
+
+class Readiness:
+    """What ``/readyz`` reports: index loaded, warm-up finished, and how it went."""
+
+    def __init__(self):
+        self.index_loaded = False
+        self.warm = False
+        self.steps = {}  # step -> seconds
+        self.error = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index_loaded and self.warm
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "index_loaded": self.index_loaded,
+            "warm": self.warm,
+            "steps": self.steps,
+            "error": self.error,
+        }
+
+
+readiness = Readiness()
+
+
+def touch_index_files(index_path: str) -> int:
+    """Read every index file once so the first searches are served from the page cache."""
+    total = 0
+    for name in sorted(os.listdir(index_path)):
+        path = os.path.join(index_path, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                total += len(chunk)
+    return total
+
+
+def recent_queries(retriever, catalog, limit: int = WARMUP_QUERIES, recent: int = WARMUP_RECENT_OUTPUTS) -> list:
+    """The most frequent retrieval queries behind recent outputs, as ``(platform, use_case, query)``."""
+    counts = Counter()
+    rows, _ = catalog.query(sort="timestamp", order="desc", limit=recent) if catalog is not None else ([], None)
+    for row in rows:
+        record = retriever.get_output(row["output_id"])
+        if record is None:
+            continue
+        metadata = record["metadata"]
+        use_case = use_case_of(metadata)
+        platform = metadata.get("platform") if use_case == "content" else "all"
+        query = build_retrieval_query(platform, use_case, metadata)
+        if query:
+            counts[(platform, use_case, query)] += 1
+    queries = [key for key, _ in counts.most_common(limit)]
+    if not queries:
+        for topic in DEFAULT_TOPICS:
+            queries.extend(
+                (platform, "content", build_retrieval_query(platform, "content", {"content_topic": topic}))
+                for platform in CONTENT_PLATFORMS
+            )
+            queries.append(("all", "strategy", build_retrieval_query("all", "strategy", {"content_goals": topic})))
+    return queries[:limit]
+
+
+class WarmUp:
+    def __init__(self, retriever, catalog, index_path: str, state: Readiness = readiness):
+        self.retriever = retriever
+        self.catalog = catalog
+        self.index_path = index_path
+        self.state = state
+
+    async def _step(self, name: str, fn):
+        started = time.perf_counter()
+        result = await fn()
+        self.state.steps[name] = round(time.perf_counter() - started, 3)
+        logger.info(f"Warm-up step {name} took {self.state.steps[name]}s")
+        return result
+
+    async def _touch_index(self):
+        size = await asyncio.to_thread(touch_index_files, self.index_path)
+        logger.info(f"Pre-read {size / 1e6:.1f} MB of index files")
+
+    async def _open_connections(self):
+        from src.openai_clients import get_async_http_client, get_http_client
+
+        get_http_client()
+        get_async_http_client()
+        # One embedding call opens pooled connections (TLS, HTTP/2) to the API
+        await self.retriever.embeddings.aembed_query("warm-up")
+
+    async def _build_chains(self) -> dict:
+        # Retrieval only depends on the platform; strategy and calendar share the "all" chain
+        chains = {}
+        for platform in CONTENT_PLATFORMS + ("all",):
+            use_case = "strategy" if platform == "all" else "content"
+            chains[platform] = await asyncio.to_thread(
+                get_rag_chain, index_path=self.index_path, use_case=use_case, platform=platform,
+            )
+        return chains
+
+    async def _retrieve(self, chains: dict):
+        # Fills the retrieval cache the request path reads from (see HybridRetriever)
+        queries = await asyncio.to_thread(recent_queries, self.retriever, self.catalog)
+        for platform, _, query in queries:
+            if platform not in chains:
+                continue
+            retrieval = RetrievalContext(query, self.retriever.embeddings)
+            await chains[platform].aretrieve(query, retrieval)
+            if platform != "all":
+                await self.retriever.aretrieve_relevant_outputs(retrieval, platform)
+        logger.info(f"Warmed {len(queries)} retrieval queries")
+
+    async def _run(self):
+        await self._step("index_files", self._touch_index)
+        await self._step("connections", self._open_connections)
+        chains = await self._step("chains", self._build_chains)
+        await self._step("retrievals", lambda: self._retrieve(chains))
+
+    async def run(self, timeout: float = WARMUP_TIMEOUT):
+        """Warm up; the instance is marked warm even if this fails or times out."""
+        started = time.perf_counter()
+        try:
+            with lane("background"):
+                await asyncio.wait_for(self._run(), timeout)
+        except asyncio.TimeoutError:
+            self.state.error = f"Warm-up timed out after {timeout}s"
+            logger.warning(self.state.error)
+        except Exception as e:
+            self.state.error = f"Warm-up failed: {e}"
+            logger.warning(self.state.error)
+        else:
+            logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+        self.state.warm = True
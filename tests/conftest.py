@@ -0,0 +1,33 @@
+"""Test setup: every OpenAI call goes to the local stub server, never the real API.
+
+The stub is started before any test module is imported, because some modules
+build their OpenAI clients at import time.
+"""
+import os
+
+import pytest
+
+from benchmarks.stub_openai import StubOpenAIServer
+
+_stub = StubOpenAIServer().start()
+os.environ["OPENAI_API_KEY"] = "stub"
+os.environ["OPENAI_BASE_URL"] = _stub.base_url
+os.environ["OPENAI_API_BASE"] = _stub.base_url
+
+
+@pytest.fixture(scope="session")
+def openai_stub():
+    yield _stub
+
+
+@pytest.fixture(autouse=True)
+def fresh_loopless_pool():
+    # Clients built outside a loop share one pool, and each test's asyncio.run
+    # closes the loop its connections were bound to
+    yield
+    from src import openai_clients
+    openai_clients._async_clients.pop(openai_clients._LoopLess, None)
+
+
+def pytest_unconfigure(config):
+    _stub.stop()
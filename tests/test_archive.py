@@ -0,0 +1,33 @@
+import pytest
+
+from src.archive import OutputArchive
+
+
+@pytest.fixture
+def archive(tmp_path):
+    # Tiny segments, so a handful of records spans several of them
+    archive = OutputArchive(str(tmp_path / "archive"), segment_bytes=200)
+    yield archive
+    archive.close()
+
+
+def record(output_id):
+    return {"output_id": output_id, "category": "linkedin_contents", "content": f"Post {output_id} " * 10}
+
+
+def test_get_many_reads_records_across_segments(archive):
+    for i in range(8):
+        archive.append(record(f"out{i}"))
+        archive.flush()
+    assert len(archive._segments()) > 1
+    found = archive.get_many([f"out{i}" for i in range(8)] + ["missing"])
+    assert set(found) == {f"out{i}" for i in range(8)}
+    assert all(found[output_id] == archive.get(output_id) == record(output_id) for output_id in found)
+
+
+def test_get_many_sees_queued_records(archive):
+    archive.append(record("written"))
+    archive.flush()
+    archive._pending["queued"] = record("queued")
+    assert set(archive.get_many(["written", "queued"])) == {"written", "queued"}
+    assert archive.get_many([]) == {}
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src import archive as archive_module
+from src.archive import OutputArchive
+from src.loaders.bulk_import import BulkImporter, read_checkpoint
+from src.loaders.index_files import load_faiss, save_faiss
+from src.output_catalog import OutputCatalog
+
+ROWS = [{"platform": "linkedin", "content": f"Historical post {i} about SEO", "likes": 10 * i} for i in range(6)]
+
+
+class Crash(Exception):
+    pass
+
+
+class Retriever:
+    """The parts of FeedbackRetriever the importer uses, saving to ``index_path``."""
+
+    def __init__(self, index_path, fail_save=None):
+        self.index_path = index_path
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+        self.index_lock = threading.RLock()
+        self.fail_save = fail_save
+        self.saves = 0
+        try:
+            self.vector_store = load_faiss(index_path, self.embeddings)
+        except RuntimeError:
+            self.vector_store = FAISS.from_texts(["Brochure chunk"], self.embeddings, ids=["knowledge"])
+
+    def save_index(self):
+        self.saves += 1
+        if self.saves == self.fail_save:
+            raise Crash("killed before the index save")
+        save_faiss(self.vector_store, self.index_path)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    source = tmp_path / "posts.jsonl"
+    source.write_text("".join(json.dumps(row) + "\n" for row in ROWS))
+    archive = OutputArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(archive_module, "_archive", archive)
+    catalog = OutputCatalog(str(tmp_path / "catalog.sqlite3"))
+    yield tmp_path, str(source), archive, catalog
+    archive.close()
+    catalog.close()
+
+
+def run(retriever, catalog, source, checkpoint):
+    importer = BulkImporter(retriever, catalog=catalog, batch_size=2, concurrency=1, commit_every=2)
+    return asyncio.run(importer.run(source, checkpoint=checkpoint))
+
+
+def assert_imported_once(archive, catalog):
+    archived = Counter(record["output_id"] for record in archive.iter_records())
+    assert len(archived) == len(ROWS) and set(archived.values()) == {1}
+    items, _ = catalog.query(limit=100)
+    assert {item["output_id"] for item in items} == set(archived)
+
+
+def test_resume_after_a_crash_before_the_index_save_archives_each_row_once(env):
+    tmp_path, source, archive, catalog = env
+    index_path, checkpoint = str(tmp_path / "index"), str(tmp_path / "checkpoint.json")
+    with pytest.raises(Crash):
+        run(Retriever(index_path, fail_save=2), catalog, source, checkpoint)
+    assert read_checkpoint(checkpoint)["rows_done"] == 2
+
+    state = run(Retriever(index_path), catalog, source, checkpoint)
+    assert state["finished"] and state["imported"] == len(ROWS)
+    assert_imported_once(archive, catalog)
+
+
+def test_rows_indexed_but_not_archived_are_archived_on_resume(env, monkeypatch):
+    tmp_path, source, archive, catalog = env
+    index_path, checkpoint = str(tmp_path / "index"), str(tmp_path / "checkpoint.json")
+    record, calls = BulkImporter._record, []
+
+    def crash_on_second_commit(self, outputs):
+        calls.append(outputs)
+        if len(calls) == 2:
+            raise Crash("killed after the index save")
+        record(self, outputs)
+
+    monkeypatch.setattr(BulkImporter, "_record", crash_on_second_commit)
+    with pytest.raises(Crash):
+        run(Retriever(index_path), catalog, source, checkpoint)
+    monkeypatch.setattr(BulkImporter, "_record", record)
+
+    state = run(Retriever(index_path), catalog, source, checkpoint)
+    assert state["finished"]
+    assert_imported_once(archive, catalog)
+
+
+def test_repeated_rows_are_imported_once(env):
+    tmp_path, source, archive, catalog = env
+    with open(source, "a") as f:
+        f.write(json.dumps(ROWS[0]) + "\n")
+    state = run(Retriever(str(tmp_path / "index")), catalog, source, str(tmp_path / "checkpoint.json"))
+    assert state["imported"] == len(ROWS) and state["skipped"] == 1
+    assert_imported_once(archive, catalog)
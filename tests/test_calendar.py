@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from src.chains.calendar_chain import DEFAULT_PLATFORMS, MAX_CALENDAR_DAYS, TABLE_HEADER, CalendarEngine
+
+
+def test_skeleton_has_one_row_per_day_and_platform():
+    rows = CalendarEngine.build_skeleton(["SEO audits", "Site speed"], days=3)
+    assert len(rows) == 3 * len(DEFAULT_PLATFORMS)
+    assert {(row["day"], row["platform"]) for row in rows} == {
+        (day, platform) for day in (1, 2, 3) for platform in DEFAULT_PLATFORMS
+    }
+    # Topics rotate by day; every platform of a day shares the day's topic
+    assert [row["topic"] for row in rows if row["platform"] == "linkedin"] == ["SEO audits", "Site speed", "SEO audits"]
+
+
+def test_skeleton_without_topics_uses_a_default():
+    assert CalendarEngine.build_skeleton([], days=1, platforms=["instagram"]) == [
+        {"day": 1, "platform": "instagram", "topic": "Brand highlights"}
+    ]
+
+
+def test_row_parsing_tolerates_extra_lines_and_pipes():
+    assert CalendarEngine._parse_row("Here you go:\n| Reel | Quick tips | for speed | Book a demo |") == (
+        "Reel", "Quick tips for speed", "Book a demo",
+    )
+    assert CalendarEngine._parse_row("no table here") == ("Post", "no table here", "Learn more")
+
+
+def test_generate_fills_every_row_through_the_stub(openai_stub, monkeypatch):
+    async def no_retrieval(self, brand_summary, feedback_context):
+        return "context", ""
+
+    monkeypatch.setattr(CalendarEngine, "_retrieve_context", no_retrieval)
+    before = openai_stub.requests
+    table = asyncio.run(CalendarEngine(concurrency=4).generate("Acme builder", "SEO audits, Site speed", days=2))
+    lines = table.splitlines()
+    assert lines[0] == TABLE_HEADER
+    assert len(lines) == 1 + 2 * len(DEFAULT_PLATFORMS)
+    assert lines[1].startswith("Day 1 | Instagram |")
+    assert openai_stub.requests - before == 2 * len(DEFAULT_PLATFORMS)
+
+
+@pytest.mark.parametrize("days", [0, MAX_CALENDAR_DAYS + 1])
+def test_generate_rejects_out_of_range_days(days):
+    with pytest.raises(ValueError):
+        asyncio.run(CalendarEngine().generate("Acme", ["SEO"], days=days))
@@ -0,0 +1,73 @@
+import pytest
+
+from src.loaders import chunking
+from src.loaders.chunking import CHUNKERS, chunk_text, normalize, register, strategy_for
+
+PROSE = (
+    "Schema markup helps search engines understand product pages. "
+    "Fast pages keep visitors from bouncing. "
+    "Backlinks from industry blogs build authority over time. "
+) * 6
+MARKDOWN = "# Launch checklist\n\n- Audit titles\n- Fix links\n- Add schema\n\n## Speed\n\n- Compress images\n- Cache pages\n"
+
+
+def test_builtin_strategies_are_registered():
+    assert {"fixed", "sentence", "heading", "semantic"} <= set(CHUNKERS)
+
+
+def test_registered_strategy_is_used_by_chunk_text(monkeypatch):
+    monkeypatch.setitem(CHUNKERS, "lines", None)
+    register("lines")(lambda text, **_: [(line, {"line": i}) for i, line in enumerate(text.splitlines())])
+    assert chunk_text("a\nb", {"source": "notes.txt"}, strategy="lines") == [
+        ("a", {"source": "notes.txt", "line": 0, "chunking": "lines"}),
+        ("b", {"source": "notes.txt", "line": 1, "chunking": "lines"}),
+    ]
+
+
+def test_strategy_is_chosen_by_extension(monkeypatch):
+    monkeypatch.setenv("CHUNKING_STRATEGIES", "pdf=semantic,.md=heading,html=sentence")
+    assert strategy_for("docs/guide.PDF") == "semantic"
+    assert strategy_for("README.md") == "heading"
+    assert strategy_for("https://example.com/blog") == "sentence"
+    assert strategy_for("notes.txt") == "fixed"
+
+
+def test_unknown_strategy_is_rejected(monkeypatch):
+    monkeypatch.setenv("CHUNKING_STRATEGIES", "pdf=magic")
+    with pytest.raises(ValueError):
+        strategy_for("guide.pdf")
+
+
+@pytest.mark.parametrize("strategy", ["fixed", "sentence", "heading", "semantic"])
+def test_chunks_respect_the_size(strategy):
+    chunks = chunk_text(PROSE, strategy=strategy, chunk_size=200, chunk_overlap=20)
+    assert len(chunks) > 1
+    assert all(len(text) <= 200 for text, _ in chunks)
+    assert all(meta["chunking"] == strategy for _, meta in chunks)
+
+
+def test_over_long_tokens_are_split():
+    url = "https://example.com/" + "a" * 450
+    chunks = chunk_text(f"See {url} for details.", strategy="sentence", chunk_size=100, chunk_overlap=0)
+    assert all(len(text) <= 100 for text, _ in chunks)
+    assert "".join(text for text, _ in chunks).replace(" ", "").count("a") >= 450
+
+
+def test_word_per_line_pdf_text_is_rejoined():
+    text = "Boost \n \nyour \n \nsite \n \nspeed\n \n \nAdd \n \nschema"
+    assert normalize(text) == "Boost your site speed\nAdd schema"
+
+
+def test_bullet_markdown_is_not_rejoined():
+    assert normalize(MARKDOWN) == MARKDOWN
+
+
+def test_heading_chunks_keep_their_section():
+    chunks = chunk_text(MARKDOWN, strategy="heading", chunk_size=40, chunk_overlap=0)
+    sections = {meta.get("section") for _, meta in chunks}
+    assert {"Launch checklist", "Speed"} <= sections
+
+
+def test_semantic_chunks_do_not_cut_sentences():
+    chunks = chunking.semantic_chunks(PROSE, chunk_size=200, min_chars=50)
+    assert all(text.endswith(".") for text, _ in chunks)
@@ -0,0 +1,61 @@
+from langchain_core.documents import Document
+
+from src.loaders.context_assembler import (
+    FEEDBACK_BUDGET_SHARE,
+    MIN_RELEVANCE,
+    assemble_context,
+    count_tokens,
+    merge_chunks,
+)
+
+SENTENCE = "Structured data and fast pages help small businesses rank for local searches. "
+
+
+def doc(text, source="guide.pdf", page=1):
+    return Document(page_content=text, metadata={"source": source, "page": page})
+
+
+def test_context_and_examples_fit_the_budget():
+    scored = [(doc(SENTENCE * 10, page=page), 0.9) for page in range(10)]
+    examples = [SENTENCE * 5 for _ in range(5)]
+    context, feedback = assemble_context("linkedin", scored, examples, budget=400)
+    assert count_tokens(feedback) <= int(400 * FEEDBACK_BUDGET_SHARE)
+    assert count_tokens(context) + count_tokens(feedback) <= 400
+    assert context and feedback
+
+
+def test_unused_feedback_share_goes_to_context():
+    scored = [(doc(SENTENCE * 10, page=page), 0.9) for page in range(10)]
+    with_examples, _ = assemble_context("linkedin", scored, [SENTENCE * 5], budget=400)
+    without_examples, _ = assemble_context("linkedin", scored, [], budget=400)
+    assert count_tokens(without_examples) > count_tokens(with_examples)
+
+
+def test_first_chunk_is_truncated_when_nothing_fits():
+    context, _ = assemble_context("linkedin", [(doc(SENTENCE * 50), 0.9)], [], budget=30)
+    assert 0 < count_tokens(context) <= 30
+    assert SENTENCE.startswith(context[:20])
+
+
+def test_chunks_keep_rank_order():
+    scored = [(doc("second ranked", page=2), 0.5), (doc("first ranked", page=1), 0.9)]
+    context, _ = assemble_context("linkedin", scored, [], budget=100)
+    assert context.split("\n") == ["second ranked", "first ranked"]
+
+
+def test_low_relevance_chunks_are_dropped():
+    scored = [(doc("relevant", page=1), 0.9), (doc("noise", page=2), MIN_RELEVANCE / 2)]
+    context, _ = assemble_context("linkedin", scored, [], budget=100)
+    assert context == "relevant"
+
+
+def test_overlapping_chunks_from_one_page_are_stitched():
+    text = "Step one: audit the site. Step two: fix broken links. Step three: add schema markup."
+    first, second = text[:50], text[25:]
+    assert merge_chunks([doc(first), doc(second)]) == [text]
+    # Same text from another page stays separate
+    assert merge_chunks([doc(first), doc(second, page=2)]) == [first, second]
+
+
+def test_contained_chunks_are_deduplicated():
+    assert merge_chunks([doc("fix broken links and add schema"), doc("broken links")]) == ["fix broken links and add schema"]
@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src import exporter
+from src.output_catalog import OutputCatalog
+
+
+class NoFullScan(dict):
+    """index_to_docstore_id that fails the test if the whole map is walked."""
+
+    def items(self):
+        raise AssertionError("export walked the whole index_to_docstore_id")
+
+    values = keys = __iter__ = items
+
+
+class CountingLock:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.acquired += 1
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+class Retriever:
+    def __init__(self, vector_store):
+        self.vector_store = vector_store
+        self.index_lock = CountingLock()
+
+
+def metadata(i, label):
+    return {
+        "output_id": f"out{i}",
+        "platform": "linkedin",
+        "use_case": "content",
+        "timestamp": f"2026-01-{i + 1:02d}T00:00:00",
+        "feedback": {"label": label, "rating": 5 if label == "high_engagement" else 2},
+    }
+
+
+@pytest.fixture
+def setup(tmp_path):
+    outputs = [metadata(i, "high_engagement" if i % 2 else "needs_improvement") for i in range(7)]
+    store = FAISS.from_texts(
+        ["Brochure knowledge chunk"] + [f"Post {i}" for i in range(7)],
+        DeterministicFakeEmbedding(size=8),
+        metadatas=[{"source": "brochure.pdf"}] + outputs,
+        ids=["knowledge"] + [m["output_id"] for m in outputs],
+    )
+    catalog = OutputCatalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.upsert_many(outputs)
+    yield Retriever(store), catalog
+    catalog.close()
+
+
+def test_export_is_oldest_first_with_filters(setup):
+    retriever, catalog = setup
+    pages = list(exporter.iter_pages(retriever, catalog, label="high_engagement", page_size=2))
+    assert [len(page) for page in pages] == [2, 1]
+    assert [row["output_id"] for page in pages for row in page] == ["out1", "out3", "out5"]
+    assert pages[0][0]["content"] == "Post 1" and pages[0][0]["rating"] == 5
+
+
+def test_embeddings_are_read_a_page_at_a_time_under_the_index_lock(setup):
+    retriever, catalog = setup
+    store = retriever.vector_store
+    store.index_to_docstore_id = NoFullScan(store.index_to_docstore_id)
+    pages = list(exporter.iter_pages(retriever, catalog, include_embeddings=True, page_size=3))
+    rows = [row for page in pages for row in page]
+    # The knowledge chunk is not an output and is skipped
+    assert [row["output_id"] for row in rows] == [f"out{i}" for i in range(7)]
+    for position, row in enumerate(rows, start=1):
+        assert np.allclose(row["embedding"], store.index.reconstruct(position))
+    # One lock per page of vectors, plus the check that finds the end of the index
+    assert len(pages) == 3 and retriever.index_lock.acquired == 4
+
+
+def test_embedding_export_applies_filters(setup):
+    retriever, catalog = setup
+    rows = [row for page in exporter.iter_pages(retriever, catalog, label="needs_improvement",
+                                                include_embeddings=True, page_size=4) for row in page]
+    assert [row["output_id"] for row in rows] == ["out0", "out2", "out4", "out6"]
+
+
+def test_export_stops_when_outputs_are_deleted_mid_export(setup):
+    retriever, catalog = setup
+    pages = exporter.iter_pages(retriever, catalog, include_embeddings=True, page_size=3)
+    next(pages)
+    retriever.vector_store.delete(["out0"])
+    with pytest.raises(RuntimeError, match="changed during the export"):
+        next(pages)
+
+
+def test_ndjson_lines_are_one_row_each(setup):
+    retriever, catalog = setup
+    body = b"".join(exporter.iter_ndjson(exporter.iter_pages(retriever, catalog, page_size=3)))
+    assert len(body.splitlines()) == 7
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.loaders import bm25
+from src.loaders.bm25 import BM25Index, build_lexical_index, load_lexical_index, tokenize
+from src.loaders.context_assembler import MIN_RELEVANCE, assemble_context
+from src.loaders.hybrid import HybridRetriever, reciprocal_rank_fusion
+from src.loaders.index_files import load_faiss, save_faiss
+from src.loaders.retrieval_cache import RetrievalCache
+
+TEXTS = [
+    "Schema markup helps search engines understand product pages.",
+    "Site speed and Core Web Vitals influence rankings on mobile.",
+    "Backlinks from industry blogs build domain authority over time.",
+    "A drag-and-drop website builder with SEO presets for small shops.",
+]
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    query_calls: int = 0
+
+    async def aembed_query(self, text):
+        self.query_calls += 1
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def store():
+    return FAISS.from_texts(TEXTS, CountingEmbeddings(size=16), ids=[f"doc{i}" for i in range(len(TEXTS))])
+
+
+def test_tokenize_drops_stopwords_and_query_boilerplate():
+    assert tokenize("Provide context for the LinkedIn post about Schema markup") == ["linkedin", "schema", "markup"]
+
+
+def test_bm25_ranks_the_document_with_the_rare_term_first():
+    index = BM25Index()
+    for i, text in enumerate(TEXTS):
+        index.add(f"doc{i}", text)
+    hits, confidence = index.search("backlinks authority", k=2)
+    assert [doc_id for doc_id, _ in hits] == ["doc2"]
+    assert 0 < confidence < 1
+
+
+def test_bm25_without_matching_terms_has_zero_confidence():
+    index = BM25Index()
+    index.add("doc0", TEXTS[0])
+    assert index.search("quantum chromodynamics") == ([], 0.0)
+
+
+def test_lexical_index_is_rebuilt_only_when_the_index_files_change(store, tmp_path, monkeypatch):
+    index_path = str(tmp_path / "faiss_index")
+    save_faiss(store, index_path)
+    first = load_lexical_index(load_faiss(index_path, store.embeddings), index_path)
+    assert sorted(first.doc_ids) == [f"doc{i}" for i in range(len(TEXTS))]
+
+    scans = []
+    knowledge_documents = bm25._knowledge_documents
+    monkeypatch.setattr(bm25, "_knowledge_documents", lambda vs: scans.append(vs) or knowledge_documents(vs))
+    assert load_lexical_index(load_faiss(index_path, store.embeddings), index_path) is first
+    assert scans == []
+
+    store.add_texts(["Local SEO for bakeries."], ids=["doc4"])
+    save_faiss(store, index_path)
+    rebuilt = load_lexical_index(load_faiss(index_path, store.embeddings), index_path)
+    assert len(scans) == 2  # the freshness check and the rebuild
+    assert "doc4" in rebuilt.doc_ids
+
+
+def test_rrf_prefers_ids_ranked_in_both_lists():
+    fused = reciprocal_rank_fusion(["a", "b", "c"], ["c", "a", "d"], rrf_k=60)
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_rrf_keeps_single_list_order():
+    assert [doc_id for doc_id, _ in reciprocal_rank_fusion(["x", "y", "z"])] == ["x", "y", "z"]
+
+
+def test_confident_lexical_match_skips_the_embedding_call(store):
+    retriever = HybridRetriever(store, build_lexical_index(store), k=1, lexical_confidence=0.1, cache=None)
+    results = asyncio.run(retriever.asearch("schema markup product pages"))
+    assert results[0][0].page_content == TEXTS[0]
+    assert store.embeddings.query_calls == 0
+
+
+def test_weak_lexical_match_fuses_with_vector_results(store):
+    retriever = HybridRetriever(store, build_lexical_index(store), k=3, lexical_confidence=0.99, cache=None)
+    results = asyncio.run(retriever.asearch("backlinks"))
+    assert store.embeddings.query_calls == 1
+    assert len(results) == 3
+    # The exact-term match is kept by the fusion, and relevance scores stay in [0, 1]
+    assert TEXTS[2] in [doc.page_content for doc, _ in results]
+    assert all(0 <= score <= 1 for _, score in results)
+
+
+def test_results_are_cached_per_index_version(store):
+    cache = RetrievalCache(max_entries=8, ttl=60)
+    retriever = HybridRetriever(store, build_lexical_index(store), k=2, lexical_confidence=0.99, cache=cache)
+    first = asyncio.run(retriever.asearch("Core Web Vitals"))
+    second = asyncio.run(retriever.asearch("  core web vitals "))
+    assert store.embeddings.query_calls == 1
+    assert [doc.page_content for doc, _ in first] == [doc.page_content for doc, _ in second]
+
+
+def test_low_confidence_lexical_matches_survive_context_assembly(store):
+    lexical_index = build_lexical_index(store)
+    query = "site speed tips for shops"
+    _, confidence = lexical_index.search(query)
+    assert confidence < MIN_RELEVANCE
+    retriever = HybridRetriever(store, lexical_index, k=2, lexical_confidence=0.99, cache=None)
+    results = asyncio.run(retriever.asearch(query))
+    assert results[0] == (store.docstore.search("doc1"), 1.0)
+    context, _ = assemble_context("linkedin", results, [])
+    assert TEXTS[1] in context and TEXTS[3] in context
+
+
+def test_fast_path_relevance_is_relative_to_the_top_hit(store):
+    retriever = HybridRetriever(store, build_lexical_index(store), k=2, lexical_confidence=0.0, cache=None)
+    results = asyncio.run(retriever.asearch("backlinks for a website builder"))
+    assert [score for _, score in results] == [1.0, 0.5]
+    assert store.embeddings.query_calls == 0
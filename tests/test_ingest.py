@@ -0,0 +1,39 @@
+import asyncio
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.loaders.ingest import ingest, scan
+from src.scheduler import current_lane
+
+
+class LaneRecordingEmbeddings(DeterministicFakeEmbedding):
+    lanes: list = []
+
+    async def aembed_documents(self, texts):
+        self.lanes.append(current_lane())
+        return self.embed_documents(texts)
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_scan_skips_runtime_data(tmp_path):
+    write(tmp_path / "brochure.md", "# Builder")
+    write(tmp_path / "guides" / "seo.txt", "Schema markup")
+    write(tmp_path / "output" / "archive" / "posts.json", "{}")
+    write(tmp_path / "imports" / "posts.json", "{}")
+    write(tmp_path / "posts.csv.import-checkpoint.json", "{}")
+    write(tmp_path / "notes.xyz", "unsupported")
+    assert [p.replace(str(tmp_path), "") for p in scan(str(tmp_path))] == ["/brochure.md", "/guides/seo.txt"]
+
+
+def test_ingest_embeds_in_the_background_lane(tmp_path):
+    for i in range(3):
+        write(tmp_path / f"guide{i}.txt", f"Guide {i}: schema markup and site speed tips for small shops. " * 20)
+    embeddings = LaneRecordingEmbeddings(size=8, lanes=[])
+    store = asyncio.run(ingest(scan(str(tmp_path)), embeddings, workers=1, batch_size=4))
+    assert store.index.ntotal > 0
+    assert embeddings.lanes and set(embeddings.lanes) == {"background"}
+    assert current_lane() == "interactive"
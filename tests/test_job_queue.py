@@ -0,0 +1,129 @@
+import pytest
+
+from src import job_queue
+from src.job_queue import JobQueue, job_view
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_claim_leases_the_oldest_job(queue, clock):
+    first = queue.submit("calendar", {"days": 1})
+    clock.now += 1
+    queue.submit("calendar", {"days": 2})
+    job = queue.claim("w1")
+    assert job["job_id"] == first
+    assert job["status"] == "running" and job["worker_id"] == "w1" and job["attempts"] == 1
+    assert job["payload"] == {"days": 1}
+
+
+def test_leased_job_is_not_claimed_twice(queue):
+    queue.submit("calendar", {})
+    assert queue.claim("w1") is not None
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, clock):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    clock.now += 61
+    job = queue.claim("w2")
+    assert job["job_id"] == job_id and job["worker_id"] == "w2" and job["attempts"] == 2
+    # The first worker lost its lease: it can neither extend it nor complete the job
+    assert not queue.heartbeat(job_id, "w1")
+    assert not queue.complete(job_id, "w1", {"content": "late"})
+    assert queue.complete(job_id, "w2", {"content": "post"})
+    assert queue.get(job_id)["status"] == "generated"
+
+
+def test_heartbeat_keeps_the_lease(queue, clock):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    for _ in range(3):
+        clock.now += 40
+        assert queue.heartbeat(job_id, "w1")
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue, clock):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    clock.now += 61
+    queue.claim("w2")
+    clock.now += 61
+    assert queue.claim("w3") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed" and job["error"] == "Worker lease expired"
+
+
+def test_failed_attempt_is_retried_after_backoff(queue, clock):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "upstream 503") == "queued"
+    assert queue.claim("w1") is None
+    clock.now += job_queue.JOB_RETRY_BACKOFF
+    assert queue.claim("w1")["attempts"] == 2
+    assert queue.fail(job_id, "w1", "upstream 503") == "failed"
+    assert job_view(queue.get(job_id))["error"] == "upstream 503"
+
+
+def test_non_retryable_failure_is_final(queue):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "invalid payload", retry=False) == "failed"
+
+
+def test_stale_storing_jobs_are_handed_back(queue, clock):
+    job_id = queue.submit("calendar", {})
+    queue.claim("w1")
+    queue.complete(job_id, "w1", {"content": "post"})
+    assert queue.claim_generated(owner="api-1")["job_id"] == job_id
+    assert queue.claim_generated() is None
+    clock.now += 61
+    queue.release_stale_storing()
+    assert queue.claim_generated(owner="api-2")["status"] == "storing"
+
+
+def test_unknown_kinds_are_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("podcast", {})
+
+
+def test_network_filesystems_are_detected(tmp_path):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(
+        "/dev/sda1 / ext4 rw 0 0\n"
+        "server:/exports /mnt/shared nfs4 rw 0 0\n"
+        "/dev/sdb1 /mnt/shared/local ext4 rw 0 0\n"
+        "//nas/jobs /mnt/my\\040jobs cifs rw 0 0\n"
+    )
+    assert job_queue.network_filesystem("/srv/app/data", str(mounts)) is None
+    assert job_queue.network_filesystem("/mnt/shared/output", str(mounts)) == "nfs4"
+    assert job_queue.network_filesystem("/mnt/shared/local/output", str(mounts)) is None
+    assert job_queue.network_filesystem("/mnt/my jobs", str(mounts)) == "cifs"
+    assert job_queue.network_filesystem("/srv", str(tmp_path / "missing")) is None
+
+
+def test_queue_refuses_a_network_filesystem(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "network_filesystem", lambda path: "nfs")
+    with pytest.raises(RuntimeError, match="single-host"):
+        JobQueue(str(tmp_path / "jobs.sqlite3"))
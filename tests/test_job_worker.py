@@ -0,0 +1,40 @@
+import asyncio
+
+from src import job_worker
+from src.scheduler import LLMScheduler, current_lane
+
+
+def test_jobs_run_in_the_batch_lane(monkeypatch):
+    lanes = []
+
+    async def fake_generate(kind, payload):
+        lanes.append(current_lane())
+        return {"content": "post", "generation": None}
+
+    monkeypatch.setattr(job_worker, "_generate", fake_generate)
+    assert asyncio.run(job_worker.generate("calendar", {}))["content"] == "post"
+    assert lanes == ["batch"]
+    assert current_lane() == "interactive"
+
+
+def test_worker_processes_split_the_rate_limits(monkeypatch):
+    class IdleWorker:
+        def __init__(self, *args):
+            pass
+
+        async def run(self):
+            pass
+
+    llm_scheduler = LLMScheduler(rpm=600, tpm=120000)
+    monkeypatch.setattr(job_worker, "scheduler", llm_scheduler)
+    monkeypatch.setattr(job_worker, "REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(job_worker, "TOKENS_PER_MINUTE", 120000)
+    monkeypatch.setattr(job_worker, "JOB_WORKER_RATE_SHARE", 0.5)
+    monkeypatch.setattr(job_worker, "Worker", IdleWorker)
+    monkeypatch.setattr(job_worker, "JobQueue", lambda: None)
+    monkeypatch.setattr(job_worker, "setup_logging", lambda: None)
+    monkeypatch.setattr(job_worker, "shutdown_logging", lambda: None)
+
+    job_worker._run_process(concurrency=2, poll_interval=1.0, processes=3)
+    assert llm_scheduler.requests.capacity == 100
+    assert llm_scheduler.tokens.capacity == 20000
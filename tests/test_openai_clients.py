@@ -0,0 +1,38 @@
+import asyncio
+
+import openai
+import pytest
+
+from src import scheduler as scheduler_module
+from src.openai_clients import get_chat_model, get_embeddings
+from src.scheduler import scheduler
+
+
+@pytest.fixture
+def always_rate_limited(openai_stub, monkeypatch):
+    # One transport retry and no pause, so the test measures retry layers, not backoff
+    monkeypatch.setattr(scheduler_module, "MAX_RATE_LIMIT_RETRIES", 1)
+    monkeypatch.setattr(scheduler, "rate_limited", lambda retry_after=None: 0.0)
+    openai_stub.status = lambda number: 429
+    yield openai_stub
+    openai_stub.status = None
+
+
+def test_factories_disable_sdk_retries():
+    assert get_chat_model().max_retries == 0
+    assert get_embeddings().max_retries == 0
+    assert get_chat_model(max_retries=3).max_retries == 3
+
+
+def test_chat_429s_are_retried_only_by_the_transport(always_rate_limited):
+    before = always_rate_limited.requests
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(get_chat_model().ainvoke("hi"))
+    assert always_rate_limited.requests - before == 2
+
+
+def test_embedding_429s_are_retried_only_by_the_transport(always_rate_limited):
+    before = always_rate_limited.requests
+    with pytest.raises(openai.RateLimitError):
+        get_embeddings(check_embedding_ctx_length=False).embed_query("hi")
+    assert always_rate_limited.requests - before == 2
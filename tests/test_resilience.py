@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+
+import httpx
+import openai
+import pytest
+
+from src import resilience
+from src.metrics import metrics
+from src.openai_clients import get_chat_model
+from src.resilience import CircuitBreaker, CircuitOpenError, LLMTimeoutError, resilient_call
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test_open", failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test_reset", failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = CircuitBreaker("test_half_open", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker("test_reopen", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 9
+    assert breaker.state == "open"
+
+
+def test_released_trial_lets_the_next_call_through(clock):
+    breaker = CircuitBreaker("test_release", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "http://stub/v1/chat/completions"))
+
+
+def test_retryable_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(resilience, "_backoff", lambda attempt: 0)
+    calls = itertools.count(1)
+
+    async def flaky():
+        if next(calls) < 3:
+            raise _connection_error()
+        return "ok"
+
+    breaker = CircuitBreaker("test_retry", failure_threshold=10)
+    assert asyncio.run(resilient_call(flaky, breaker=breaker, max_retries=2, hedge=False)) == "ok"
+    assert next(calls) == 4
+
+
+def test_rate_limit_errors_are_left_to_the_scheduler():
+    calls = itertools.count(1)
+    response = httpx.Response(429, request=httpx.Request("POST", "http://stub/v1/chat/completions"))
+
+    async def limited():
+        next(calls)
+        raise openai.RateLimitError("rate limited", response=response, body=None)
+
+    breaker = CircuitBreaker("test_429", failure_threshold=1)
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(resilient_call(limited, breaker=breaker, max_retries=3, hedge=False))
+    assert next(calls) == 2
+    assert breaker.state == "closed"
+
+
+def test_deadline_raises_llm_timeout():
+    async def slow():
+        await asyncio.sleep(1)
+
+    breaker = CircuitBreaker("test_deadline", failure_threshold=10)
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(resilient_call(slow, breaker=breaker, hedge=False, deadline=0.05))
+
+
+def test_hedge_records_every_request_latency(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_FALLBACK_DELAY", 0.02)
+    calls = itertools.count()
+
+    async def slow_then_fast():
+        await asyncio.sleep(0.3 if next(calls) == 0 else 0.01)
+        return "done"
+
+    before = metrics.count("llm.latency.hedge_test")
+    breaker = CircuitBreaker("test_hedge", failure_threshold=10)
+    assert asyncio.run(resilient_call(slow_then_fast, use_case="hedge_test", breaker=breaker, hedge=True)) == "done"
+    # The cancelled slow primary is recorded too, not only the winning hedge
+    assert metrics.count("llm.latency.hedge_test") - before == 2
+
+
+def test_server_errors_from_the_stub_are_retried(openai_stub, monkeypatch):
+    monkeypatch.setattr(resilience, "_backoff", lambda attempt: 0)
+    first = openai_stub.requests + 1
+    openai_stub.status = lambda number: 503 if number == first else None
+    try:
+        llm = get_chat_model(max_retries=0)
+        breaker = CircuitBreaker("test_stub", failure_threshold=10)
+        message = asyncio.run(resilient_call(lambda: llm.ainvoke("hi"), breaker=breaker, hedge=False))
+    finally:
+        openai_stub.status = None
+    assert message.content.startswith("Stub SEO website post")
+    assert openai_stub.requests - first == 1
@@ -0,0 +1,71 @@
+import pytest
+
+from src.loaders import retrieval_cache as cache_module
+from src.loaders.bm25 import BM25Index
+from src.loaders.retrieval_cache import RetrievalCache, knowledge_version, normalize_query
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def index_of(*doc_ids):
+    index = BM25Index()
+    for doc_id in doc_ids:
+        index.add(doc_id, "text")
+    return index
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  SEO   tips for LinkedIn? ") == "seo tips for linkedin"
+    assert RetrievalCache.key("v1", "SEO tips", 3) == RetrievalCache.key("v1", "seo  TIPS.", 3)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = RetrievalCache(max_entries=4, ttl=10)
+    cache.put("key", [("doc", 0.5)])
+    clock.now += 9.9
+    assert cache.get("key") == [("doc", 0.5)]
+    clock.now += 0.1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = RetrievalCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_zero_size_disables_the_cache():
+    cache = RetrievalCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_version_changes_when_knowledge_documents_change():
+    assert knowledge_version(index_of("a", "b")) == knowledge_version(index_of("b", "a"))
+    assert knowledge_version(index_of("a", "b")) != knowledge_version(index_of("a", "b", "c"))
+
+
+def test_rebuilt_index_does_not_see_old_entries(clock):
+    cache = RetrievalCache(max_entries=8, ttl=60)
+    old, new = knowledge_version(index_of("a")), knowledge_version(index_of("a", "b"))
+    cache.put(cache.key(old, "seo tips", 3), [("a", 0.9)])
+    assert cache.get(cache.key(old, "SEO tips", 3)) == [("a", 0.9)]
+    assert cache.get(cache.key(new, "SEO tips", 3)) is None
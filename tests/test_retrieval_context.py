@@ -0,0 +1,47 @@
+import asyncio
+
+from src.loaders.retrieval_context import RetrievalContext
+from src.openai_clients import get_embeddings
+
+
+def embeddings():
+    # Plain-text inputs: no tiktoken download for the stub
+    return get_embeddings(check_embedding_ctx_length=False)
+
+
+def test_concurrent_searches_share_one_embedding_call(openai_stub):
+    async def main():
+        retrieval = RetrievalContext("SEO tips for small shops", embeddings())
+        assert not retrieval.has_embedding
+        before = openai_stub.requests
+        vectors = await asyncio.gather(*(retrieval.embedding() for _ in range(4)))
+        return retrieval, vectors, openai_stub.requests - before
+
+    retrieval, vectors, requests = asyncio.run(main())
+    assert requests == 1
+    assert retrieval.has_embedding
+    assert all(vector == vectors[0] for vector in vectors)
+
+
+def test_a_cancelled_search_does_not_cancel_the_shared_embedding(openai_stub):
+    openai_stub.delay = 0.05
+
+    async def main():
+        retrieval = RetrievalContext("site speed", embeddings())
+        first = asyncio.ensure_future(retrieval.embedding())
+        second = asyncio.ensure_future(retrieval.embedding())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    try:
+        assert len(asyncio.run(main())) == openai_stub.embedding_dim
+    finally:
+        openai_stub.delay = 0.0
+
+
+def test_unused_context_never_embeds(openai_stub):
+    before = openai_stub.requests
+    retrieval = RetrievalContext("backlinks", embeddings())
+    assert not retrieval.has_embedding
+    assert openai_stub.requests == before
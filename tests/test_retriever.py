@@ -0,0 +1,53 @@
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.loaders.index_files import load_faiss, save_faiss
+from src.loaders.retriever import FeedbackRetriever
+
+
+@pytest.fixture
+def fake_embeddings(openai_stub):
+    # Same dimension as the stub, which the retriever embeds with
+    return DeterministicFakeEmbedding(size=openai_stub.embedding_dim)
+
+
+@pytest.fixture
+def index_path(tmp_path, fake_embeddings):
+    path = str(tmp_path / "faiss_index")
+    save_faiss(FAISS.from_texts(["Old brochure chunk"], fake_embeddings, ids=["old"]), path)
+    return path
+
+
+def add_output(retriever, fake_embeddings, output_id):
+    content = f"Generated post {output_id}"
+    retriever.vector_store.add_embeddings(
+        [(content, fake_embeddings.embed_query(content))], metadatas=[{"output_id": output_id}], ids=[output_id],
+    )
+
+
+def ids_on_disk(index_path, fake_embeddings):
+    return set(load_faiss(index_path, fake_embeddings).index_to_docstore_id.values())
+
+
+def test_saves_of_its_own_index_succeed(index_path, fake_embeddings):
+    retriever = FeedbackRetriever(index_path=index_path)
+    for output_id in ("out1", "out2"):
+        add_output(retriever, fake_embeddings, output_id)
+        retriever.save_index()
+    assert ids_on_disk(index_path, fake_embeddings) == {"old", "out1", "out2"}
+
+
+def test_save_does_not_overwrite_a_rebuilt_index(index_path, fake_embeddings):
+    retriever = FeedbackRetriever(index_path=index_path)
+    save_faiss(FAISS.from_texts(["New brochure chunk"], fake_embeddings, ids=["new"]), index_path)
+    add_output(retriever, fake_embeddings, "out1")
+    with pytest.raises(RuntimeError, match="replaced on disk"):
+        retriever.save_index()
+    assert ids_on_disk(index_path, fake_embeddings) == {"new"}
+
+    retriever.reload()
+    assert set(retriever.vector_store.index_to_docstore_id.values()) == {"new"}
+    add_output(retriever, fake_embeddings, "out2")
+    retriever.save_index()
+    assert ids_on_disk(index_path, fake_embeddings) == {"new", "out2"}
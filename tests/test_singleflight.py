@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight, request_key
+
+
+def test_request_key_ignores_case_whitespace_and_order():
+    assert request_key("post", {"topic": "SEO  Tips", "tone": "Fun"}) == request_key("post", {"tone": "fun", "topic": " seo tips"})
+    assert request_key("post", {"topic": "SEO"}) != request_key("calendar", {"topic": "SEO"})
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flight = SingleFlight(enabled=True)
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "post"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", generate) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["post"] * 5
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight(enabled=True)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad prompt")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_results_are_not_cached_after_completion():
+    flight = SingleFlight(enabled=True)
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        return await flight.do("key", generate), await flight.do("key", generate)
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    flight = SingleFlight(enabled=True)
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return "post"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", generate))
+        second = asyncio.ensure_future(flight.do("key", generate))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "post"
+
+
+def test_last_waiter_leaving_cancels_the_call():
+    flight = SingleFlight(enabled=True)
+    cancelled = asyncio.Event()
+
+    async def generate():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        waiter = asyncio.ensure_future(flight.do("key", generate))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return flight.in_flight()
+
+    assert asyncio.run(main()) == 0
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(flight.do("key", generate) for _ in range(3)))
+
+    asyncio.run(main())
+    assert calls == 3
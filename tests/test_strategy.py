@@ -0,0 +1,36 @@
+import asyncio
+import re
+
+from src.chains.strategy_chain import StrategyEngine
+from src.prompts.social_media_prompt import strategy_sections
+
+
+def test_single_platform_uses_its_template():
+    assert StrategyEngine.template_for("LinkedIn") == "linkedin"
+    assert StrategyEngine.template_for(["instagram"]) == "instagram"
+    assert StrategyEngine.template_for(["instagram", "facebook"]) == "all"
+    assert StrategyEngine.template_for(["tiktok"]) == "all"
+
+
+def test_stitch_orders_sections_by_number():
+    parts = [(3, "c", "third"), (1, "a", "first"), (2, "b", "second")]
+    assert StrategyEngine.stitch(parts) == "first\n\nsecond\n\nthird"
+
+
+def test_sections_are_stitched_in_template_order(openai_stub, monkeypatch):
+    async def no_retrieval(self, content_goals, template):
+        return "context", ""
+
+    monkeypatch.setattr(StrategyEngine, "_retrieve_context", no_retrieval)
+    first = openai_stub.requests + 1
+    # Early requests answer last, so sections complete out of order
+    openai_stub.delay = lambda number: max(0.0, 0.2 - 0.02 * (number - first))
+    try:
+        before = openai_stub.requests
+        strategy = asyncio.run(StrategyEngine(concurrency=9).generate(["linkedin"], "More demo bookings"))
+    finally:
+        openai_stub.delay = 0.0
+    titles = [title for title, _ in strategy_sections["linkedin"]["sections"]]
+    assert re.findall(r"^### \d+\. (.+)$", strategy, flags=re.M) == titles
+    # One outline completion plus one per section
+    assert openai_stub.requests - before == 1 + len(titles)
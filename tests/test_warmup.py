@@ -0,0 +1,27 @@
+import asyncio
+
+from src.scheduler import current_lane
+from src.warmup import Readiness, WarmUp
+
+
+def test_warmup_runs_in_the_background_lane(monkeypatch):
+    lanes = []
+
+    async def fake_run(self):
+        lanes.append(current_lane())
+
+    monkeypatch.setattr(WarmUp, "_run", fake_run)
+    state = Readiness()
+    asyncio.run(WarmUp(None, None, "unused", state=state).run())
+    assert lanes == ["background"]
+    assert state.warm and state.error is None
+
+
+def test_failed_warmup_still_marks_the_instance_warm(monkeypatch):
+    async def failing_run(self):
+        raise RuntimeError("index missing")
+
+    monkeypatch.setattr(WarmUp, "_run", failing_run)
+    state = Readiness()
+    asyncio.run(WarmUp(None, None, "unused", state=state).run())
+    assert state.warm and "index missing" in state.error